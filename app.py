@@ -1,80 +1,44 @@
+import time
+
+_MULAI = time.perf_counter()
+
 import sys
+import asyncio
+from contextlib import closing
 import pandas as pd
 import os
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
-    QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QComboBox,
+    QLineEdit, QPushButton, QTableView, QComboBox,
     QMessageBox, QDateEdit, QHeaderView, QFileDialog, QGroupBox, 
-    QStatusBar, QSplashScreen, QSizePolicy
+    QStatusBar, QSplashScreen, QSizePolicy, QProgressBar, QInputDialog, QShortcut, QMenu, QCheckBox
 )
-from PyQt5.QtCore import QDate, Qt, QTimer
-from PyQt5.QtGui import QIcon, QPixmap, QColor
-
-DATA_PATH = 'data/kost_data.xlsx'
-
-nomor_kamar = [
-    "1A", "1B", "1C", "1D", "1E", "1F", "1G", "1H", "1I", "1J",
-    "1K", "1L", "1M", "1N", "1O", "1P", "1Q", "1R",
-    "2A", "2B", "2C", "2D", "2E", "2F", "2G", "2H", "2I", "2J",
-    "2K", "2L", "2M", "2N", "2O", "2P", "2Q", "2R",
-    "3A", "3B", "3C", "3D"
-]
-
-harga_kamar = [
-    "Rp. 450.000", "Rp. 500.000", "Rp. 550.000", "Rp. 600.000",
-    "Rp. 650.000", "Rp. 700.000", "Rp. 750.000", "Rp. 800.000",
-    "Rp. 850.000", "Rp. 900.000", "Rp. 950.000", "Rp. 1.000.000"
-]
-
-def load_data():
-    if os.path.exists(DATA_PATH):
-        try:
-            df = pd.read_excel(DATA_PATH, dtype={'No Kamar': str, 'Nomor WhatsApp': str})
-            df = df.fillna('')
-            df['No Kamar'] = df['No Kamar'].str.strip().str.upper()
-            df['Nama Penghuni'] = df['Nama Penghuni'].str.strip()
-            
-            df['Sorting'] = df['No Kamar'].apply(lambda x: nomor_kamar.index(x) if x in nomor_kamar else len(nomor_kamar))
-            df = df.sort_values('Sorting')
-            df = df.drop('Sorting', axis=1)
-            
-            return df
-        except Exception as e:
-            print(f"Error loading data: {e}")
-            return pd.DataFrame(columns=[
-                'No Kamar', 'Nama Penghuni', 'Nomor WhatsApp', 'Tanggal Masuk',
-                'Status Kamar', 'Status Pembayaran', 'Harga Kamar'
-            ])
-    else:
-        return pd.DataFrame(columns=[
-            'No Kamar', 'Nama Penghuni', 'Nomor WhatsApp', 'Tanggal Masuk',
-            'Status Kamar', 'Status Pembayaran', 'Harga Kamar'
-        ])
-
-def save_data(df):
-    try:
-        os.makedirs('data', exist_ok=True)
-        df['No Kamar'] = df['No Kamar'].str.strip().str.upper()
-        
-        df['Sorting'] = df['No Kamar'].apply(lambda x: nomor_kamar.index(x) if x in nomor_kamar else len(nomor_kamar))
-        df = df.sort_values('Sorting')
-        df = df.drop('Sorting', axis=1)
-        
-        df.to_excel(DATA_PATH, index=False)
-        return True
-    except Exception as e:
-        print(f"Error saving data: {e}")
-        return False
+from PyQt5.QtCore import QDate, QEvent, QObject, QStringListModel, QTimer, pyqtSignal
+from PyQt5.QtGui import QIcon, QKeySequence, QPixmap
+
+from billing import JadwalPenagihan
+from catalog import katalog
+from config import CEK_JATUH_TEMPO_MENIT, PROFIL, REMINDER_GATEWAY, UKUR_STARTUP
+from dokumen import FORMAT_DOKUMEN, buat_dokumen_bertahap, siapkan_dokumen
+from exporter import FORMAT_EKSPOR, ambil_perubahan, ekspor_bertahap, riwayat_backend
+from importer import baca_bertahap, bandingkan_impor, validasi_chunk
+from jobs import PengelolaPekerjaan
+from ledger import KOLOM_LEDGER, BukuPembayaran, hitung_tunggakan, periode_sekarang
+from profiler import diukur, pengukur
+from reminder import Outbox, kirim_outbox, pilih_penunggak
+from snapshot import SnapshotKamar, buat_snapshot
+from storage import KOLOM, buat_backend
+from store import (
+    KostStore, HARGA_KAMAR, NILAI_KAMAR_KOSONG, harga_kamar, format_harga, format_whatsapp_number,
+    load_data, cek_whatsapp, data_teks
+)
+from table_model import KostTableModel
+
+
+# Notifikasi dari thread pendengar server dikirim ke thread GUI lewat sinyal
+class PenghubungServer(QObject):
+    peristiwa = pyqtSignal(object)
 
-def format_whatsapp_number(nomor):
-    if pd.isna(nomor) or nomor == '':
-        return ''
-    nomor = ''.join(filter(str.isdigit, str(nomor)))
-    if nomor.startswith('0'):
-        nomor = '62' + nomor[1:]
-    elif not nomor.startswith('62'):
-        nomor = '62' + nomor
-    return nomor
 
 class KostApp(QMainWindow):
     def __init__(self):
@@ -86,21 +50,327 @@ class KostApp(QMainWindow):
         # Tampilkan splash screen
         self.show_splash()
         
-        # Setup UI
-        self.init_ui()
-        self.current_data = load_data()
+        # Data dibaca sekali di thread latar, selanjutnya dilayani dari memori
+        self.store = KostStore(muat=False, snapshot=buat_snapshot())
+        self.current_data = self.store.data
+        self.kriteria_filter = {}
+        self.buku_pembayaran = BukuPembayaran()
+        self.pembayaran = pd.DataFrame(columns=KOLOM_LEDGER)
+        self.tunggakan = None
+        self.jobs = PengelolaPekerjaan(self)
+        self.penghubung_server = None
+        self.peristiwa_server = []
+        # Perubahan yang sedang ditulis oleh pekerjaan penyimpanan
+        self.perubahan_berjalan = None
+        self.muat_ulang_tertunda = False
+        self.menutup = False
+        self.data_siap = False
+        self.first_paint = None
         
-        # Status bar
-        self.statusBar().showMessage("Aplikasi siap digunakan", 3000)
+        # Setup UI: hanya tabel yang dibuat sekarang, sisanya setelah
+        # jendela tampil agar tabel bisa dilukis secepatnya
+        self.init_ui()
+        self.create_progress_bar()
+        self.pasang_profiler()
         
         # Terapkan style
         self.set_app_style()
         
+        self.muat_data()
+        QTimer.singleShot(0, self.lengkapi_ui)
+        
+    def create_progress_bar(self):
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setTextVisible(False)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+
+        self.button_batal = QPushButton("Batal")
+        self.button_batal.clicked.connect(self.jobs.batal_semua)
+        self.statusBar().addPermanentWidget(self.button_batal)
+
+        self.jobs.progres.connect(self.tampilkan_progres)
+        self.jobs.aktif_berubah.connect(self.pekerjaan_aktif)
+        self.pekerjaan_aktif(False)
+
+    def pasang_profiler(self):
+        # Aktif hanya dengan KOST_PROFIL; lihat profiler.py
+        if not pengukur.aktif:
+            return
+        if PROFIL == 'status':
+            self.label_latensi = QLabel()
+            self.statusBar().addPermanentWidget(self.label_latensi)
+            pengukur.pendengar.append(lambda aksi: self.label_latensi.setText(aksi.teks()))
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.simpan_profil)
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, activated=self.alihkan_cprofile)
+
+    def simpan_profil(self):
+        path_trace, path_histogram = pengukur.simpan()
+        self.statusBar().showMessage(f"Trace disimpan di {path_trace}, histogram di {path_histogram}", 5000)
+
+    def alihkan_cprofile(self):
+        if pengukur.profil_aktif():
+            path = pengukur.hentikan_profil()
+            self.statusBar().showMessage(f"cProfile disimpan di {path}", 5000)
+        else:
+            pengukur.mulai_profil()
+            self.statusBar().showMessage("cProfile berjalan, tekan Ctrl+Shift+P lagi untuk berhenti", 5000)
+
+    def pekerjaan_aktif(self, aktif):
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(aktif)
+        self.button_batal.setVisible(aktif)
+
+    def tampilkan_progres(self, nama, persen, pesan):
+        if persen < 0:
+            self.progress_bar.setRange(0, 0)  # Progres tidak diketahui
+        else:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(persen)
+        self.statusBar().showMessage(f"{nama}: {pesan}" if pesan else nama)
+
+    def muat_data(self):
+        self.statusBar().showMessage("Memuat data...")
+
+        # Backend server dipakai ulang saat memuat ulang agar pendengar
+        # notifikasinya tetap satu
+        backend_lama = self.store.backend
+
+        def muat(konteks):
+            backend = backend_lama or buat_backend()
+            return backend, load_data(backend), self.buku_pembayaran.load()
+
+        self.jobs.jalankan("Memuat data", muat, selesai=self.data_dimuat, gagal=self.data_gagal_dimuat)
+
+    def data_dimuat(self, hasil):
+        backend, df, pembayaran = hasil
+        self.store.isi(df, backend)
+        self.pembayaran = pembayaran
+        self.data_siap = True
+        self.tampilkan_data()
+        self.atur_siap()
+        self.mulai_cek_jatuh_tempo()
+        self.mulai_dengarkan_server()
+        peringatan = self.ringkasan_whatsapp()
+        if peringatan:
+            self.statusBar().showMessage(f"Aplikasi siap digunakan. {peringatan}", 10000)
+        else:
+            self.statusBar().showMessage("Aplikasi siap digunakan", 3000)
+
+    def mulai_dengarkan_server(self):
+        # Hanya backend server yang mengirim notifikasi perubahan
+        backend = self.store.backend
+        if not hasattr(backend, 'dengarkan') or backend.mendengarkan():
+            return
+        self.penghubung_server = PenghubungServer(self)
+        self.penghubung_server.peristiwa.connect(self.terima_peristiwa_server)
+        self.timer_server = QTimer(self)
+        self.timer_server.setSingleShot(True)
+        self.timer_server.setInterval(100)
+        self.timer_server.timeout.connect(self.terapkan_peristiwa_server)
+        backend.dengarkan(self.penghubung_server.peristiwa.emit)
+
+    def terima_peristiwa_server(self, peristiwa):
+        # Perubahan yang datang beruntun diterapkan sekaligus dengan satu
+        # kali render
+        self.peristiwa_server.append(peristiwa)
+        if not self.timer_server.isActive():
+            self.timer_server.start()
+
+    @diukur()
+    def terapkan_peristiwa_server(self):
+        peristiwa, self.peristiwa_server = self.peristiwa_server, []
+        if any(p['jenis'] == 'muat_ulang' for p in peristiwa):
+            self.muat_ulang_dari_server()
+            return
+        terakhir = {}
+        for p in peristiwa:
+            terakhir[p['no_kamar']] = p
+        with pengukur.fase('transform'):
+            diterapkan = self.terapkan_dari_server(terakhir)
+        if diterapkan:
+            self.tampilkan_data()
+            self.statusBar().showMessage(f"{len(diterapkan)} kamar diperbarui dari komputer lain", 3000)
+
+    def muat_ulang_dari_server(self):
+        # Memuat ulang mengganti seluruh isi store, jadi perubahan yang belum
+        # tersimpan disimpan dulu; pemuatan menunggu penyimpanan selesai
+        if self.store.dirty or self.jobs.berjalan("Menyimpan data"):
+            self.muat_ulang_tertunda = True
+            self.statusBar().showMessage(
+                "Data di server dimuat ulang; menyimpan perubahan Anda dulu sebelum memuat ulang", 5000)
+            self.simpan_data()
+            return
+        self.muat_ulang_tertunda = False
+        self.muat_data()
+
+    def terapkan_dari_server(self, kamar, paksa=False):
+        # kamar: {no_kamar: {'baris', 'etag'/'versi'}}; baris None berarti
+        # dihapus. Versi hanya dicatat untuk kamar yang benar-benar diterapkan,
+        # kamar dengan perubahan lokal tetap memakai versi lamanya.
+        baris = [p['baris'] for p in kamar.values() if p['baris'] is not None]
+        dihapus = [k for k, p in kamar.items() if p['baris'] is None]
+        df = pd.DataFrame(baris, columns=KOLOM)
+        diterapkan = self.store.terapkan(df, dihapus, paksa)
+        self.store.backend.catat_versi({
+            k: kamar[k].get('etag', kamar[k].get('versi')) for k in diterapkan
+        })
+        return diterapkan
+
+    def mulai_cek_jatuh_tempo(self):
+        # Dipanggil setiap kali data dimuat; timer hanya dibuat sekali,
+        # memuat ulang cukup memeriksa sekali lagi. Dengan backend server
+        # (yang punya dengarkan) jatuh tempo diperiksa oleh server.py, bukan
+        # oleh setiap komputer
+        if CEK_JATUH_TEMPO_MENIT <= 0 or hasattr(self.store.backend, 'dengarkan'):
+            return
+        if not hasattr(self, 'timer_jatuh_tempo'):
+            self.timer_jatuh_tempo = QTimer(self)
+            self.timer_jatuh_tempo.setInterval(CEK_JATUH_TEMPO_MENIT * 60 * 1000)
+            self.timer_jatuh_tempo.timeout.connect(self.cek_jatuh_tempo)
+            self.timer_jatuh_tempo.start()
+        self.cek_jatuh_tempo()
+
+    def cek_jatuh_tempo(self):
+        # Jatuh tempo dihitung di thread latar dari salinan kolom yang
+        # dibutuhkan; hanya penghuni yang jatuh temponya baru lewat diubah
+        kamar = self.store.data[['Nama Penghuni', 'Tanggal Masuk', 'Status Kamar', 'Status Pembayaran']].copy()
+        pembayaran = self.pembayaran.copy()
+
+        def periksa(konteks):
+            return JadwalPenagihan().periksa(kamar, pembayaran=pembayaran)
+
+        def selesai(kamar_baru):
+            # Lewati kamar yang sudah diubah pengguna sejak salinan diambil
+            data = self.store.data
+            kamar_baru = [k for k in kamar_baru if k in self.store and data.at[k, 'Status Pembayaran'] == 'Lunas']
+            if not kamar_baru:
+                return
+            self.store.perbarui(kamar_baru, {'Status Pembayaran': 'Menunggak'}, "Jatuh tempo")
+            self.tampilkan_data()
+            self.simpan_data()
+            self.statusBar().showMessage(f"{len(kamar_baru)} penghuni melewati jatuh tempo dan kini Menunggak", 10000)
+
+        def gagal(pesan):
+            print(f"Error memeriksa jatuh tempo: {pesan}")
+
+        self.jobs.jalankan("Memeriksa jatuh tempo", periksa, selesai=selesai, gagal=gagal)
+
+    def ringkasan_whatsapp(self):
+        tidak_valid, duplikat = cek_whatsapp(self.store.data['Nomor WhatsApp'])
+        if not tidak_valid.any() and not duplikat.any():
+            return ''
+        return (f"Nomor WhatsApp tidak valid: {int(tidak_valid.sum())}, "
+                f"dipakai lebih dari satu kamar: {int(duplikat.sum())}")
+
+    def data_gagal_dimuat(self, pesan):
+        QMessageBox.critical(self, "Error", f"Gagal memuat data: {pesan}")
+        self.statusBar().showMessage("Gagal memuat data")
+
+    def simpan_data(self, force=False, pesan_sukses=None, setelah=None):
+        # Penyimpanan berjalan di thread latar. Permintaan yang datang saat
+        # penyimpanan lain masih berjalan digabung, dan perubahan baru diambil
+        # dari store tepat sebelum ditulis sehingga hanya keadaan terbaru
+        # yang disimpan. setelah() dipanggil bila semua perubahan tersimpan
+        # (atau tidak ada yang perlu disimpan).
+        aksi = pengukur.sekarang()
+
+        def siapkan():
+            perubahan = self.store.ambil_perubahan(force)
+            if perubahan is None:
+                return None
+            self.perubahan_berjalan = perubahan
+
+            def tulis(konteks):
+                with pengukur.fase('write', aksi):
+                    return self.store.tulis_perubahan(perubahan), perubahan
+            return tulis
+
+        def selesai(hasil):
+            self.perubahan_berjalan = None
+            konflik = self.ambil_konflik()
+            if konflik:
+                # Kamar lain dalam penyimpanan yang sama sudah tersimpan;
+                # kamar yang bentrok diganti dengan versi dari server
+                self.terapkan_dari_server(konflik, paksa=True)
+                self.tampilkan_data()
+                QMessageBox.warning(self, "Konflik",
+                    f"Kamar {', '.join(sorted(konflik))} sudah diubah di komputer lain. "
+                    "Data terbaru dari server ditampilkan, silakan ulangi perubahan Anda.")
+                self.statusBar().showMessage("Sebagian perubahan tidak disimpan karena konflik", 5000)
+                self.lanjutkan_muat_ulang()
+                return
+            if hasil is not None and not hasil[0]:
+                self.store.kembalikan_perubahan(hasil[1])
+                QMessageBox.critical(self, "Error", "Gagal menyimpan data!")
+                self.statusBar().showMessage("Gagal menyimpan data", 3000)
+                return
+            if hasil is None:
+                # Tidak ada yang berubah sejak data dimuat/disimpan
+                if pesan_sukses and not self.menutup:
+                    QMessageBox.information(self, "Info", "Tidak ada perubahan untuk disimpan.")
+                self.statusBar().showMessage("Tidak ada perubahan untuk disimpan", 3000)
+                if setelah:
+                    setelah()
+                self.lanjutkan_muat_ulang()
+                return
+            self.store.tandai_tersimpan(hasil[1])
+            if pesan_sukses and not self.menutup:
+                QMessageBox.information(self, "Sukses", pesan_sukses)
+            self.statusBar().showMessage("Data berhasil disimpan", 3000)
+            if setelah:
+                setelah()
+            self.lanjutkan_muat_ulang()
+
+        def gagal(pesan):
+            if self.perubahan_berjalan is not None:
+                self.store.kembalikan_perubahan(self.perubahan_berjalan)
+                self.perubahan_berjalan = None
+            QMessageBox.critical(self, "Error", f"Gagal menyimpan data: {pesan}")
+            self.statusBar().showMessage("Gagal menyimpan data", 3000)
+
+        self.jobs.jalankan_gabung("Menyimpan data", siapkan, selesai, gagal)
+
+    def lanjutkan_muat_ulang(self):
+        # Muat ulang dari server yang ditunda menunggu penyimpanan. Bila
+        # penyimpanan gagal atau ada perubahan baru, pemuatan tetap ditunda
+        # sampai penyimpanan berikutnya berhasil.
+        if not self.muat_ulang_tertunda or self.menutup:
+            return
+        if self.store.dirty or self.jobs.berjalan("Menyimpan data"):
+            return
+        self.muat_ulang_tertunda = False
+        self.statusBar().showMessage("Memuat ulang data dari server...")
+        self.muat_data()
+
+    def ambil_konflik(self):
+        backend = self.store.backend
+        return backend.ambil_konflik() if hasattr(backend, 'ambil_konflik') else {}
+
     def show_splash(self):
+        # Splash ditutup begitu tabel pertama kali dilukis (paling lama 2 detik)
+        self.splash = None
         if os.path.exists("splash.png"):
-            splash = QSplashScreen(QPixmap("splash.png"))
-            splash.show()
-            QTimer.singleShot(2000, splash.close)
+            self.splash = QSplashScreen(QPixmap("splash.png"))
+            self.splash.show()
+            QTimer.singleShot(2000, self.tutup_splash)
+
+    def tutup_splash(self):
+        if self.splash is not None:
+            self.splash.finish(self)
+            self.splash = None
+
+    def eventFilter(self, obj, event):
+        # Catat waktu lukis pertama tabel setelah data dimuat
+        if (self.first_paint is None and self.data_siap and event.type() == QEvent.Paint
+                and obj is self.table.viewport()):
+            self.first_paint = (time.perf_counter() - _MULAI) * 1000
+            self.tutup_splash()
+            if UKUR_STARTUP:
+                print(f"time-to-first-paint: {self.first_paint:.1f} ms ({len(self.store)} kamar)")
+                if UKUR_STARTUP == 'keluar':
+                    QTimer.singleShot(0, self.close)
+        return super().eventFilter(obj, event)
         
     def set_app_style(self):
         self.setStyleSheet("""
@@ -165,7 +435,7 @@ class KostApp(QMainWindow):
                 border: 1px solid #4f46e5;
                 outline: none;
             }
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 alternate-background-color: #f9fafb;
                 gridline-color: #e5e7eb;
@@ -237,17 +507,31 @@ class KostApp(QMainWindow):
         # Tambahkan kedua container ke layout utama
         main_layout.addWidget(left_container, 40)  # 40% width
         main_layout.addWidget(right_container, 60)  # 60% width
-        
-        # Buat form input di container kiri
-        self.create_input_form(left_layout)
-        self.create_search_section(left_layout)
+        self.left_container = left_container
+        self.left_layout = left_layout
+        self.right_layout = right_layout
         
         # Buat tabel di container kanan
         self.create_data_table(right_layout)
-        self.create_action_buttons(right_layout)
+        self.table.viewport().installEventFilter(self)
 
-        # Tampilkan data awal
-        self.tampilkan_data()
+    def lengkapi_ui(self):
+        # Buat form input di container kiri
+        self.create_input_form(self.left_layout)
+        self.create_search_section(self.left_layout)
+        self.create_filter_section(self.left_layout)
+        self.create_summary_section(self.left_layout)
+        
+        # Tombol aksi di bawah tabel
+        self.create_action_buttons(self.right_layout)
+        self.atur_siap()
+        self.perbarui_ringkasan()
+
+    def atur_siap(self):
+        # Form dan tombol aksi baru aktif setelah data selesai dimuat
+        self.left_container.setEnabled(self.data_siap)
+        if hasattr(self, 'button_group'):
+            self.button_group.setEnabled(self.data_siap)
 
     def create_input_form(self, parent_layout):
         form_group = QGroupBox("Form Data Kamar")
@@ -258,7 +542,10 @@ class KostApp(QMainWindow):
         # Kolom 1
         form_layout.addWidget(QLabel("Nomor Kamar:"), 0, 0)
         self.input_no_kamar = QComboBox()
-        self.input_no_kamar.addItems(nomor_kamar)
+        # Model daftar dari katalog; ukuran item seragam agar popup tidak
+        # mengukur setiap kamar
+        self.input_no_kamar.setModel(QStringListModel(katalog().kode, self.input_no_kamar))
+        self.input_no_kamar.view().setUniformItemSizes(True)
         form_layout.addWidget(self.input_no_kamar, 0, 1)
 
         form_layout.addWidget(QLabel("Nama Penghuni:"), 1, 0)
@@ -328,9 +615,17 @@ class KostApp(QMainWindow):
         self.combo_jenis_pencarian.addItems(["Nomor Kamar", "Nama Penghuni"])
         search_layout.addWidget(self.combo_jenis_pencarian)
 
+        # Cari sambil mengetik, ditunda sebentar agar tidak mencari di setiap ketukan
+        self.timer_cari = QTimer(self)
+        self.timer_cari.setSingleShot(True)
+        self.timer_cari.setInterval(250)
+        self.timer_cari.timeout.connect(self.cari_langsung)
+
         self.input_cari = QLineEdit()
         self.input_cari.setPlaceholderText("Masukkan nomor kamar atau nama...")
         self.input_cari.returnPressed.connect(self.cari_data)
+        self.input_cari.textChanged.connect(lambda _: self.timer_cari.start())
+        self.combo_jenis_pencarian.currentTextChanged.connect(lambda _: self.timer_cari.start())
         search_layout.addWidget(self.input_cari)
 
         self.button_cari = QPushButton("Cari")
@@ -340,23 +635,152 @@ class KostApp(QMainWindow):
         search_group.setLayout(search_layout)
         parent_layout.addWidget(search_group)
 
+    def create_filter_section(self, parent_layout):
+        filter_group = QGroupBox("Filter Data")
+        filter_layout = QGridLayout()
+        filter_layout.setSpacing(10)
+        filter_layout.setContentsMargins(15, 15, 15, 15)
+
+        def pilihan(judul, nilai, baris, kolom):
+            filter_layout.addWidget(QLabel(judul), baris, kolom)
+            combo = QComboBox()
+            combo.addItems(["Semua"] + list(nilai))
+            combo.currentTextChanged.connect(self.terapkan_filter)
+            filter_layout.addWidget(combo, baris, kolom + 1)
+            return combo
+
+        def tanggal(judul, baris, kolom):
+            cek = QCheckBox(judul)
+            edit = QDateEdit()
+            edit.setDate(QDate.currentDate())
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("dd/MM/yyyy")
+            edit.setEnabled(False)
+            cek.toggled.connect(edit.setEnabled)
+            cek.toggled.connect(self.terapkan_filter)
+            edit.dateChanged.connect(self.terapkan_filter)
+            filter_layout.addWidget(cek, baris, kolom)
+            filter_layout.addWidget(edit, baris, kolom + 1)
+            return cek, edit
+
+        kamar = katalog().kamar
+        self.filter_gedung = pilihan("Gedung:", dict.fromkeys(k['Gedung'] for k in kamar if k['Gedung']), 0, 0)
+        self.filter_lantai = pilihan("Lantai:", dict.fromkeys(str(k['Lantai']) for k in kamar if k['Lantai']), 0, 2)
+        self.filter_status_kamar = pilihan("Status Kamar:", ["Sendiri", "Berdua", "Kamar Kosong"], 1, 0)
+        self.filter_status_pembayaran = pilihan("Pembayaran:", ["Lunas", "Menunggak"], 1, 2)
+        self.filter_harga = pilihan("Harga minimal:", harga_kamar, 2, 0)
+        self.filter_sejak = tanggal("Masuk sejak:", 3, 0)
+        self.filter_sebelum = tanggal("Masuk sebelum:", 3, 2)
+
+        self.button_reset_filter = QPushButton("Reset Filter")
+        self.button_reset_filter.clicked.connect(self.reset_filter)
+        filter_layout.addWidget(self.button_reset_filter, 2, 2, 1, 2)
+
+        filter_group.setLayout(filter_layout)
+        parent_layout.addWidget(filter_group)
+
+    def baca_filter(self):
+        kriteria = {}
+        for kunci, combo in (('Gedung', self.filter_gedung), ('Lantai', self.filter_lantai),
+                             ('Status Kamar', self.filter_status_kamar),
+                             ('Status Pembayaran', self.filter_status_pembayaran)):
+            if combo.currentIndex() > 0:
+                kriteria[kunci] = [combo.currentText()]
+        if self.filter_harga.currentIndex() > 0:
+            kriteria['harga_min'] = HARGA_KAMAR[self.filter_harga.currentIndex() - 1]
+        for kunci, (cek, edit) in (('masuk_sejak', self.filter_sejak), ('masuk_sebelum', self.filter_sebelum)):
+            if cek.isChecked():
+                kriteria[kunci] = edit.date().toString("yyyy-MM-dd")
+        return kriteria
+
+    def data_terfilter(self):
+        # Semua kamar, atau hasil panel filter bila ada kriteria aktif
+        if not self.kriteria_filter:
+            return self.store.data
+        return self.store.saring(self.kriteria_filter)
+
+    @diukur()
+    def terapkan_filter(self):
+        try:
+            self.kriteria_filter = self.baca_filter()
+            with pengukur.fase('transform'):
+                self.current_data = self.data_terfilter()
+            with pengukur.fase('render'):
+                self.tampilkan_hasil_pencarian(self.current_data)
+            if self.kriteria_filter:
+                self.statusBar().showMessage(f"Filter: {len(self.current_data)} kamar", 3000)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal menerapkan filter: {str(e)}")
+            self.statusBar().showMessage("Gagal menerapkan filter", 3000)
+
+    def reset_filter(self):
+        widget = [self.filter_gedung, self.filter_lantai, self.filter_status_kamar,
+                  self.filter_status_pembayaran, self.filter_harga,
+                  self.filter_sejak[0], self.filter_sebelum[0]]
+        for w in widget:
+            w.blockSignals(True)
+        for combo in widget[:5]:
+            combo.setCurrentIndex(0)
+        for cek in widget[5:]:
+            cek.setChecked(False)
+        for w in widget:
+            w.blockSignals(False)
+        self.filter_sejak[1].setEnabled(False)
+        self.filter_sebelum[1].setEnabled(False)
+        self.terapkan_filter()
+
+    def create_summary_section(self, parent_layout):
+        summary_group = QGroupBox("Ringkasan Hunian")
+        summary_layout = QGridLayout()
+        summary_layout.setSpacing(10)
+        summary_layout.setContentsMargins(15, 15, 15, 15)
+
+        self.label_ringkasan = {}
+        for baris, (kunci, judul) in enumerate([
+            ('terisi', "Kamar Terisi:"),
+            ('kosong', "Kamar Kosong:"),
+            ('pendapatan', "Pendapatan per Bulan:"),
+            ('tunggakan', "Total Tunggakan:"),
+        ]):
+            summary_layout.addWidget(QLabel(judul), baris, 0)
+            self.label_ringkasan[kunci] = QLabel()
+            summary_layout.addWidget(self.label_ringkasan[kunci], baris, 1)
+
+        summary_group.setLayout(summary_layout)
+        parent_layout.addWidget(summary_group)
+
+    def perbarui_ringkasan(self):
+        # Ringkasan dijaga store pada setiap upsert/hapus/merge, jadi di sini
+        # cukup dibaca tanpa menghitung ulang tabel
+        if not hasattr(self, 'label_ringkasan'):
+            return
+        r = self.store.ringkasan
+        self.label_ringkasan['terisi'].setText(str(r['terisi']))
+        self.label_ringkasan['kosong'].setText(str(r['kosong']))
+        self.label_ringkasan['pendapatan'].setText(format_harga(r['pendapatan']) or "Rp. 0")
+        self.label_ringkasan['tunggakan'].setText(
+            f"{format_harga(r['tunggakan']) or 'Rp. 0'} ({r['menunggak']} penghuni)")
+
     def create_data_table(self, parent_layout):
         table_group = QGroupBox("Data Kamar Kost")
         table_layout = QVBoxLayout(table_group)
         
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "No Kamar", "Nama Penghuni", "Nomor WhatsApp", "Tanggal Masuk", 
-            "Status Kamar", "Status Pembayaran", "Harga Kamar"
-        ])
+        self.model = KostTableModel()
+        self.table = QTableView()
+        self.table.setModel(self.model)
         
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.cellClicked.connect(self.tampilkan_data_terpilih)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        # Banyak baris bisa dipilih (Ctrl/Shift) untuk aksi massal
+        self.table.setSelectionMode(QTableView.ExtendedSelection)
+        self.table.clicked.connect(self.tampilkan_data_terpilih)
+        
+        # Tinggi baris tetap agar tabel tidak mengukur setiap baris
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(30)
         
         header = self.table.horizontalHeader()
+        header.setResizeContentsPrecision(200)
         header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(1, QHeaderView.Stretch)
         header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
@@ -370,6 +794,7 @@ class KostApp(QMainWindow):
 
     def create_action_buttons(self, parent_layout):
         button_group = QWidget()
+        self.button_group = button_group
         button_layout = QHBoxLayout(button_group)
         button_layout.setSpacing(10)
         button_layout.setContentsMargins(0, 0, 0, 0)
@@ -378,118 +803,175 @@ class KostApp(QMainWindow):
         self.button_edit.clicked.connect(self.edit_data)
         button_layout.addWidget(self.button_edit)
 
+        self.button_bayar = QPushButton("Catat Pembayaran")
+        self.button_bayar.clicked.connect(self.catat_pembayaran)
+        button_layout.addWidget(self.button_bayar)
+
+        self.button_pengingat = QPushButton("Kirim Pengingat")
+        self.button_pengingat.clicked.connect(self.kirim_pengingat)
+        button_layout.addWidget(self.button_pengingat)
+
+        # Kwitansi (Lunas) dan surat teguran (Menunggak) untuk semua kamar
+        # atau kamar yang dipilih
+        self.button_dokumen = QPushButton("Cetak Dokumen")
+        menu_dokumen = QMenu(self.button_dokumen)
+        menu_dokumen.addAction("Semua Kamar...", self.cetak_dokumen)
+        menu_dokumen.addAction("Kamar Terpilih...", lambda: self.cetak_dokumen(terpilih=True))
+        self.button_dokumen.setMenu(menu_dokumen)
+        button_layout.addWidget(self.button_dokumen)
+
         self.button_hapus = QPushButton("Hapus Data")
         self.button_hapus.setObjectName("danger")
         self.button_hapus.clicked.connect(self.hapus_data)
         button_layout.addWidget(self.button_hapus)
 
+        # Aksi untuk semua baris yang dipilih di tabel
+        self.button_massal = QPushButton("Aksi Terpilih")
+        menu_massal = QMenu(self.button_massal)
+        menu_massal.addAction("Tandai Lunas", lambda: self.ubah_status_terpilih("Lunas"))
+        menu_massal.addAction("Tandai Menunggak", lambda: self.ubah_status_terpilih("Menunggak"))
+        menu_massal.addAction("Ubah Harga...", self.ubah_harga_terpilih)
+        menu_massal.addAction("Kosongkan Kamar", self.kosongkan_terpilih)
+        menu_massal.addAction("Hapus", self.hapus_data)
+        self.button_massal.setMenu(menu_massal)
+        button_layout.addWidget(self.button_massal)
+
         self.button_import = QPushButton("Import Data")
         self.button_import.clicked.connect(self.import_data)
         button_layout.addWidget(self.button_import)
 
         self.button_export = QPushButton("Export Data")
-        self.button_export.clicked.connect(self.export_data)
+        menu_export = QMenu(self.button_export)
+        menu_export.addAction("Semua Data...", self.export_data)
+        menu_export.addAction("Perubahan Sejak Ekspor Terakhir...", lambda: self.export_data(perubahan=True))
+        self.button_export.setMenu(menu_export)
         button_layout.addWidget(self.button_export)
 
         self.button_save = QPushButton("Simpan Data")
         self.button_save.clicked.connect(self.save_data_manual)
         button_layout.addWidget(self.button_save)
 
+        # Undo/redo dari riwayat operasi di store, juga lewat Ctrl+Z/Ctrl+Y
+        self.button_riwayat = QPushButton("Riwayat")
+        self.menu_riwayat = QMenu(self.button_riwayat)
+        self.aksi_undo = self.menu_riwayat.addAction("Undo", self.undo_data)
+        self.aksi_redo = self.menu_riwayat.addAction("Redo", self.redo_data)
+        self.menu_riwayat.addSeparator()
+        self.menu_riwayat.addAction("Lihat Riwayat...", self.lihat_riwayat)
+        self.menu_riwayat.addAction("Ekspor Riwayat...", self.ekspor_riwayat)
+        self.menu_riwayat.addSeparator()
+        self.aksi_histori = self.menu_riwayat.addAction("Data Pada Tanggal...", self.lihat_histori)
+        self.aksi_deret = self.menu_riwayat.addAction("Ekspor Deret Hunian...", self.ekspor_deret_hunian)
+        self.menu_riwayat.aboutToShow.connect(self.perbarui_menu_riwayat)
+        self.button_riwayat.setMenu(self.menu_riwayat)
+        button_layout.addWidget(self.button_riwayat)
+        QShortcut(QKeySequence.Undo, self, activated=self.undo_data)
+        QShortcut(QKeySequence.Redo, self, activated=self.redo_data)
+        QShortcut(QKeySequence("Ctrl+Y"), self, activated=self.redo_data)
+
         parent_layout.addWidget(button_group)
 
+    @diukur()
     def tampilkan_data(self):
-        self.current_data = load_data()
-        self.tampilkan_hasil_pencarian(self.current_data)
+        with pengukur.fase('transform'):
+            # Indeks filter diperbarui store setiap perubahan, jadi filter
+            # aktif cukup diterapkan ulang
+            self.current_data = self.data_terfilter()
+            self.perbarui_tunggakan()
+        with pengukur.fase('render'):
+            self.tampilkan_hasil_pencarian(self.current_data)
+            self.perbarui_ringkasan()
         self.statusBar().showMessage("Data ditampilkan", 3000)
 
+    def perbarui_tunggakan(self):
+        # Dihitung ulang secara vektor untuk semua kamar dari buku pembayaran
+        try:
+            self.tunggakan = hitung_tunggakan(self.store.data, self.pembayaran)
+        except Exception as e:
+            print(f"Error menghitung tunggakan: {e}")
+            self.tunggakan = None
+
     def tampilkan_hasil_pencarian(self, df):
         try:
-            self.table.setRowCount(len(df))
-            for i, row in df.iterrows():
-                for j, value in enumerate(row):
-                    display_value = str(value) if pd.notna(value) else ""
-                    item = QTableWidgetItem(display_value)
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                    
-                    # Warna untuk status pembayaran
-                    if j == 5:  # Kolom Status Pembayaran
-                        if "Menunggak" in str(value):
-                            item.setBackground(QColor(254, 226, 226))  # Merah muda
-                            item.setForeground(QColor(220, 38, 38))    # Merah
-                        elif "Lunas" in str(value):
-                            item.setBackground(QColor(220, 252, 231))  # Hijau muda
-                            item.setForeground(QColor(22, 163, 74))    # Hijau
-                    
-                    self.table.setItem(i, j, item)
+            tunggakan = self.tunggakan['Bulan Tunggakan'] if self.tunggakan is not None else None
+            self.model.set_data(df, tunggakan)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal menampilkan data: {str(e)}")
             self.statusBar().showMessage("Gagal menampilkan data", 3000)
 
-    def tampilkan_data_terpilih(self, row, column):
+    def tampilkan_data_terpilih(self, index):
         try:
-            no_kamar = self.table.item(row, 0).text()
-            df = self.current_data[self.current_data['No Kamar'] == no_kamar]
+            no_kamar = self.model.no_kamar(index.row())
+            kamar = self.store.rekaman(no_kamar)
             
-            if not df.empty:
-                data = df.iloc[0]
-                
-                index = self.input_no_kamar.findText(data['No Kamar'])
+            if kamar is not None:
+                index = self.input_no_kamar.findText(kamar.no_kamar)
                 if index >= 0:
                     self.input_no_kamar.setCurrentIndex(index)
                 
-                self.input_nama_penghuni.setText(str(data['Nama Penghuni']))
-                self.input_nomor_whatsapp.setText(str(data['Nomor WhatsApp']))
+                self.input_nama_penghuni.setText(kamar.nama_penghuni)
+                self.input_nomor_whatsapp.setText(kamar.nomor_whatsapp)
                 
-                if data['Tanggal Masuk'] and str(data['Tanggal Masuk']) != 'nan':
-                    try:
-                        date = QDate.fromString(data['Tanggal Masuk'], "yyyy-MM-dd")
-                        if not date.isValid():
-                            date = QDate.fromString(data['Tanggal Masuk'], "dd/MM/yyyy")
-                        if date.isValid():
-                            self.input_tanggal_masuk.setDate(date)
-                    except:
-                        pass
+                # Tanggal sudah berupa datetime sejak dimuat, tidak perlu diurai lagi
+                tanggal = kamar.tanggal_masuk
+                if pd.notna(tanggal):
+                    self.input_tanggal_masuk.setDate(QDate(tanggal.year, tanggal.month, tanggal.day))
                 
-                self.combo_status_kamar.setCurrentText(data['Status Kamar'])
-                self.combo_status_pembayaran.setCurrentText(data['Status Pembayaran'])
-                self.combo_harga_kamar.setCurrentText(data['Harga Kamar'])
+                self.combo_status_kamar.setCurrentText(kamar.status_kamar)
+                self.combo_status_pembayaran.setCurrentText(kamar.status_pembayaran)
+                self.combo_harga_kamar.setCurrentText(format_harga(kamar.harga_kamar))
                 
         except Exception as e:
             print(f"Error menampilkan data terpilih: {e}")
 
-    def cari_data(self):
+    def cari_langsung(self):
+        self.cari_data(live=True)
+
+    @diukur()
+    def cari_data(self, live=False):
+        self.timer_cari.stop()
         keyword = self.input_cari.text().strip()
         if not keyword:
+            if live:
+                self.current_data = self.data_terfilter()
+                with pengukur.fase('render'):
+                    self.tampilkan_hasil_pencarian(self.current_data)
+                return
             QMessageBox.warning(self, "Peringatan", "Masukkan kata kunci pencarian!")
             return
 
-        df = load_data()
-        if df.empty:
-            QMessageBox.information(self, "Info", "Tidak ada data yang tersedia.")
+        if self.store.data.empty:
+            if not live:
+                QMessageBox.information(self, "Info", "Tidak ada data yang tersedia.")
             return
 
         jenis_pencarian = self.combo_jenis_pencarian.currentText()
 
         try:
-            if jenis_pencarian == "Nomor Kamar":
-                result = df[df['No Kamar'].str.strip().str.upper() == keyword.strip().upper()]
-            else:
-                result = df[df['Nama Penghuni'].str.strip().str.upper().str.contains(
-                    keyword.strip().upper(), na=False)]
+            with pengukur.fase('transform'):
+                result = self.store.cari(jenis_pencarian, keyword)
             
             if result.empty:
-                QMessageBox.information(self, "Pencarian", 
-                    f"Data dengan {jenis_pencarian} '{keyword}' tidak ditemukan.")
+                if live:
+                    self.current_data = result
+                    with pengukur.fase('render'):
+                        self.tampilkan_hasil_pencarian(result)
+                else:
+                    with pengukur.fase('dialog'):
+                        QMessageBox.information(self, "Pencarian", 
+                            f"Data dengan {jenis_pencarian} '{keyword}' tidak ditemukan.")
                 self.statusBar().showMessage("Pencarian tidak ditemukan", 3000)
             else:
                 self.current_data = result
-                self.tampilkan_hasil_pencarian(result)
+                with pengukur.fase('render'):
+                    self.tampilkan_hasil_pencarian(result)
                 self.statusBar().showMessage(f"Menampilkan hasil pencarian: {keyword}", 3000)
                 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Terjadi kesalahan saat mencari: {str(e)}")
             self.statusBar().showMessage("Gagal melakukan pencarian", 3000)
 
+    @diukur()
     def tambah_data(self):
         no_kamar = self.input_no_kamar.currentText().strip().upper()
         status_kamar = self.combo_status_kamar.currentText()
@@ -511,34 +993,26 @@ class KostApp(QMainWindow):
             'No Kamar': no_kamar,
             'Nama Penghuni': self.input_nama_penghuni.text().strip() if status_kamar != "Kamar Kosong" else '',
             'Nomor WhatsApp': format_whatsapp_number(self.input_nomor_whatsapp.text().strip()) if status_kamar != "Kamar Kosong" else '',
-            'Tanggal Masuk': self.input_tanggal_masuk.date().toString("dd/MM/yyyy") if status_kamar != "Kamar Kosong" else '',
+            'Tanggal Masuk': self.input_tanggal_masuk.date().toPyDate() if status_kamar != "Kamar Kosong" else '',
             'Status Kamar': status_kamar,
             'Status Pembayaran': self.combo_status_pembayaran.currentText() if status_kamar != "Kamar Kosong" else '',
-            'Harga Kamar': self.combo_harga_kamar.currentText() if status_kamar != "Kamar Kosong" else ''
+            'Harga Kamar': HARGA_KAMAR[self.combo_harga_kamar.currentIndex()] if status_kamar != "Kamar Kosong" else 0
         }
 
-        df = load_data()
-        
-        existing_index = df.index[df['No Kamar'].str.strip().str.upper() == no_kamar].tolist()
-        
-        if existing_index:
-            df.loc[existing_index[0]] = new_data
-            action = "diupdate"
-        else:
-            df = pd.concat([df, pd.DataFrame([new_data])], ignore_index=True)
-            action = "ditambahkan"
-        
-        if save_data(df):
-            QMessageBox.information(self, "Sukses", f"Data berhasil {action}!")
-            self.statusBar().showMessage(f"Data kamar {no_kamar} berhasil {action}", 3000)
+        with pengukur.fase('transform'):
+            action = self.store.upsert(new_data)
+        if action == "tidak berubah":
+            self.clear_form()
+            self.statusBar().showMessage(f"Data kamar {no_kamar} tidak berubah", 3000)
+            return
+        self.statusBar().showMessage(f"Data kamar {no_kamar} berhasil {action}", 3000)
+        with pengukur.fase('render'):
             self.tampilkan_data()
             self.clear_form()
-        else:
-            QMessageBox.critical(self, "Error", "Gagal menyimpan data!")
-            self.statusBar().showMessage("Gagal menyimpan data", 3000)
+        self.simpan_data(pesan_sukses=f"Data berhasil {action}!")
 
     def edit_data(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row == -1:
             QMessageBox.warning(self, "Peringatan", "Pilih data yang akan diedit di tabel!")
             self.statusBar().showMessage("Pilih data terlebih dahulu untuk diedit", 3000)
@@ -546,106 +1020,518 @@ class KostApp(QMainWindow):
         
         self.tambah_data()
 
+    def kamar_terpilih(self):
+        # Nomor kamar semua baris yang dipilih, urut sesuai tabel
+        baris = sorted(index.row() for index in self.table.selectionModel().selectedRows())
+        return [self.model.no_kamar(b) for b in baris]
+
+    def pilih_kamar_dulu(self, kamar, pesan):
+        if kamar:
+            return True
+        QMessageBox.warning(self, "Peringatan", pesan)
+        self.statusBar().showMessage("Pilih data terlebih dahulu", 3000)
+        return False
+
+    def konfirmasi_massal(self, kamar, aksi):
+        keterangan = f"kamar {kamar[0]}" if len(kamar) == 1 else f"{len(kamar)} kamar"
+        with pengukur.fase('dialog'):
+            reply = QMessageBox.question(
+                self, 'Konfirmasi',
+                f'Apakah Anda yakin ingin {aksi} data {keterangan}?',
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+        return reply == QMessageBox.Yes
+
+    def perbarui_terpilih(self, kamar, nilai, pesan, operasi):
+        # Satu pembaruan vektor di store, satu kali render dan satu kali
+        # penyimpanan berapa pun jumlah kamarnya
+        with pengukur.fase('transform'):
+            jumlah = self.store.perbarui(kamar, nilai, operasi)
+        with pengukur.fase('render'):
+            self.tampilkan_data()
+        self.simpan_data()
+        self.statusBar().showMessage(pesan.format(jumlah=jumlah), 3000)
+
+    @diukur()
+    def ubah_status_terpilih(self, status):
+        kamar = self.kamar_terpilih()
+        if not self.pilih_kamar_dulu(kamar, "Pilih kamar yang akan diubah di tabel!"):
+            return
+        # Kamar kosong tidak punya status pembayaran
+        data = self.store.data
+        kamar = [k for k in kamar if k in self.store and data.at[k, 'Status Kamar'] != "Kamar Kosong"]
+        if not kamar:
+            QMessageBox.warning(self, "Peringatan", "Kamar yang dipilih tidak berpenghuni!")
+            return
+        self.perbarui_terpilih(kamar, {'Status Pembayaran': status}, f"{{jumlah}} kamar ditandai {status}",
+                               f"Tandai {status}")
+
+    @diukur()
+    def ubah_harga_terpilih(self):
+        kamar = self.kamar_terpilih()
+        if not self.pilih_kamar_dulu(kamar, "Pilih kamar yang akan diubah harganya di tabel!"):
+            return
+        with pengukur.fase('dialog'):
+            harga, ok = QInputDialog.getItem(
+                self, "Ubah Harga", f"Harga baru untuk {len(kamar)} kamar:", harga_kamar, 0, False)
+        if not ok:
+            return
+        self.perbarui_terpilih(kamar, {'Harga Kamar': HARGA_KAMAR[harga_kamar.index(harga)]},
+                               f"Harga {{jumlah}} kamar diubah menjadi {harga}", "Ubah harga")
+
+    @diukur()
+    def kosongkan_terpilih(self):
+        kamar = self.kamar_terpilih()
+        if not self.pilih_kamar_dulu(kamar, "Pilih kamar yang akan dikosongkan di tabel!"):
+            return
+        if self.konfirmasi_massal(kamar, "mengosongkan"):
+            self.perbarui_terpilih(kamar, NILAI_KAMAR_KOSONG, "{jumlah} kamar dikosongkan", "Kosongkan kamar")
+            self.clear_form()
+
+    @diukur()
     def hapus_data(self):
-        selected_row = self.table.currentRow()
+        kamar = self.kamar_terpilih()
+        if not self.pilih_kamar_dulu(kamar, "Pilih data yang akan dihapus di tabel!"):
+            return
+
+        if self.konfirmasi_massal(kamar, "menghapus"):
+            with pengukur.fase('transform'):
+                jumlah = self.store.hapus_banyak(kamar)
+            if len(kamar) == 1:
+                self.statusBar().showMessage(f"Data kamar {kamar[0]} berhasil dihapus", 3000)
+            else:
+                self.statusBar().showMessage(f"{jumlah} kamar berhasil dihapus", 3000)
+            with pengukur.fase('render'):
+                self.tampilkan_data()
+                self.clear_form()
+            self.simpan_data(pesan_sukses="Data berhasil dihapus!")
+
+    def perbarui_menu_riwayat(self):
+        riwayat = self.store.riwayat
+        self.aksi_undo.setText(f"Undo {riwayat.label_undo}" if riwayat.bisa_undo else "Undo")
+        self.aksi_undo.setEnabled(riwayat.bisa_undo)
+        self.aksi_redo.setText(f"Redo {riwayat.label_redo}" if riwayat.bisa_redo else "Redo")
+        self.aksi_redo.setEnabled(riwayat.bisa_redo)
+        # Snapshot hanya ada bila data disimpan di komputer ini
+        self.aksi_histori.setEnabled(self.store.snapshot is not None)
+        self.aksi_deret.setEnabled(self.store.snapshot is not None)
+
+    def jalankan_riwayat(self, fungsi, judul):
+        if not self.data_siap:
+            return
+        try:
+            with pengukur.fase('transform'):
+                operasi = fungsi()
+        except ValueError as e:
+            QMessageBox.warning(self, "Peringatan", f"{judul} gagal: {e}")
+            self.statusBar().showMessage(f"{judul} gagal", 3000)
+            return
+        if operasi is None:
+            self.statusBar().showMessage(f"Tidak ada yang bisa di-{judul.lower()}", 3000)
+            return
+        with pengukur.fase('render'):
+            self.tampilkan_data()
+            self.clear_form()
+        self.simpan_data()
+        self.statusBar().showMessage(f"{judul}: {operasi.label}", 3000)
+
+    @diukur()
+    def undo_data(self):
+        self.jalankan_riwayat(self.store.undo, "Undo")
+
+    @diukur()
+    def redo_data(self):
+        self.jalankan_riwayat(self.store.redo, "Redo")
+
+    def lihat_riwayat(self):
+        # Operasi sejak data dimuat, satu baris per kamar; yang terlama
+        # dibuang bila melewati batas riwayat
+        riwayat = self.store.riwayat
+        audit = riwayat.audit()
+        kotak = QMessageBox(self)
+        kotak.setWindowTitle("Riwayat Perubahan")
+        kotak.setText(
+            f"{len(riwayat)} operasi, {len(audit)} perubahan kamar "
+            f"({riwayat.baris} dari maksimal {riwayat.maks_baris} baris disimpan)")
+        if len(audit):
+            kotak.setDetailedText(audit.tail(500).iloc[::-1].to_string(index=False))
+        kotak.exec_()
+
+    def ekspor_riwayat(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Simpan Riwayat", "riwayat.csv", "CSV Files (*.csv)")
+        if not file_path:
+            return
+        try:
+            self.store.riwayat.audit().to_csv(file_path, index=False)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Gagal menyimpan riwayat: {e}")
+            return
+        self.statusBar().showMessage(f"Riwayat disimpan di {file_path}", 3000)
+
+    def lihat_histori(self):
+        tanggal, ok = QInputDialog.getText(
+            self, "Data Pada Tanggal", "Tampilkan data kamar pada tanggal (YYYY-MM-DD):",
+            text=QDate.currentDate().addMonths(-1).toString("yyyy-MM-dd")
+        )
+        tanggal = tanggal.strip()
+        if not ok or not tanggal:
+            return
+        if not QDate.fromString(tanggal, "yyyy-MM-dd").isValid():
+            QMessageBox.warning(self, "Peringatan", "Format tanggal harus YYYY-MM-DD!")
+            return
+        path = self.store.snapshot.path
+
+        def baca(konteks):
+            # Instans sendiri: kamus snapshot milik store diperbarui thread simpan
+            snapshot = SnapshotKamar(path)
+            akhir_hari = pd.Timestamp(tanggal) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+            return snapshot.pada(akhir_hari), snapshot.deret(tanggal, tanggal)
+
+        def selesai(hasil):
+            data, deret = hasil
+            kotak = QMessageBox(self)
+            kotak.setWindowTitle("Data Pada Tanggal")
+            if not len(data):
+                kotak.setText(f"Belum ada snapshot data pada {tanggal}")
+            else:
+                baris = deret.iloc[0].to_dict()
+                teks = (f"{tanggal}: {baris['Kamar']:.0f} kamar, {baris['Terisi']:.0f} terisi "
+                        f"({baris['Hunian (%)']}%), pendapatan {format_harga(baris['Pendapatan']) or 'Rp. 0'}")
+                if baris['Menunggak']:
+                    teks += f", {baris['Menunggak']:.0f} menunggak ({format_harga(baris['Tunggakan'])})"
+                kotak.setText(teks)
+                kotak.setDetailedText(data_teks(data).to_string(index=False, max_rows=500))
+            kotak.exec_()
+
+        def gagal(pesan):
+            QMessageBox.critical(self, "Error", f"Gagal membaca snapshot: {pesan}")
+
+        self.jobs.jalankan("Membaca snapshot", baca, selesai=selesai, gagal=gagal)
+
+    def ekspor_deret_hunian(self):
+        # Hunian, pendapatan dan tunggakan per akhir bulan sejak snapshot
+        # pertama, misalnya untuk dibuat grafik di spreadsheet
+        file_path, _ = QFileDialog.getSaveFileName(self, "Simpan Deret Hunian", "hunian.csv", "CSV Files (*.csv)")
+        if not file_path:
+            return
+        path = self.store.snapshot.path
+
+        def tulis(konteks):
+            SnapshotKamar(path).deret(frekuensi='ME').to_csv(file_path)
+
+        def selesai(_):
+            self.statusBar().showMessage(f"Deret hunian disimpan di {file_path}", 3000)
+
+        def gagal(pesan):
+            QMessageBox.critical(self, "Error", f"Gagal menyimpan deret hunian: {pesan}")
+
+        self.jobs.jalankan("Menyimpan deret hunian", tulis, selesai=selesai, gagal=gagal)
+
+    def catat_pembayaran(self):
+        selected_row = self.table.currentIndex().row()
         if selected_row == -1:
-            QMessageBox.warning(self, "Peringatan", "Pilih data yang akan dihapus di tabel!")
-            self.statusBar().showMessage("Pilih data terlebih dahulu untuk dihapus", 3000)
+            QMessageBox.warning(self, "Peringatan", "Pilih kamar yang membayar di tabel!")
+            self.statusBar().showMessage("Pilih data terlebih dahulu untuk dicatat", 3000)
+            return
+
+        kamar = self.store.rekaman(self.model.no_kamar(selected_row))
+        if kamar is None or not kamar.terisi:
+            QMessageBox.warning(self, "Peringatan", "Kamar ini tidak berpenghuni!")
+            return
+
+        periode, ok = QInputDialog.getText(
+            self, "Catat Pembayaran",
+            f"Periode pembayaran kamar {kamar.no_kamar} (YYYY-MM):",
+            text=periode_sekarang()
+        )
+        periode = periode.strip()
+        if not ok or not periode:
+            return
+        if not QDate.fromString(periode + "-01", "yyyy-MM-dd").isValid():
+            QMessageBox.warning(self, "Peringatan", "Format periode harus YYYY-MM!")
+            return
+
+        def catat(konteks):
+            return self.buku_pembayaran.catat(kamar.no_kamar, kamar.nama_penghuni, periode, kamar.harga_kamar)
+
+        def selesai(baris):
+            # Periode yang sama dicatat ulang menggantikan catatan lamanya
+            lama = (self.pembayaran['No Kamar'] == baris['No Kamar']) & (self.pembayaran['Periode'] == baris['Periode'])
+            self.pembayaran = pd.concat([self.pembayaran[~lama], pd.DataFrame([baris])], ignore_index=True)
+            self.tampilkan_data()
+            self.statusBar().showMessage(f"Pembayaran kamar {kamar.no_kamar} periode {periode} dicatat", 3000)
+
+        def gagal(pesan):
+            QMessageBox.critical(self, "Error", f"Gagal mencatat pembayaran: {pesan}")
+            self.statusBar().showMessage("Gagal mencatat pembayaran", 3000)
+
+        self.jobs.jalankan("Mencatat pembayaran", catat, selesai=selesai, gagal=gagal)
+
+    @diukur()
+    def cetak_dokumen(self, terpilih=False):
+        df = self.store.data
+        if terpilih:
+            kamar = self.kamar_terpilih()
+            if not self.pilih_kamar_dulu(kamar, "Pilih kamar yang akan dibuatkan dokumen di tabel!"):
+                return
+            df = df.loc[[k for k in kamar if k in self.store]]
+        with pengukur.fase('dialog'):
+            format, ok = QInputDialog.getItem(
+                self, "Cetak Dokumen", "Format kwitansi dan surat teguran:",
+                [f.upper() for f in FORMAT_DOKUMEN], 0, False)
+            if not ok:
+                return
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, "Simpan Dokumen", f"dokumen-{periode_sekarang()}.zip", "Arsip ZIP (*.zip)")
+        if not file_path:
+            return
+        if not file_path.lower().endswith('.zip'):
+            file_path += '.zip'
+
+        # Salinan diambil di thread GUI; isian dibuat dan dirender di latar
+        df = df.copy()
+        tunggakan = self.tunggakan['Bulan Tunggakan'].copy() if self.tunggakan is not None else None
+        format = format.lower()
+        aksi = pengukur.lanjutkan()
+
+        def buat(konteks):
+            with pengukur.fase('transform', aksi):
+                dokumen = siapkan_dokumen(df, tunggakan)
+            if not dokumen:
+                return 0, 0
+            mulai = time.perf_counter()
+            with pengukur.fase('write', aksi), closing(buat_dokumen_bertahap(dokumen, file_path, format)) as bertahap:
+                for jumlah, total in bertahap:
+                    konteks.cek_batal()
+                    konteks.progres(jumlah * 100 / total, f"{jumlah} dari {total} dokumen")
+            return len(dokumen), time.perf_counter() - mulai
+
+        def selesai(hasil):
+            jumlah, waktu = hasil
+            with pengukur.teruskan(aksi), pengukur.fase('dialog'):
+                if not jumlah:
+                    QMessageBox.information(self, "Info", "Tidak ada penghuni Lunas atau Menunggak.")
+                    return
+                QMessageBox.information(self, "Sukses",
+                    f"{jumlah} dokumen disimpan di:\n{file_path}\n\n({jumlah / max(waktu, 1e-6):.0f} dokumen/detik)")
+            self.statusBar().showMessage(f"{jumlah} dokumen disimpan di {file_path}", 3000)
+
+        def gagal(pesan):
+            with pengukur.teruskan(aksi), pengukur.fase('dialog'):
+                QMessageBox.critical(self, "Error", f"Gagal membuat dokumen: {pesan}")
+            self.statusBar().showMessage("Gagal membuat dokumen", 3000)
+
+        def dibatalkan():
+            with pengukur.teruskan(aksi):
+                self.statusBar().showMessage("Pembuatan dokumen dibatalkan", 3000)
+
+        self.jobs.jalankan("Membuat dokumen", buat, selesai=selesai, gagal=gagal, dibatalkan=dibatalkan)
+
+    def kirim_pengingat(self):
+        if not REMINDER_GATEWAY:
+            QMessageBox.warning(self, "Peringatan",
+                "Gateway WhatsApp belum diatur (KOST_WA_GATEWAY)!")
+            return
+
+        df = pilih_penunggak(self.store.data, self.tunggakan).copy()
+        if df.empty:
+            QMessageBox.information(self, "Info", "Tidak ada penghuni yang menunggak.")
             return
 
-        no_kamar = self.table.item(selected_row, 0).text()
-        
         reply = QMessageBox.question(
-            self, 'Konfirmasi', 
-            f'Apakah Anda yakin ingin menghapus data kamar {no_kamar}?',
+            self, 'Konfirmasi',
+            f'Kirim pengingat pembayaran ke {len(df)} penghuni yang menunggak?',
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No
         )
-        
-        if reply == QMessageBox.Yes:
-            df = load_data()
-            df = df[df['No Kamar'].str.strip().str.upper() != no_kamar.strip().upper()]
-            
-            if save_data(df):
-                QMessageBox.information(self, "Sukses", "Data berhasil dihapus!")
-                self.statusBar().showMessage(f"Data kamar {no_kamar} berhasil dihapus", 3000)
-                self.tampilkan_data()
-                self.clear_form()
-            else:
-                QMessageBox.critical(self, "Error", "Gagal menghapus data!")
-                self.statusBar().showMessage("Gagal menghapus data", 3000)
+        if reply != QMessageBox.Yes:
+            return
+
+        tunggakan = self.tunggakan.copy() if self.tunggakan is not None else None
+
+        def kirim(konteks):
+            # Outbox mencegah pesan ganda bila pengiriman diulang atau aplikasi restart
+            outbox = Outbox()
+            try:
+                outbox.masukkan(df, tunggakan)
+                return asyncio.run(kirim_outbox(
+                    outbox,
+                    progres=lambda n, total: konteks.progres(n * 100 / total, f"{n}/{total} pengingat"),
+                    batal=konteks.dibatalkan,
+                ))
+            finally:
+                outbox.close()
+
+        def selesai(hasil):
+            QMessageBox.information(self, "Pengingat",
+                f"Terkirim: {hasil['terkirim']}\nGagal: {hasil['gagal']}\n"
+                f"Belum dikirim: {hasil['total'] - hasil['terkirim'] - hasil['gagal']}")
+            self.statusBar().showMessage(f"{hasil['terkirim']} pengingat terkirim", 3000)
+
+        def gagal(pesan):
+            QMessageBox.critical(self, "Error", f"Gagal mengirim pengingat: {pesan}")
+            self.statusBar().showMessage("Gagal mengirim pengingat", 3000)
 
+        self.jobs.jalankan("Mengirim pengingat", kirim, selesai=selesai, gagal=gagal)
+
+    @diukur()
     def import_data(self):
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Pilih File Data", "", 
-            "Excel Files (*.xlsx *.xls);;CSV Files (*.csv)"
-        )
+        with pengukur.fase('dialog'):
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, "Pilih File Data", "", 
+                "Excel Files (*.xlsx *.xls);;CSV Files (*.csv)"
+            )
 
         if not file_path:
             return
 
-        try:
-            if file_path.endswith(('.xlsx', '.xls')):
-                new_data = pd.read_excel(file_path, dtype={'No Kamar': str, 'Nomor WhatsApp': str})
-            elif file_path.endswith('.csv'):
-                new_data = pd.read_csv(file_path, dtype={'No Kamar': str, 'Nomor WhatsApp': str})
-            else:
-                QMessageBox.warning(self, "Peringatan", "Format file tidak didukung!")
-                return
+        if not file_path.endswith(('.xlsx', '.xls', '.csv')):
+            QMessageBox.warning(self, "Peringatan", "Format file tidak didukung!")
+            return
 
-            required_columns = [
-                'No Kamar', 'Nama Penghuni', 'Nomor WhatsApp', 'Tanggal Masuk',
-                'Status Kamar', 'Status Pembayaran', 'Harga Kamar'
-            ]
-            
-            if not all(col in new_data.columns for col in required_columns):
-                QMessageBox.warning(self, "Peringatan", 
-                    "File tidak memiliki semua kolom yang diperlukan!")
-                return
+        # File dibaca bertahap dan dibandingkan dengan sidik kamar di thread
+        # latar. Perbedaannya ditampilkan dulu; hanya kamar baru/berubah yang
+        # digabung dan disimpan setelah dikonfirmasi.
+        sidik = self.store.sidik()
+        aksi = pengukur.lanjutkan()
 
-            current_data = load_data()
-            combined_data = pd.concat([current_data, new_data], ignore_index=True)
-            combined_data = combined_data.drop_duplicates('No Kamar', keep='last')
-            
-            if save_data(combined_data):
-                QMessageBox.information(self, "Sukses", "Data berhasil diimpor!")
-                self.statusBar().showMessage("Data berhasil diimpor", 3000)
-                self.tampilkan_data()
-            else:
-                QMessageBox.critical(self, "Error", "Gagal menyimpan data yang diimpor!")
-                self.statusBar().showMessage("Gagal mengimpor data", 3000)
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Terjadi kesalahan saat mengimpor: {str(e)}")
-            self.statusBar().showMessage("Gagal mengimpor data", 3000)
+        def baca(konteks):
+            ditolak = dibaca = 0
+
+            def valid():
+                # Setiap chunk langsung dibandingkan oleh bandingkan_impor, jadi
+                # baris yang tidak berubah tidak pernah ditampung. Fase
+                # transform mencakup validasi dan perbandingan chunk itu.
+                nonlocal ditolak, dibaca
+                for chunk, progres in pengukur.iterasi('read', baca_bertahap(file_path), aksi):
+                    konteks.cek_batal()
+                    with pengukur.fase('transform', aksi):
+                        bagian, jumlah_ditolak = validasi_chunk(chunk)
+                        ditolak += jumlah_ditolak
+                        dibaca += len(chunk)
+                        yield bagian
+                    konteks.progres(progres * 100 if progres >= 0 else -1, f"{dibaca} baris dibaca")
+
+            masuk, beda = bandingkan_impor(valid(), sidik)
+            return masuk, beda, ditolak
 
-    def export_data(self):
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Simpan Data", "", 
-            "Excel Files (*.xlsx);;All Files (*)"
+        def selesai(hasil):
+            with pengukur.teruskan(aksi):
+                self.import_selesai(*hasil)
+
+        def gagal(pesan):
+            with pengukur.teruskan(aksi):
+                self.import_gagal(pesan)
+
+        def dibatalkan():
+            self.statusBar().showMessage("Import dibatalkan, tidak ada data yang diubah", 3000)
+
+        self.jobs.jalankan("Mengimpor data", baca, selesai=selesai, gagal=gagal, dibatalkan=dibatalkan)
+
+    def import_selesai(self, masuk, beda, ditolak):
+        def daftar(kamar, batas=10):
+            lebih = f" dan {len(kamar) - batas} lainnya" if len(kamar) > batas else ""
+            return f" ({', '.join(kamar[:batas])}{lebih})" if kamar else ""
+
+        pesan = (
+            f"Ditambahkan: {len(beda['baru'])}{daftar(beda['baru'])}\n"
+            f"Diupdate: {len(beda['berubah'])}{daftar(beda['berubah'])}\n"
+            f"Tidak berubah: {len(beda['sama'])}\n"
+            f"Ditolak: {ditolak}"
         )
+        if not len(masuk):
+            with pengukur.fase('dialog'):
+                QMessageBox.information(self, "Import", f"Tidak ada perubahan dari file ini.\n\n{pesan}")
+            self.statusBar().showMessage("Import: tidak ada perubahan", 3000)
+            return
+        with pengukur.fase('dialog'):
+            reply = QMessageBox.question(
+                self, "Konfirmasi Import", f"{pesan}\n\nTerapkan perubahan ini?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            self.statusBar().showMessage("Import dibatalkan, tidak ada data yang diubah", 3000)
+            return
+        with pengukur.fase('transform'):
+            ditambahkan, diupdate = self.store.merge(masuk, "Import data")
+        with pengukur.fase('render'):
+            self.tampilkan_data()
+        self.simpan_data()
+        pesan = f"Ditambahkan: {ditambahkan}\nDiupdate: {diupdate}\nDitolak: {ditolak}"
+        peringatan = self.ringkasan_whatsapp()
+        if peringatan:
+            pesan += f"\n\n{peringatan}"
+        with pengukur.fase('dialog'):
+            QMessageBox.information(self, "Sukses", f"Data berhasil diimpor!\n\n{pesan}")
+        self.statusBar().showMessage("Data berhasil diimpor", 3000)
+
+    def import_gagal(self, pesan):
+        # Belum ada yang digabung ke store sebelum dikonfirmasi
+        with pengukur.fase('dialog'):
+            QMessageBox.critical(self, "Error", f"Terjadi kesalahan saat mengimpor: {pesan}")
+        self.statusBar().showMessage("Gagal mengimpor data", 3000)
+
+    @diukur()
+    def export_data(self, perubahan=False):
+        with pengukur.fase('dialog'):
+            file_path, filter_dipilih = QFileDialog.getSaveFileName(
+                self, "Simpan Data", "",
+                "Excel Files (*.xlsx);;CSV Files (*.csv);;Parquet Files (*.parquet);;All Files (*)"
+            )
 
         if not file_path:
             return
 
-        if not file_path.endswith('.xlsx'):
-            file_path += '.xlsx'
+        if not file_path.lower().endswith(FORMAT_EKSPOR):
+            ekstensi = {'CSV': '.csv', 'Parquet': '.parquet'}.get(filter_dipilih.split()[0], '.xlsx')
+            file_path += ekstensi
 
-        try:
-            df = load_data()
-            df.to_excel(file_path, index=False)
-            QMessageBox.information(self, "Sukses", f"Data berhasil diekspor ke:\n{file_path}")
+        df = None
+        backend = self.store.backend
+        if not perubahan:
+            # Salinan diambil di thread GUI agar perubahan berikutnya tidak ikut tertulis
+            with pengukur.fase('read'):
+                df = self.store.data.copy()
+        aksi = pengukur.lanjutkan()
+
+        def tulis(konteks):
+            data, versi = df, None
+            if perubahan:
+                riwayat = riwayat_backend(backend)
+                with pengukur.fase('read', aksi):
+                    data, versi = ambil_perubahan(backend, riwayat.terakhir())
+            with pengukur.fase('write', aksi):
+                for progres in ekspor_bertahap(data, file_path):
+                    konteks.cek_batal()
+                    konteks.progres(progres * 100, f"{int(progres * len(data))} dari {len(data)} baris")
+            if perubahan:
+                riwayat.catat(versi)
+            return len(data)
+
+        def selesai(jumlah):
+            with pengukur.teruskan(aksi), pengukur.fase('dialog'):
+                QMessageBox.information(self, "Sukses", f"{jumlah} baris berhasil diekspor ke:\n{file_path}")
             self.statusBar().showMessage(f"Data berhasil diekspor ke {file_path}", 3000)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Gagal mengekspor data: {str(e)}")
+
+        def gagal(pesan):
+            with pengukur.teruskan(aksi), pengukur.fase('dialog'):
+                QMessageBox.critical(self, "Error", f"Gagal mengekspor data: {pesan}")
             self.statusBar().showMessage("Gagal mengekspor data", 3000)
 
-    def save_data_manual(self):
-        if save_data(load_data()):
-            QMessageBox.information(self, "Sukses", "Data berhasil disimpan!")
-            self.statusBar().showMessage("Data berhasil disimpan", 3000)
+        def dibatalkan():
+            with pengukur.teruskan(aksi):
+                self.statusBar().showMessage("Ekspor dibatalkan", 3000)
+
+        def mulai():
+            self.jobs.jalankan("Mengekspor data", tulis, selesai=selesai, gagal=gagal, dibatalkan=dibatalkan)
+
+        if perubahan:
+            # Perubahan dibaca dari database, jadi yang belum tersimpan ditulis
+            # dulu lewat penyimpanan biasa; ekspor dimulai setelah berhasil
+            self.simpan_data(setelah=mulai)
         else:
-            QMessageBox.critical(self, "Error", "Gagal menyimpan data!")
-            self.statusBar().showMessage("Gagal menyimpan data", 3000)
+            mulai()
+
+    def save_data_manual(self):
+        self.simpan_data(force=True, pesan_sukses="Data berhasil disimpan!")
 
     def clear_form(self):
         self.input_nama_penghuni.clear()
@@ -656,7 +1542,22 @@ class KostApp(QMainWindow):
         self.combo_harga_kamar.setCurrentIndex(0)
 
     def closeEvent(self, event):
-        save_data(load_data())
+        # Pekerjaan latar lain (kirim pengingat, dokumen, ekspor, impor)
+        # dibatalkan; hanya penyimpanan yang sedang berjalan ditunggu, tanpa
+        # menjalankan callback-nya. Perubahan yang dibawanya ditandai lagi
+        # dan ditulis langsung bersama sisa perubahan, jadi tidak ada yang
+        # hilang bila penyimpanan itu gagal.
+        self.menutup = True
+        self.jobs.batal_semua()
+        self.jobs.tunggu_thread("Menyimpan data")
+        if self.perubahan_berjalan is not None:
+            self.store.kembalikan_perubahan(self.perubahan_berjalan)
+            self.perubahan_berjalan = None
+        if self.store.backend is not None:
+            self.store.flush()
+        if pengukur.aktif:
+            pengukur.hentikan_profil()
+            pengukur.simpan()
         event.accept()
 
 if __name__ == '__main__':
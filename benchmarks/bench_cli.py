@@ -0,0 +1,45 @@
+# Mengukur waktu cold start cli.py (proses Python baru setiap kali) dan
+# memastikan Qt tidak ikut diimpor.
+#
+#   python benchmarks/bench_cli.py [ulangan]
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CLI = os.path.join(ROOT, 'cli.py')
+
+
+def ukur(argumen, ulangan, cwd):
+    waktu = []
+    for _ in range(ulangan):
+        mulai = time.perf_counter()
+        subprocess.run([sys.executable, CLI] + argumen, cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        waktu.append(time.perf_counter() - mulai)
+    return statistics.median(waktu)
+
+
+def modul_diimpor(argumen, cwd):
+    hasil = subprocess.run([sys.executable, '-X', 'importtime', CLI] + argumen, cwd=cwd,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return {baris.rsplit('|', 1)[-1].strip() for baris in hasil.stderr.splitlines() if '|' in baris}
+
+
+def main():
+    ulangan = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as folder:
+        subprocess.run([sys.executable, CLI, 'upsert', '1A', '--nama', 'Contoh', '--whatsapp', '0812',
+                        '--status-kamar', 'Sendiri', '--status-pembayaran', 'Lunas'],
+                       cwd=folder, check=True, stdout=subprocess.DEVNULL)
+        print(f"cli.py --help : {ukur(['--help'], ulangan, folder) * 1000:.0f} ms (median {ulangan}x)")
+        print(f"cli.py list   : {ukur(['list'], ulangan, folder) * 1000:.0f} ms (median {ulangan}x)")
+        qt = sorted(m for m in modul_diimpor(['list'], folder) if m.startswith('PyQt5'))
+        print(f"modul Qt diimpor: {', '.join(qt) if qt else 'tidak ada'}")
+
+
+if __name__ == '__main__':
+    main()
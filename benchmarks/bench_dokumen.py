@@ -0,0 +1,54 @@
+# Kecepatan membuat kwitansi/surat teguran (dokumen per detik) pada data
+# sintetis, ke folder dan ke arsip zip, tanpa pool dan dengan process pool
+# beberapa ukuran.
+#
+#   python benchmarks/bench_dokumen.py [jumlah] [--proses 1 2 4] [--format html pdf]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import catalog
+from dataset import buat_katalog, buat_kost
+from dokumen import FORMAT_DOKUMEN, buat_dokumen_bertahap, siapkan_dokumen
+from store import KostStore
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('jumlah', type=int, nargs='?', default=10000, help="jumlah kamar (default 10000)")
+    parser.add_argument('--proses', type=int, nargs='+', default=[1, 2, os.cpu_count() or 1])
+    parser.add_argument('--format', nargs='+', default=list(FORMAT_DOKUMEN), choices=FORMAT_DOKUMEN)
+    args = parser.parse_args()
+
+    catalog._katalog = buat_katalog(args.jumlah)
+    store = KostStore(muat=False)
+    store.isi(buat_kost(catalog._katalog))
+
+    mulai = time.perf_counter()
+    dokumen = siapkan_dokumen(store.data)
+    print(f"{args.jumlah:,} kamar, {len(dokumen):,} dokumen, CPU: {os.cpu_count()}, "
+          f"siapkan isian {time.perf_counter() - mulai:.2f} s")
+
+    folder = tempfile.mkdtemp(prefix='bench_dokumen_')
+    try:
+        for format in args.format:
+            for tujuan in ('folder', 'zip'):
+                for proses in sorted(set(args.proses)):
+                    path = os.path.join(folder, f'{format}_{proses}' + ('.zip' if tujuan == 'zip' else ''))
+                    mulai = time.perf_counter()
+                    for selesai, total in buat_dokumen_bertahap(dokumen, path, format, proses):
+                        pass
+                    waktu = time.perf_counter() - mulai
+                    print(f"{format:<5} {tujuan:<7} proses={proses:<3} {waktu:7.2f} s  "
+                          f"{selesai / waktu:9.0f} dokumen/detik")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
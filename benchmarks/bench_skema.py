@@ -0,0 +1,75 @@
+# Membandingkan skema kolom di KostStore (categorical, nomor WhatsApp
+# int64) dengan representasi lama (semua kolom teks): memori per kolom,
+# waktu filter status dan waktu membaca satu kamar untuk form.
+#
+#   python benchmarks/bench_skema.py [jumlah]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import catalog
+from dataset import buat_katalog, buat_kost
+from store import KOLOM_KATEGORI, KostStore, data_teks
+
+
+def representasi_lama(df):
+    # Seperti sebelum skema: kolom teks bertipe str, tanggal dan harga sama
+    df = data_teks(df)
+    for kolom in KOLOM_KATEGORI:
+        df[kolom] = df[kolom].astype(str)
+    return df
+
+
+def ukur(fungsi, ulang=20):
+    waktu = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        waktu.append(time.perf_counter() - mulai)
+    return min(waktu)
+
+
+def filter_status(df):
+    return df[(df['Status Pembayaran'] == 'Menunggak') & (df['Status Kamar'] != 'Kamar Kosong')]
+
+
+def main():
+    jumlah = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    catalog._katalog = buat_katalog(jumlah)
+    store = KostStore(muat=False)
+    store.isi(buat_kost(catalog._katalog))
+    baru = store.data
+    lama = representasi_lama(baru)
+
+    print(f"Jumlah kamar: {jumlah:,}")
+    print(f"{'Kolom':<20}{'lama (MB)':>12}{'skema (MB)':>12}")
+    mem_lama = lama.memory_usage(deep=True)
+    mem_baru = baru.memory_usage(deep=True)
+    # Kolom categorical dihitung kodenya saja; daftar kategori dipakai
+    # bersama semua DataFrame dan dicetak terpisah
+    bersama = 0
+    for kolom in KOLOM_KATEGORI:
+        kategori = baru[kolom].cat.categories
+        mem_baru[kolom] = baru[kolom].cat.codes.nbytes
+        bersama += kategori.memory_usage(deep=True)
+    for kolom in mem_lama.index:
+        print(f"{kolom:<20}{mem_lama[kolom] / 1e6:>12.2f}{mem_baru[kolom] / 1e6:>12.2f}")
+    print(f"{'Total':<20}{mem_lama.sum() / 1e6:>12.2f}{mem_baru.sum() / 1e6:>12.2f}")
+    print(f"{'Kategori bersama':<20}{'':>12}{bersama / 1e6:>12.2f}")
+
+    assert len(filter_status(lama)) == len(filter_status(baru))
+    kamar = baru.index[len(baru) // 2]
+    for judul, fungsi_lama, fungsi_baru in [
+        ("Filter status", lambda: filter_status(lama), lambda: filter_status(baru)),
+        ("Filter No Kamar", lambda: lama[lama['No Kamar'] == kamar], lambda: baru[baru['No Kamar'] == kamar]),
+        ("Satu kamar (form)", lambda: store.get(kamar), lambda: store.rekaman(kamar)),
+    ]:
+        waktu_lama, waktu_baru = ukur(fungsi_lama), ukur(fungsi_baru)
+        print(f"{judul:<20}{waktu_lama * 1000:>10.3f} ms{waktu_baru * 1000:>10.3f} ms "
+              f"({waktu_lama / waktu_baru:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
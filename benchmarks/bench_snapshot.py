@@ -0,0 +1,92 @@
+# Pertumbuhan penyimpanan snapshot historis (snapshot.py) dan kecepatan
+# pertanyaan "data pada tanggal" dan deret hunian: data sintetis disimulasikan
+# beberapa tahun dengan satu snapshot per hari. Setiap hari sebagian penghuni
+# berganti status pembayaran dan sebagian kecil kamar berganti penghuni.
+# Snapshot dicatat seperti saat data disimpan: hanya kamar yang berubah hari
+# itu beserta sidik dari store, lihat KostStore.ambil_perubahan().
+#
+#   python benchmarks/bench_snapshot.py [jumlah] [--tahun 3] [--ubah 0.02] [--pindah 0.002]
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import catalog
+from dataset import buat_katalog, buat_kost
+from snapshot import SnapshotKamar
+from store import KostStore
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('jumlah', type=int, nargs='?', default=10000, help="jumlah kamar (default 10000)")
+    parser.add_argument('--tahun', type=int, default=3, help="lama riwayat yang disimulasikan")
+    parser.add_argument('--ubah', type=float, default=0.02, help="bagian kamar yang status pembayarannya berubah per hari")
+    parser.add_argument('--pindah', type=float, default=0.002, help="bagian kamar yang berganti penghuni per hari")
+    args = parser.parse_args()
+
+    catalog._katalog = buat_katalog(args.jumlah)
+    store = KostStore(muat=False)
+    store.isi(buat_kost(catalog._katalog))
+    rng = np.random.default_rng(0)
+    kamar = np.array(store.data.index, dtype=object)
+
+    folder = tempfile.mkdtemp(prefix='bench_snapshot_')
+    path = os.path.join(folder, 'snapshot.db')
+    snapshot = SnapshotKamar(path)
+    awal = datetime.datetime(2020, 1, 1, 21)
+    hari = 365 * args.tahun
+    waktu_catat = []
+    for i in range(hari):
+        ubah = rng.choice(kamar, int(args.jumlah * args.ubah), replace=False)
+        separuh = len(ubah) // 2
+        store.perbarui(list(ubah[:separuh]), {'Status Pembayaran': 'Menunggak'})
+        store.perbarui(list(ubah[separuh:]), {'Status Pembayaran': 'Lunas'})
+        pindah = list(rng.choice(kamar, max(int(args.jumlah * args.pindah), 1), replace=False))
+        store.perbarui(pindah, {'Nama Penghuni': f"Penghuni {i}", 'Tanggal Masuk': awal + datetime.timedelta(days=i)})
+        waktu = awal + datetime.timedelta(days=i)
+        berubah = sorted(set(ubah) | set(pindah))
+        sidik = store.sidik()
+        mulai = time.perf_counter()
+        if i == 0:
+            snapshot.catat(store.data, store.digest, waktu)
+        else:
+            snapshot.catat_perubahan(store.data.loc[berubah], [sidik[k] for k in berubah], [],
+                                     len(store), store.digest, waktu)
+        waktu_catat.append(time.perf_counter() - mulai)
+    waktu_catat = np.array(waktu_catat)
+    print(f"{args.jumlah:,} kamar, {hari} snapshot harian; catat: pertama {waktu_catat[0] * 1000:.0f} ms, "
+          f"berikutnya median {np.median(waktu_catat[1:]) * 1000:.1f} ms")
+
+    ukuran = snapshot.ukuran()
+    print(ukuran.to_string())
+    total, penuh = ukuran['Byte'].sum(), ukuran['Byte Tanpa Dedup'].sum()
+    print(f"total {total / 2**20:.1f} MiB, tanpa dedup {penuh / 2**20:.1f} MiB ({penuh / max(total, 1):.0f}x), "
+          f"file {os.path.getsize(path) / 2**20:.1f} MiB")
+
+    baru = SnapshotKamar(path)
+    for label, fungsi in [
+        ("pada (tengah riwayat)", lambda: baru.pada(awal + datetime.timedelta(days=hari // 2))),
+        ("pada (terbaru)", lambda: baru.pada(awal + datetime.timedelta(days=hari))),
+        ("riwayat satu kamar", lambda: baru.kamar(kamar[0])),
+        ("deret harian", lambda: baru.deret(awal.date(), awal.date() + datetime.timedelta(days=hari - 1))),
+        ("deret bulanan", lambda: baru.deret(awal.date(), awal.date() + datetime.timedelta(days=hari - 1), 'ME')),
+    ]:
+        mulai = time.perf_counter()
+        hasil = fungsi()
+        print(f"{label:<22} {(time.perf_counter() - mulai) * 1000:8.1f} ms  {len(hasil):,} baris")
+
+    os.remove(path)
+    for sisa in os.listdir(folder):
+        os.remove(os.path.join(folder, sisa))
+    os.rmdir(folder)
+
+
+if __name__ == '__main__':
+    main()
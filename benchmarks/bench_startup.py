@@ -0,0 +1,53 @@
+# Mengukur time-to-first-paint aplikasi (platform Qt offscreen) untuk data
+# xlsx berukuran N kamar: sekali tanpa cache (read_excel) dan sekali dengan
+# cache biner yang sudah ada, serta dengan backend SQLite.
+#
+#   python benchmarks/bench_startup.py [jumlah_kamar]
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def buat_data(folder, jumlah):
+    os.makedirs(os.path.join(folder, 'data'), exist_ok=True)
+    df = pd.DataFrame({
+        'No Kamar': [f'K{i}' for i in range(jumlah)],
+        'Nama Penghuni': [f'Penghuni {i}' for i in range(jumlah)],
+        'Nomor WhatsApp': [f'6281{i:08d}' for i in range(jumlah)],
+        'Tanggal Masuk': '01/01/2024',
+        'Status Kamar': 'Sendiri',
+        'Status Pembayaran': 'Lunas',
+        'Harga Kamar': 'Rp. 500.000',
+    })
+    df.to_excel(os.path.join(folder, 'data', 'kost_data.xlsx'), index=False)
+
+
+def first_paint(folder, backend):
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', KOST_UKUR_STARTUP='keluar', KOST_STORAGE=backend)
+    hasil = subprocess.run([sys.executable, os.path.join(ROOT, 'app.py')], cwd=folder, env=env,
+                           capture_output=True, text=True, timeout=600)
+    cocok = re.search(r'time-to-first-paint: ([\d.]+) ms', hasil.stdout)
+    if not cocok:
+        raise RuntimeError(hasil.stdout + hasil.stderr)
+    return float(cocok.group(1))
+
+
+def main():
+    jumlah = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    with tempfile.TemporaryDirectory() as folder:
+        buat_data(folder, jumlah)
+        print(f"Kamar                          : {jumlah:,}")
+        print(f"Excel tanpa cache (read_excel) : {first_paint(folder, 'excel'):.0f} ms")
+        print(f"Excel dengan cache biner       : {first_paint(folder, 'excel'):.0f} ms")
+        print(f"SQLite (migrasi pertama)       : {first_paint(folder, 'sqlite'):.0f} ms")
+        print(f"SQLite                         : {first_paint(folder, 'sqlite'):.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
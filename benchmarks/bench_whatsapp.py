@@ -0,0 +1,49 @@
+# Membandingkan format_whatsapp_number (per baris) dengan
+# format_whatsapp_series (vektor) pada 1 juta nomor.
+#
+#   python benchmarks/bench_whatsapp.py [jumlah]
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from store import cek_whatsapp, format_whatsapp_number, format_whatsapp_series
+
+
+def buat_nomor(jumlah, seed=0):
+    rng = np.random.default_rng(seed)
+    angka = pd.Series(rng.integers(10**8, 10**11, jumlah).astype(str))
+    awalan = pd.Series(rng.choice(['0', '62', '+62 ', ''], jumlah))
+    nomor = awalan + angka
+    nomor[rng.random(jumlah) < 0.05] = ''
+    return nomor
+
+
+def ukur(fungsi):
+    mulai = time.perf_counter()
+    hasil = fungsi()
+    return hasil, time.perf_counter() - mulai
+
+
+def main():
+    jumlah = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    nomor = buat_nomor(jumlah)
+
+    per_baris, waktu_baris = ukur(lambda: nomor.apply(format_whatsapp_number))
+    vektor, waktu_vektor = ukur(lambda: format_whatsapp_series(nomor))
+    (tidak_valid, duplikat), waktu_cek = ukur(lambda: cek_whatsapp(vektor))
+
+    assert per_baris.equals(vektor), "Hasil vektor berbeda dengan per baris"
+    print(f"Jumlah nomor          : {jumlah:,}")
+    print(f"Per baris (apply)     : {waktu_baris:.3f} s")
+    print(f"Vektor                : {waktu_vektor:.3f} s ({waktu_baris / waktu_vektor:.1f}x)")
+    print(f"Cek panjang/duplikat  : {waktu_cek:.3f} s "
+          f"({int(tidak_valid.sum()):,} tidak valid, {int(duplikat.sum()):,} duplikat)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Bandingkan dua hasil benchmarks/run.py. Keluar dengan kode 1 jika ada kasus
+# yang lebih lambat dari baseline melebihi ambang (default 20%).
+#
+#   python benchmarks/compare.py baseline.json hasil.json --ambang 0.2
+import argparse
+import json
+import sys
+
+
+def baca(path):
+    with open(path) as f:
+        return json.load(f)['hasil']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('baseline')
+    parser.add_argument('sekarang')
+    parser.add_argument('--ambang', type=float, default=0.2, help="batas perlambatan relatif (0.2 = 20%%)")
+    parser.add_argument('--metrik', choices=['median', 'min'], default='median')
+    args = parser.parse_args(argv)
+
+    lama = baca(args.baseline)
+    baru = baca(args.sekarang)
+    regresi = []
+    print(f"{'kasus':<50} {'baseline':>12} {'sekarang':>12} {'rasio':>8}")
+    for kasus in sorted(set(lama) & set(baru)):
+        a = lama[kasus][args.metrik]
+        b = baru[kasus][args.metrik]
+        rasio = b / a if a > 0 else float('inf')
+        tanda = ''
+        if rasio > 1 + args.ambang:
+            tanda = '  LEBIH LAMBAT'
+            regresi.append(kasus)
+        print(f"{kasus:<50} {a * 1000:10.3f}ms {b * 1000:10.3f}ms {rasio:8.2f}{tanda}")
+
+    for kasus in sorted(set(lama) ^ set(baru)):
+        print(f"{kasus:<50} hanya ada di {'baseline' if kasus in lama else 'hasil sekarang'}")
+
+    if regresi:
+        print(f"\n{len(regresi)} kasus melambat lebih dari {args.ambang:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# Pembuat data kost sintetis untuk benchmark: katalog kamar multi-gedung
+# dan tabel penghuni dengan proporsi status yang realistis.
+import string
+
+import numpy as np
+import pandas as pd
+
+from catalog import KAMAR_BAWAAN, KatalogKamar
+from store import harga_kamar
+
+NAMA_DEPAN = ["Budi", "Siti", "Agus", "Dewi", "Rudi", "Ani", "Joko", "Rina", "Eko", "Putri",
+              "Andi", "Sri", "Hadi", "Wati", "Bayu", "Lestari", "Dimas", "Ayu", "Fajar", "Nur"]
+NAMA_BELAKANG = ["Santoso", "Wijaya", "Saputra", "Lestari", "Pratama", "Hidayat", "Kusuma",
+                 "Nugroho", "Siregar", "Harahap", "Simanjuntak", "Gunawan", "Setiawan", "Rahayu"]
+
+
+def buat_katalog(jumlah):
+    # 40 kamar pertama sama dengan katalog bawaan, sisanya dibagi ke gedung
+    # lain dengan 10 lantai x 26 kamar per gedung
+    if jumlah <= len(KAMAR_BAWAAN):
+        return KatalogKamar([{'No Kamar': k, 'Gedung': 'Utama', 'Lantai': k[0]}
+                             for k in KAMAR_BAWAAN[:jumlah]])
+    kamar = []
+    for i in range(jumlah):
+        gedung, sisa = divmod(i, 260)
+        lantai, nomor = divmod(sisa, 26)
+        kamar.append({'No Kamar': f"G{gedung + 1}-{lantai + 1}{string.ascii_uppercase[nomor]}",
+                      'Gedung': f"G{gedung + 1}", 'Lantai': str(lantai + 1)})
+    return KatalogKamar(kamar)
+
+
+def buat_kost(katalog_kamar, seed=0):
+    rng = np.random.default_rng(seed)
+    jumlah = len(katalog_kamar)
+    kode = np.array(katalog_kamar.kode, dtype=object)
+    rng.shuffle(kode)
+
+    status_kamar = rng.choice(["Sendiri", "Berdua", "Kamar Kosong"], jumlah, p=[0.7, 0.15, 0.15])
+    kosong = status_kamar == "Kamar Kosong"
+    nama = (pd.Series(rng.choice(NAMA_DEPAN, jumlah)) + ' '
+            + pd.Series(rng.choice(NAMA_BELAKANG, jumlah)) + ' '
+            + pd.Series(rng.integers(1, 10**6, jumlah).astype(str)))
+    wa = '0812' + pd.Series(rng.integers(10**7, 10**8, jumlah).astype(str))
+    hari = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 365 * 6, jumlah), unit='D')
+
+    df = pd.DataFrame({
+        'No Kamar': kode,
+        'Nama Penghuni': nama.where(~kosong, ''),
+        'Nomor WhatsApp': wa.where(~kosong, ''),
+        'Tanggal Masuk': pd.Series(hari.strftime('%d/%m/%Y')).where(~kosong, ''),
+        'Status Kamar': status_kamar,
+        'Status Pembayaran': pd.Series(rng.choice(["Lunas", "Menunggak"], jumlah, p=[0.8, 0.2])).where(~kosong, ''),
+        'Harga Kamar': pd.Series(rng.choice(harga_kamar, jumlah)).where(~kosong, ''),
+    })
+    return df
@@ -0,0 +1,215 @@
+# Benchmark jalur data dan rendering pada data sintetis.
+#
+#   python benchmarks/run.py                          # 40, 10k, 100k kamar
+#   python benchmarks/run.py --ukuran 40 10000 100000 1000000 -o hasil.json
+#   python benchmarks/compare.py baseline.json hasil.json --ambang 0.2
+#
+# Hasil disimpan sebagai JSON: median/min detik per kasus, dengan nama kasus
+# "jalur[ukuran]" agar bisa dibandingkan antar-run oleh compare.py.
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pandas as pd
+
+import catalog
+from dataset import buat_katalog, buat_kost
+from exporter import ekspor_bertahap
+from storage import SqliteBackend
+from store import KostStore, load_data, save_data, urutkan_kamar
+
+# Target median (detik) yang diperiksa setelah semua kasus selesai; run.py
+# keluar dengan kode 1 bila ada yang terlewati. Pencarian nama dijalankan
+# setiap ketikan, jadi pencarian posisinya harus di bawah 1 ms pada 100 ribu
+# kamar untuk kata kunci 1 huruf, 2 huruf maupun nama depan.
+TARGET = {
+    'cari_posisi_1huruf[100000]': 0.001,
+    'cari_posisi_2huruf[100000]': 0.001,
+    'cari_posisi[100000]': 0.001,
+}
+
+
+def ukur(fungsi, ulang, siapkan=None):
+    waktu = []
+    for _ in range(ulang):
+        arg = siapkan() if siapkan else None
+        mulai = time.perf_counter()
+        fungsi(arg) if siapkan else fungsi()
+        waktu.append(time.perf_counter() - mulai)
+    return {'median': statistics.median(waktu), 'min': min(waktu), 'ulang': ulang}
+
+
+def ulang_untuk(jumlah):
+    return 7 if jumlah <= 10000 else 3 if jumlah <= 100000 else 1
+
+
+def bench_data(jumlah, folder):
+    hasil = {}
+    ulang = ulang_untuk(jumlah)
+    catalog._katalog = buat_katalog(jumlah)
+    df = buat_kost(catalog._katalog)
+
+    backend = SqliteBackend(os.path.join(folder, f'bench_{jumlah}.db'))
+    hasil['save_data'] = ukur(lambda d: save_data(d, backend), ulang, siapkan=df.copy)
+    hasil['load_data'] = ukur(lambda: load_data(backend), ulang)
+    hasil['sort_kamar'] = ukur(urutkan_kamar, ulang, siapkan=df.copy)
+
+    store = KostStore(backend, muat=False)
+    hasil['store_isi'] = ukur(lambda: store.isi(df, backend), ulang)
+
+    nama = df.loc[df['Nama Penghuni'] != '', 'Nama Penghuni'].iloc[0].split()[0].lower()
+    kamar = df['No Kamar'].iloc[len(df) // 2]
+    hasil['cari_kamar'] = ukur(lambda: store.cari("Nomor Kamar", kamar), ulang * 10)
+    hasil['cari_nama'] = ukur(lambda: store.cari("Nama Penghuni", nama), ulang * 10)
+    # Ketikan pertama pencarian langsung: kata kunci pendek lewat bitmap,
+    # lalu posisi baris saja (tanpa membuat DataFrame hasil)
+    hasil['cari_nama_1huruf'] = ukur(lambda: store.cari("Nama Penghuni", nama[:1]), ulang * 10)
+    hasil['cari_nama_2huruf'] = ukur(lambda: store.cari("Nama Penghuni", nama[:2]), ulang * 10)
+    hasil['cari_posisi_1huruf'] = ukur(lambda: store.posisi_cari(nama[:1]), ulang * 10)
+    hasil['cari_posisi_2huruf'] = ukur(lambda: store.posisi_cari(nama[:2]), ulang * 10)
+    hasil['cari_posisi'] = ukur(lambda: store.posisi_cari(nama), ulang * 10)
+    # Cara lama cari_data sebagai pembanding
+    hasil['cari_nama_scan'] = ukur(
+        lambda: df[df['Nama Penghuni'].str.strip().str.upper().str.contains(nama.upper(), na=False)], ulang)
+
+    # Import: separuh baris sudah ada (update), separuh baru
+    awal = df.iloc[: len(df) // 2]
+    masuk = df.iloc[len(df) // 4:].copy()
+    masuk['Status Pembayaran'] = 'Lunas'
+
+    def store_awal():
+        s = KostStore(backend, muat=False)
+        s.isi(awal, backend)
+        return s
+    hasil['import_merge'] = ukur(lambda s: s.merge(masuk), ulang, siapkan=store_awal)
+    # Impor ulang file yang isinya sama: sidik baris cocok, tidak ada yang ditulis
+    hasil['import_sama'] = ukur(lambda s: (s.merge(awal), s.flush()), ulang, siapkan=store_awal)
+
+    # Aksi massal: tandai 10% kamar Lunas lalu simpan dalam satu transaksi
+    pilihan = list(df['No Kamar'].iloc[::10])
+
+    def store_penuh():
+        s = KostStore(backend, muat=False)
+        s.isi(df, backend)
+        return s
+    hasil['massal_status'] = ukur(
+        lambda s: (s.perbarui(pilihan, {'Status Pembayaran': 'Lunas'}), s.flush()), ulang, siapkan=store_penuh)
+    hasil['massal_hapus'] = ukur(
+        lambda s: (s.hapus_banyak(pilihan), s.flush()), ulang, siapkan=store_penuh)
+
+    # Undo hapus massal: baris yang dihapus dipulihkan dari riwayat
+    def store_terhapus():
+        s = store_penuh()
+        s.hapus_banyak(pilihan)
+        return s
+    hasil['undo_massal_hapus'] = ukur(lambda s: s.undo(), ulang, siapkan=store_terhapus)
+
+    # Filter gabungan lewat indeks bitmap, mask pandas sebagai pembanding,
+    # dan upsert satu kamar yang ikut memperbarui indeks
+    store = store_penuh()
+    data = store.data
+    kriteria = {'Lantai': ['2'], 'Status Pembayaran': ['Menunggak'],
+                'harga_min': 700000, 'masuk_sebelum': '2024-03-01'}
+    lantai = pd.Series([catalog._katalog.lantai(k) for k in data.index], index=data.index)
+    hasil['filter_bitmap'] = ukur(lambda: store.saring(kriteria), ulang * 10)
+    hasil['filter_mask'] = ukur(
+        lambda: data[(lantai == '2') & (data['Status Pembayaran'] == 'Menunggak')
+                     & (data['Harga Kamar'] >= 700000) & (data['Tanggal Masuk'] < '2024-03-01')], ulang * 10)
+    # Harga berganti setiap kali agar upsert tidak dilewati sebagai "tidak berubah"
+    baris = data.loc[kamar].to_dict()
+    harga = itertools.cycle([900000, 950000])
+    hasil['upsert_satu'] = ukur(lambda: store.upsert(dict(baris, **{'Harga Kamar': next(harga)})), ulang * 10)
+
+    # Ekspor bertahap per format, dan cara lama (to_excel) sebagai pembanding
+    for ekstensi in ('xlsx', 'csv', 'parquet'):
+        path = os.path.join(folder, f'ekspor.{ekstensi}')
+        hasil[f'ekspor_{ekstensi}'] = ukur(lambda: list(ekspor_bertahap(data, path)), ulang)
+    if jumlah <= 100000:
+        hasil['ekspor_to_excel'] = ukur(lambda: data.to_excel(os.path.join(folder, 'lama.xlsx'), index=False), ulang)
+    return hasil, df
+
+
+def bench_render(df, ulang):
+    from PyQt5.QtWidgets import QApplication, QTableView
+    from table_model import KostTableModel
+
+    app = QApplication.instance() or QApplication([])
+    view = QTableView()
+    model = KostTableModel()
+    view.setModel(model)
+    view.resize(1200, 700)
+    view.show()
+    app.processEvents()
+
+    # Data bertipe seperti di store (tanggal datetime, harga angka)
+    store = KostStore(muat=False)
+    store.isi(df)
+    data = store.data
+    separuh = data.iloc[: len(data) // 2]
+
+    def tampilkan(d):
+        # Sama seperti tampilkan_hasil_pencarian: perbarui model lalu lukis
+        model.set_data(d)
+        view.viewport().repaint()
+
+    hasil = {
+        'tampilkan_hasil_pencarian': ukur(lambda: tampilkan(data), ulang),
+        'tampilkan_hasil_pencarian_ubah_ukuran': ukur(
+            lambda: (tampilkan(separuh), tampilkan(data)), ulang),
+    }
+    view.close()
+    return hasil
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ukuran', type=int, nargs='+', default=[40, 10000, 100000])
+    parser.add_argument('--tanpa-render', action='store_true', help="lewati benchmark Qt")
+    parser.add_argument('-o', '--output', default=None, help="file JSON hasil")
+    args = parser.parse_args()
+
+    hasil = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for jumlah in args.ukuran:
+            data, df = bench_data(jumlah, folder)
+            if not args.tanpa_render:
+                data.update(bench_render(df, ulang_untuk(jumlah)))
+            for nama, nilai in data.items():
+                kunci = f"{nama}[{jumlah}]"
+                hasil[kunci] = nilai
+                print(f"{kunci:<50} median {nilai['median'] * 1000:10.3f} ms   min {nilai['min'] * 1000:10.3f} ms")
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), 'results', datetime.datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'waktu': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'platform': platform.platform(),
+            },
+            'hasil': hasil,
+        }, f, indent=2)
+    print(f"Hasil disimpan di {output}")
+
+    lewat = [(kunci, hasil[kunci]['median'], batas) for kunci, batas in TARGET.items()
+             if kunci in hasil and hasil[kunci]['median'] > batas]
+    for kunci, median, batas in lewat:
+        print(f"MELEWATI TARGET {kunci}: median {median * 1000:.3f} ms > {batas * 1000:.3f} ms")
+    return 1 if lewat else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import datetime
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from config import DB_PATH
+from ledger import indeks_bulan
+from store import parse_tanggal
+
+
+def _tanggal_tagih(bulan, hari):
+    # Tanggal jatuh tempo di bulan `bulan` (tahun * 12 + bulan - 1) untuk
+    # tanggal masuk `hari`; penghuni yang masuk tanggal 31 ditagih setiap
+    # akhir bulan
+    awal = (bulan.to_numpy() - 1970 * 12).astype('datetime64[M]')
+    panjang = ((awal + 1).astype('datetime64[D]') - awal.astype('datetime64[D]')).astype(int)
+    hari = np.minimum(hari.to_numpy(), panjang)
+    tanggal = awal.astype('datetime64[D]') + (hari - 1).astype('timedelta64[D]')
+    return pd.Series(tanggal.astype('datetime64[ns]'), index=bulan.index)
+
+
+def hitung_tagihan(kamar, hari_ini=None, bulan_tunggakan=None):
+    # Siklus tagihan bulanan semua penghuni dalam satu kali jalan. Tagihan
+    # jatuh tempo setiap bulan pada tanggal yang sama dengan Tanggal Masuk.
+    # Hari terlambat dihitung dari jatuh tempo tertua yang belum dibayar:
+    # bulan_tunggakan dari buku pembayaran bila ada, selain itu satu bulan
+    # untuk status Menunggak.
+    hari_ini = pd.Timestamp(hari_ini or datetime.date.today()).normalize()
+    terisi = kamar[kamar['Status Kamar'] != 'Kamar Kosong']
+    masuk = parse_tanggal(terisi['Tanggal Masuk']).dropna()
+    hari = masuk.dt.day
+
+    bulan_ini = pd.Series(hari_ini.year * 12 + hari_ini.month - 1, index=masuk.index)
+    lewat = (_tanggal_tagih(bulan_ini, hari) <= hari_ini).astype(int)
+    bulan_terakhir = bulan_ini - 1 + lewat
+    belum_mulai = masuk > hari_ini
+
+    terakhir = _tanggal_tagih(bulan_terakhir, hari).mask(belum_mulai)
+    berikut = _tanggal_tagih(bulan_terakhir + 1, hari).mask(belum_mulai, masuk)
+
+    status = terisi.loc[masuk.index, 'Status Pembayaran']
+    jumlah = pd.Series(np.where(status == 'Menunggak', 1, 0), index=masuk.index)
+    if bulan_tunggakan is not None:
+        jumlah = bulan_tunggakan.reindex(masuk.index).fillna(jumlah).astype(int)
+    jumlah = jumlah.where(~belum_mulai, 0)
+    tertua = _tanggal_tagih(bulan_terakhir - (jumlah - 1).clip(lower=0), hari)
+    terlambat = (hari_ini - tertua).dt.days.where(jumlah > 0, 0)
+
+    return pd.DataFrame({
+        'Jatuh Tempo Terakhir': terakhir,
+        'Jatuh Tempo Berikut': berikut,
+        'Hari Terlambat': terlambat.astype(int),
+    }, index=masuk.index)
+
+
+def jatuh_tempo_baru(kamar, sejak, sampai=None, pembayaran=None):
+    # Kamar berstatus Lunas yang jatuh temponya lewat setelah tanggal `sejak`
+    # dan paling lambat `sampai`. Penghuni yang membayar setelah jatuh tempo
+    # tidak dipilih lagi sampai jatuh tempo berikutnya. pembayaran: isi buku
+    # pembayaran (BukuPembayaran.load()); periode jatuh tempo yang sudah
+    # dibayar penghuni yang sama, misalnya dibayar di muka, tidak dipilih.
+    sampai = pd.Timestamp(sampai or datetime.date.today()).normalize()
+    tagihan = hitung_tagihan(kamar, sampai)
+    terakhir = tagihan['Jatuh Tempo Terakhir']
+    lunas = kamar.loc[tagihan.index, 'Status Pembayaran'] == 'Lunas'
+    # Jatuh tempo pertama (hari masuk) dibayar saat penghuni mendaftar
+    masuk = parse_tanggal(kamar.loc[tagihan.index, 'Tanggal Masuk'])
+    baru = lunas & (terakhir > masuk) & (terakhir > pd.Timestamp(sejak).normalize()) & (terakhir <= sampai)
+    if pembayaran is not None and len(pembayaran) and baru.any():
+        nama = kamar.loc[tagihan.index, 'Nama Penghuni'].astype(str).str.strip().str.upper()
+        bulan = (terakhir.dt.year * 12 + terakhir.dt.month).fillna(0).astype(int)
+        dibayar = pd.MultiIndex.from_arrays([
+            pembayaran['No Kamar'].astype(str),
+            pembayaran['Nama Penghuni'].astype(str).str.strip().str.upper(),
+            indeks_bulan(pembayaran['Periode']).fillna(0).astype(int),
+        ])
+        periode = pd.MultiIndex.from_arrays([tagihan.index.astype(str), nama, bulan])
+        baru &= ~periode.isin(dibayar)
+    return list(tagihan.index[baru])
+
+
+# Waktu pemeriksaan jatuh tempo terakhir, di tabel 'penagihan' pada database
+# yang sama, agar jatuh tempo yang lewat saat aplikasi tertutup tetap diproses
+class JadwalPenagihan:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS penagihan (
+                kunci TEXT PRIMARY KEY,
+                nilai TEXT NOT NULL
+            )
+        """)
+        return conn
+
+    def terakhir(self):
+        conn = self._connect()
+        try:
+            baris = conn.execute("SELECT nilai FROM penagihan WHERE kunci = 'terakhir'").fetchone()
+        finally:
+            conn.close()
+        return pd.Timestamp(baris[0]) if baris else None
+
+    def catat(self, waktu):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO penagihan (kunci, nilai) VALUES ('terakhir', ?) "
+                    "ON CONFLICT(kunci) DO UPDATE SET nilai = excluded.nilai",
+                    (pd.Timestamp(waktu).isoformat(),)
+                )
+        finally:
+            conn.close()
+
+    def periksa(self, kamar, sekarang=None, pembayaran=None):
+        # Pemeriksaan pertama hanya mencatat waktu, tidak mengubah status
+        # penghuni mana pun
+        sekarang = pd.Timestamp(sekarang or datetime.datetime.now())
+        sejak = self.terakhir() or sekarang
+        kamar_baru = jatuh_tempo_baru(kamar, sejak, sekarang, pembayaran)
+        self.catat(sekarang)
+        return kamar_baru
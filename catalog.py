@@ -0,0 +1,75 @@
+import csv
+import os
+
+from config import CATALOG_PATH
+
+# Dipakai bila file katalog tidak ditemukan
+KAMAR_BAWAAN = [
+    "1A", "1B", "1C", "1D", "1E", "1F", "1G", "1H", "1I", "1J",
+    "1K", "1L", "1M", "1N", "1O", "1P", "1Q", "1R",
+    "2A", "2B", "2C", "2D", "2E", "2F", "2G", "2H", "2I", "2J",
+    "2K", "2L", "2M", "2N", "2O", "2P", "2Q", "2R",
+    "3A", "3B", "3C", "3D"
+]
+
+
+class KatalogKamar:
+    def __init__(self, kamar):
+        # kamar: list of dict dengan kunci 'No Kamar', 'Gedung', 'Lantai'
+        self.kamar = kamar
+        self.kode = [k['No Kamar'] for k in kamar]
+        # Peringkat urutan dihitung sekali, pencarian berikutnya O(1)
+        self.peringkat = {kode: i for i, kode in enumerate(self.kode)}
+        self.info = {k['No Kamar']: k for k in kamar}
+        self._peringkat_series = None
+
+    def __len__(self):
+        return len(self.kode)
+
+    def __contains__(self, kode):
+        return kode in self.peringkat
+
+    def urutan(self, nilai):
+        # nilai: Series atau Index berisi nomor kamar; kamar di luar katalog
+        # ditaruh di akhir. Peringkat sebagai Series dibuat sekali, karena
+        # map() dengan dict membangun Series baru setiap kali dipanggil
+        if self._peringkat_series is None:
+            import pandas as pd
+            self._peringkat_series = pd.Series(self.peringkat, dtype='int64')
+        return nilai.map(self._peringkat_series).fillna(len(self.kode)).astype(int)
+
+    def gedung(self, kode):
+        return self.info.get(kode, {}).get('Gedung', '')
+
+    def lantai(self, kode):
+        return self.info.get(kode, {}).get('Lantai', '')
+
+
+def baca_katalog(path=CATALOG_PATH):
+    if not os.path.exists(path):
+        return KatalogKamar([{'No Kamar': kode, 'Gedung': '', 'Lantai': kode[0]} for kode in KAMAR_BAWAAN])
+
+    kamar = []
+    terlihat = set()
+    with open(path, newline='', encoding='utf-8') as f:
+        for baris in csv.DictReader(f):
+            kode = (baris.get('No Kamar') or '').strip().upper()
+            if not kode or kode in terlihat:
+                continue
+            terlihat.add(kode)
+            kamar.append({
+                'No Kamar': kode,
+                'Gedung': (baris.get('Gedung') or '').strip(),
+                'Lantai': (baris.get('Lantai') or '').strip(),
+            })
+    return KatalogKamar(kamar)
+
+
+_katalog = None
+
+def katalog():
+    # Katalog dibaca saat pertama kali dibutuhkan, lalu disimpan
+    global _katalog
+    if _katalog is None:
+        _katalog = baca_katalog()
+    return _katalog
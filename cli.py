@@ -0,0 +1,383 @@
+import time
+
+_MULAI = time.perf_counter()
+
+import argparse
+import json
+import sys
+
+# Modul berat (pandas, store, importer) baru diimpor di dalam perintah yang
+# membutuhkannya, dan Qt tidak pernah diimpor, agar skrip cron cepat mulai.
+
+
+def _store():
+    from snapshot import buat_snapshot
+    from store import KostStore
+    return KostStore(snapshot=buat_snapshot())
+
+
+def _tampilan(df):
+    # Tanggal ditulis dd/mm/yyyy seperti di tabel aplikasi, nomor WhatsApp
+    # sebagai teks
+    from store import data_teks, format_tanggal_series
+
+    df = data_teks(df) if 'Nomor WhatsApp' in df else df.copy()
+    for kolom in df.columns:
+        if str(df[kolom].dtype).startswith('datetime64'):
+            df[kolom] = format_tanggal_series(df[kolom])
+    return df
+
+
+def _tulis(df, args):
+    df = _tampilan(df)
+    if args.format == 'csv':
+        teks = df.to_csv(index=False)
+    else:
+        teks = df.to_json(orient='records', force_ascii=False, indent=2) + '\n'
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            f.write(teks)
+    else:
+        sys.stdout.write(teks)
+
+
+def _tulis_json(data):
+    sys.stdout.write(json.dumps(data, ensure_ascii=False, indent=2) + '\n')
+
+
+def cmd_list(args):
+    df = _store().data
+    if args.status_pembayaran:
+        df = df[df['Status Pembayaran'] == args.status_pembayaran]
+    if args.status_kamar:
+        df = df[df['Status Kamar'] == args.status_kamar]
+    _tulis(df, args)
+    return 0
+
+
+def cmd_search(args):
+    jenis = "Nomor Kamar" if args.kamar else "Nama Penghuni"
+    _tulis(_store().cari(jenis, args.kamar or args.nama), args)
+    return 0
+
+
+def cmd_upsert(args):
+    import pandas as pd
+    from store import KOLOM, STATUS_KAMAR, STATUS_PEMBAYARAN, format_whatsapp_number, parse_tanggal_satu
+
+    # Tanggal yang tidak terbaca ditolak, bukan disimpan sebagai kosong;
+    # --tanggal "" tetap mengosongkan Tanggal Masuk
+    if args.tanggal and pd.isna(parse_tanggal_satu(args.tanggal)):
+        print(f"Tanggal tidak valid: {args.tanggal}", file=sys.stderr)
+        return 1
+
+    store = _store()
+    lama = store.get(args.no_kamar)
+    record = {kolom: '' for kolom in KOLOM} if lama is None else lama.to_dict()
+    record['No Kamar'] = args.no_kamar
+    perubahan = {
+        'Nama Penghuni': args.nama,
+        'Nomor WhatsApp': format_whatsapp_number(args.whatsapp) if args.whatsapp is not None else None,
+        'Tanggal Masuk': args.tanggal,
+        'Status Kamar': args.status_kamar,
+        'Status Pembayaran': args.status_pembayaran,
+        'Harga Kamar': args.harga,
+    }
+    record.update({k: v for k, v in perubahan.items() if v is not None})
+    if record['Status Kamar'] == "Kamar Kosong":
+        for kolom in KOLOM[1:]:
+            if kolom != 'Status Kamar':
+                record[kolom] = ''
+    # Status di luar pilihan aplikasi ditolak, termasuk nilai lama yang
+    # tidak valid bila tidak diganti lewat opsi
+    for kolom, pilihan in (('Status Kamar', STATUS_KAMAR), ('Status Pembayaran', STATUS_PEMBAYARAN)):
+        if record[kolom] not in pilihan:
+            print(f"{kolom} tidak valid: {record[kolom]!r} (pilihan: {', '.join(p for p in pilihan if p)})",
+                  file=sys.stderr)
+            return 1
+
+    aksi = store.upsert(record)
+    if not store.flush():
+        print("Gagal menyimpan data", file=sys.stderr)
+        return 1
+    _tulis_json({'No Kamar': args.no_kamar.strip().upper(), 'aksi': aksi})
+    return 0
+
+
+def cmd_delete(args):
+    store = _store()
+    dihapus = [k.strip().upper() for k in args.no_kamar if store.delete(k)]
+    if not store.flush():
+        print("Gagal menyimpan data", file=sys.stderr)
+        return 1
+    _tulis_json({'dihapus': dihapus})
+    return 0 if len(dihapus) == len(args.no_kamar) else 2
+
+
+def cmd_import(args):
+    from importer import baca_bertahap, bandingkan_impor, validasi_chunk
+
+    store = _store()
+    ditolak = 0
+
+    def valid():
+        nonlocal ditolak
+        for chunk, _ in baca_bertahap(args.path):
+            bagian, jumlah_ditolak = validasi_chunk(chunk)
+            ditolak += jumlah_ditolak
+            yield bagian
+
+    # Chunk dibandingkan satu per satu; hanya kamar baru atau yang isinya
+    # berbeda yang disimpan, digabung dan ditulis
+    masuk, beda = bandingkan_impor(valid(), store.sidik())
+    ringkasan = {'ditambahkan': len(beda['baru']), 'diupdate': len(beda['berubah']),
+                 'tidak_berubah': len(beda['sama']), 'ditolak': ditolak}
+    if args.periksa:
+        ringkasan.update(kamar_baru=beda['baru'], kamar_berubah=beda['berubah'])
+        _tulis_json(ringkasan)
+        return 0
+    if len(masuk):
+        store.merge(masuk)
+    if not store.flush():
+        print("Gagal menyimpan data", file=sys.stderr)
+        return 1
+    _tulis_json(ringkasan)
+    return 0
+
+
+def cmd_export(args):
+    if args.path.endswith('.json'):
+        if args.perubahan:
+            print("Ekspor perubahan hanya untuk xlsx, csv atau parquet", file=sys.stderr)
+            return 1
+        df = _tampilan(_store().data)
+        df.to_json(args.path, orient='records', force_ascii=False, indent=2)
+        _tulis_json({'path': args.path, 'baris': len(df)})
+        return 0
+
+    from exporter import ambil_perubahan, ekspor_bertahap, riwayat_backend
+
+    store = _store()
+    try:
+        if args.perubahan:
+            riwayat = riwayat_backend(store.backend)
+            df, versi = ambil_perubahan(store.backend, riwayat.terakhir(args.penerima))
+        else:
+            df = store.data
+        for _ in ekspor_bertahap(df, args.path):
+            pass
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    hasil = {'path': args.path, 'baris': len(df)}
+    if args.perubahan:
+        # Dicatat setelah file selesai ditulis, agar ekspor yang gagal diulang
+        riwayat.catat(versi, args.penerima)
+        hasil['versi'] = versi
+    _tulis_json(hasil)
+    return 0
+
+
+def cmd_tunggakan(args):
+    from ledger import BukuPembayaran, hitung_tunggakan
+
+    store = _store()
+    tunggakan = hitung_tunggakan(store.data, BukuPembayaran().load(), args.periode)
+    df = store.data.join(tunggakan, how='inner')
+    df = df[(df['Bulan Tunggakan'] > 0) | (df['Bulan Tunggakan'].isna() & (df['Status Pembayaran'] == 'Menunggak'))]
+    _tulis(df, args)
+    return 0
+
+
+def cmd_tagihan(args):
+    from billing import JadwalPenagihan, hitung_tagihan
+    from ledger import BukuPembayaran, hitung_tunggakan
+
+    store = _store()
+    if args.terapkan:
+        # Untuk cron: ubah penghuni Lunas yang jatuh temponya baru lewat,
+        # sampai --tanggal bila diberikan. Tanggal sebelum pemeriksaan
+        # terakhir ditolak agar waktu pemeriksaan tidak mundur.
+        jadwal = JadwalPenagihan()
+        sekarang = None
+        if args.tanggal:
+            import pandas as pd
+
+            try:
+                sekarang = pd.Timestamp(args.tanggal)
+            except ValueError:
+                print(f"Tanggal tidak valid: {args.tanggal}", file=sys.stderr)
+                return 1
+            terakhir = jadwal.terakhir()
+            if terakhir is not None and sekarang < terakhir:
+                print(f"--tanggal {args.tanggal} sebelum pemeriksaan terakhir ({terakhir:%Y-%m-%d %H:%M})",
+                      file=sys.stderr)
+                return 1
+        kamar = jadwal.periksa(store.data, sekarang, BukuPembayaran().load())
+        store.perbarui(kamar, {'Status Pembayaran': 'Menunggak'})
+        if not store.flush():
+            print("Gagal menyimpan data", file=sys.stderr)
+            return 1
+        _tulis_json({'menunggak': kamar})
+        return 0
+
+    tunggakan = hitung_tunggakan(store.data, BukuPembayaran().load())
+    tagihan = hitung_tagihan(store.data, args.tanggal, tunggakan['Bulan Tunggakan'])
+    df = store.data[['No Kamar', 'Nama Penghuni', 'Status Pembayaran']].join(tagihan, how='inner')
+    if args.terlambat:
+        df = df[df['Hari Terlambat'] > 0]
+    _tulis(df, args)
+    return 0
+
+
+def cmd_dokumen(args):
+    from dokumen import buat_dokumen_bertahap, siapkan_dokumen
+    from ledger import BukuPembayaran, hitung_tunggakan
+
+    store = _store()
+    df = store.data
+    if args.kamar:
+        kamar = [k.strip().upper() for k in args.kamar]
+        df = df.loc[[k for k in kamar if k in df.index]]
+    tunggakan = hitung_tunggakan(store.data, BukuPembayaran().load(), args.periode)['Bulan Tunggakan']
+    dokumen = siapkan_dokumen(df, tunggakan, args.jenis, args.periode)
+    mulai = time.perf_counter()
+    try:
+        for selesai, total in buat_dokumen_bertahap(dokumen, args.tujuan, args.format, args.proses):
+            if args.progres:
+                print(f"{selesai}/{total}", file=sys.stderr)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    waktu = time.perf_counter() - mulai
+    _tulis_json({'tujuan': args.tujuan, 'dokumen': len(dokumen), 'detik': round(waktu, 2),
+                 'dokumen_per_detik': round(len(dokumen) / waktu) if waktu else None})
+    return 0
+
+
+FREKUENSI_DERET = {'harian': 'D', 'mingguan': 'W', 'bulanan': 'ME'}
+
+
+def cmd_histori(args):
+    import pandas as pd
+    from snapshot import SnapshotKamar
+
+    snapshot = SnapshotKamar()
+    if args.pada:
+        # Tanggal saja berarti keadaan di akhir hari itu
+        waktu = pd.Timestamp(args.pada)
+        if len(args.pada) <= 10:
+            waktu += pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+        df = snapshot.pada(waktu)
+    elif args.kamar:
+        df = snapshot.kamar(args.kamar)
+    elif args.deret:
+        df = snapshot.deret(args.mulai, args.sampai, FREKUENSI_DERET[args.frekuensi]).reset_index()
+    else:
+        df = snapshot.ukuran().reset_index()
+    _tulis(df, args)
+    return 0
+
+
+def buat_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="Manajemen kost tanpa GUI")
+    parser.add_argument('--waktu', action='store_true', help="cetak waktu mulai dan total ke stderr")
+    sub = parser.add_subparsers(dest='perintah', required=True)
+
+    def keluaran(p):
+        p.add_argument('--format', choices=['json', 'csv'], default='json')
+        p.add_argument('--output', '-o', help="tulis ke file, bukan stdout")
+
+    p = sub.add_parser('list', help="tampilkan semua kamar")
+    p.add_argument('--status-pembayaran', choices=['Lunas', 'Menunggak'])
+    p.add_argument('--status-kamar', choices=['Sendiri', 'Berdua', 'Kamar Kosong'])
+    keluaran(p)
+    p.set_defaults(fungsi=cmd_list)
+
+    p = sub.add_parser('search', help="cari kamar atau nama penghuni")
+    grup = p.add_mutually_exclusive_group(required=True)
+    grup.add_argument('--kamar')
+    grup.add_argument('--nama')
+    keluaran(p)
+    p.set_defaults(fungsi=cmd_search)
+
+    p = sub.add_parser('upsert', help="tambah atau ubah data satu kamar")
+    p.add_argument('no_kamar')
+    p.add_argument('--nama')
+    p.add_argument('--whatsapp')
+    p.add_argument('--tanggal', help="tanggal masuk dd/mm/yyyy")
+    p.add_argument('--status-kamar', choices=['Sendiri', 'Berdua', 'Kamar Kosong'])
+    p.add_argument('--status-pembayaran', choices=['Lunas', 'Menunggak'])
+    p.add_argument('--harga')
+    p.set_defaults(fungsi=cmd_upsert)
+
+    p = sub.add_parser('delete', help="hapus data kamar")
+    p.add_argument('no_kamar', nargs='+')
+    p.set_defaults(fungsi=cmd_delete)
+
+    p = sub.add_parser('import', help="impor file xlsx/xls/csv")
+    p.add_argument('path')
+    p.add_argument('--periksa', action='store_true',
+                   help="tampilkan kamar yang akan ditambahkan/diupdate tanpa menyimpan")
+    p.set_defaults(fungsi=cmd_import)
+
+    p = sub.add_parser('export', help="ekspor ke xlsx, csv, parquet atau json (dari ekstensi file)")
+    p.add_argument('path')
+    p.add_argument('--perubahan', action='store_true',
+                   help="hanya kamar yang berubah atau dihapus sejak ekspor perubahan terakhir")
+    p.add_argument('--penerima', default='akuntansi',
+                   help="nama penerima; setiap penerima punya catatan ekspor terakhir sendiri")
+    p.set_defaults(fungsi=cmd_export)
+
+    p = sub.add_parser('tunggakan', help="laporan penghuni yang menunggak")
+    p.add_argument('--periode', help="hitung sampai periode YYYY-MM (default bulan ini)")
+    keluaran(p)
+    p.set_defaults(fungsi=cmd_tunggakan)
+
+    p = sub.add_parser('tagihan', help="jatuh tempo berikut dan hari terlambat setiap penghuni")
+    p.add_argument('--tanggal', help="hitung per tanggal yyyy-mm-dd (default hari ini); dengan --terapkan, "
+                                    "terapkan jatuh tempo sampai tanggal itu")
+    p.add_argument('--terlambat', action='store_true', help="hanya yang terlambat")
+    p.add_argument('--terapkan', action='store_true',
+                   help="ubah penghuni Lunas yang jatuh temponya lewat sejak pemeriksaan terakhir menjadi Menunggak")
+    keluaran(p)
+    p.set_defaults(fungsi=cmd_tagihan)
+
+    p = sub.add_parser('dokumen', help="buat kwitansi (Lunas) dan surat teguran (Menunggak)")
+    p.add_argument('tujuan', help="folder, atau file .zip untuk satu arsip")
+    p.add_argument('--format', choices=['html', 'pdf'], default='html')
+    p.add_argument('--jenis', choices=['kwitansi', 'teguran'], help="hanya satu jenis dokumen")
+    p.add_argument('--kamar', nargs='+', help="hanya kamar ini (default semua)")
+    p.add_argument('--periode', help="periode tagihan YYYY-MM (default bulan ini)")
+    p.add_argument('--proses', type=int, help="jumlah proses pekerja (default KOST_DOKUMEN_PROSES atau jumlah CPU)")
+    p.add_argument('--progres', action='store_true', help="cetak progres ke stderr")
+    p.set_defaults(fungsi=cmd_dokumen)
+
+    p = sub.add_parser('histori', help="data kamar pada tanggal lalu dan deret hunian/pendapatan dari snapshot")
+    grup = p.add_mutually_exclusive_group(required=True)
+    grup.add_argument('--pada', help="isi tabel kamar pada tanggal yyyy-mm-dd (atau 'yyyy-mm-dd HH:MM')")
+    grup.add_argument('--kamar', help="semua versi data satu kamar")
+    grup.add_argument('--deret', action='store_true', help="jumlah kamar terisi, pendapatan dan tunggakan per periode")
+    grup.add_argument('--ukuran', action='store_true', help="pertumbuhan penyimpanan snapshot per tahun")
+    p.add_argument('--mulai', help="awal deret yyyy-mm-dd (default snapshot pertama)")
+    p.add_argument('--sampai', help="akhir deret yyyy-mm-dd (default hari ini)")
+    p.add_argument('--frekuensi', choices=list(FREKUENSI_DERET), default='harian')
+    keluaran(p)
+    p.set_defaults(fungsi=cmd_histori)
+
+    return parser
+
+
+def main(argv=None):
+    args = buat_parser().parse_args(argv)
+    siap = time.perf_counter()
+    kode = args.fungsi(args)
+    if args.waktu:
+        selesai = time.perf_counter()
+        print(f"waktu mulai: {(siap - _MULAI) * 1000:.1f} ms, total: {(selesai - _MULAI) * 1000:.1f} ms",
+              file=sys.stderr)
+    return kode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
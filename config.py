@@ -0,0 +1,54 @@
+import os
+
+DATA_PATH = 'data/kost_data.xlsx'
+DB_PATH = 'data/kost_data.db'
+
+# Backend penyimpanan: 'sqlite' (default), 'excel', atau 'server' untuk
+# memakai data bersama dari server.py lewat SERVER_URL
+STORAGE_BACKEND = os.environ.get('KOST_STORAGE', 'sqlite')
+SERVER_URL = os.environ.get('KOST_SERVER', 'http://127.0.0.1:8765')
+
+# Daftar kamar (gedung, lantai, kode kamar) yang menentukan pilihan dan urutan kamar
+CATALOG_PATH = os.environ.get('KOST_KATALOG', 'katalog_kamar.csv')
+
+# Buku pembayaran bulanan disimpan di database SQLite yang sama
+LEDGER_PATH = os.environ.get('KOST_LEDGER', DB_PATH)
+
+# Gateway HTTP untuk mengirim pengingat WhatsApp. Pesan dikirim sebagai
+# POST JSON {"phone": ..., "message": ...}
+REMINDER_GATEWAY = os.environ.get('KOST_WA_GATEWAY', '')
+REMINDER_TOKEN = os.environ.get('KOST_WA_TOKEN', '')
+REMINDER_RATE = float(os.environ.get('KOST_WA_RATE', '20'))        # pesan per detik
+REMINDER_CONCURRENCY = int(os.environ.get('KOST_WA_CONCURRENCY', '10'))
+REMINDER_RETRY = int(os.environ.get('KOST_WA_RETRY', '3'))
+OUTBOX_PATH = os.environ.get('KOST_OUTBOX', DB_PATH)
+
+# KOST_UKUR_STARTUP=1 mencetak time-to-first-paint; 'keluar' sekaligus menutup aplikasi
+UKUR_STARTUP = os.environ.get('KOST_UKUR_STARTUP', '')
+
+# Instrumentasi aksi GUI (profiler.py): KOST_PROFIL=1 mencatat waktu per fase,
+# 'status' sekaligus menampilkan latensi aksi terakhir di status bar.
+# Trace dan histogram ditulis ke PROFIL_DIR saat aplikasi ditutup atau Ctrl+Shift+D
+PROFIL = os.environ.get('KOST_PROFIL', '')
+PROFIL_DIR = os.environ.get('KOST_PROFIL_DIR', 'profil')
+
+# Selang pemeriksaan jatuh tempo di aplikasi (menit); 0 mematikan pemeriksaan
+# otomatis. Penghuni Lunas yang jatuh temponya lewat diubah menjadi Menunggak.
+# Dengan KOST_STORAGE=server pemeriksaan hanya berjalan di server.py.
+CEK_JATUH_TEMPO_MENIT = int(os.environ.get('KOST_CEK_JATUH_TEMPO', '60'))
+
+# Riwayat undo/redo (riwayat.py): batas jumlah baris kamar yang disimpan
+# (sebelum + sesudah) dan batas jumlah operasi; operasi tertua dibuang dulu
+RIWAYAT_MAKS_BARIS = int(os.environ.get('KOST_RIWAYAT_BARIS', '200000'))
+RIWAYAT_MAKS_OPERASI = int(os.environ.get('KOST_RIWAYAT_OPERASI', '500'))
+
+# Kwitansi dan surat teguran (dokumen.py): jumlah proses pekerja (0 = jumlah
+# CPU) dan folder template HTML sendiri (kwitansi.html, teguran.html)
+DOKUMEN_PROSES = int(os.environ.get('KOST_DOKUMEN_PROSES', '0'))
+DOKUMEN_TEMPLATE_DIR = os.environ.get('KOST_TEMPLATE_DOKUMEN', '')
+
+# Snapshot historis tabel kamar (snapshot.py): 'simpan' mencatat setiap kali
+# data disimpan, 'harian' paling banyak sekali sehari, kosong mematikan.
+# Hanya kamar yang berubah yang ditulis, di database SQLite yang sama
+SNAPSHOT = os.environ.get('KOST_SNAPSHOT', 'simpan')
+SNAPSHOT_PATH = os.environ.get('KOST_SNAPSHOT_PATH', DB_PATH)
@@ -0,0 +1,244 @@
+# Kwitansi untuk penghuni Lunas dan surat teguran untuk penghuni Menunggak,
+# dibuat massal dari template ke file HTML atau PDF. Dokumen dibagi per
+# bagian dan dirender di process pool; modul ini sengaja hanya memakai
+# pustaka standar di tingkat atas agar proses pekerja cepat mulai.
+import concurrent.futures
+import datetime
+import html
+import os
+import re
+import zipfile
+from string import Template
+
+from config import DOKUMEN_PROSES, DOKUMEN_TEMPLATE_DIR
+
+FORMAT_DOKUMEN = ('html', 'pdf')
+JENIS_DOKUMEN = {'Lunas': 'kwitansi', 'Menunggak': 'teguran'}
+
+# Dokumen per tugas pool: cukup besar agar biaya kirim antar-proses kecil,
+# cukup kecil agar pembatalan cepat terasa
+UKURAN_BAGIAN = 250
+
+# Di bawah jumlah ini dokumen dibuat di proses sendiri; memulai proses
+# pekerja lebih mahal daripada merendernya
+MIN_PARALEL = 2000
+
+# Isi dokumen sebagai baris teks ($nama, $no_kamar, $harga, $tanggal_masuk,
+# $periode, $tanggal, $nomor, $bulan, $total). Dipakai apa adanya untuk PDF
+# dan dibungkus TEMPLATE_HTML untuk HTML.
+TEMPLATE_TEKS = {
+    'kwitansi': (
+        "KWITANSI PEMBAYARAN SEWA KAMAR",
+        [
+            "Nomor: $nomor",
+            "Tanggal: $tanggal",
+            "",
+            "Telah diterima dari: $nama",
+            "Untuk pembayaran sewa kamar $no_kamar periode $periode",
+            "Sebesar: $harga",
+            "Penghuni sejak: $tanggal_masuk",
+            "",
+            "Pengelola Kost",
+        ],
+    ),
+    'teguran': (
+        "SURAT TEGURAN PEMBAYARAN",
+        [
+            "Nomor: $nomor",
+            "Tanggal: $tanggal",
+            "",
+            "Kepada Yth. $nama",
+            "Penghuni kamar $no_kamar (sejak $tanggal_masuk)",
+            "",
+            "Sampai tanggal surat ini kami belum menerima pembayaran sewa kamar",
+            "periode $periode sebesar $harga per bulan$bulan.",
+            "Total yang harus dibayar: $total.",
+            "Mohon segera melakukan pembayaran. Terima kasih.",
+            "",
+            "Pengelola Kost",
+        ],
+    ),
+}
+
+TEMPLATE_HTML = Template("""<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<title>$judul</title>
+<style>
+body { font-family: sans-serif; max-width: 40em; margin: 3em auto; }
+h1 { font-size: 1.3em; text-align: center; border-bottom: 1px solid #333; padding-bottom: .5em; }
+p { margin: .3em 0; }
+</style>
+</head>
+<body>
+<h1>$judul</h1>
+$isi
+</body>
+</html>
+""")
+
+
+def _template_html(jenis):
+    # Template HTML sendiri bisa diletakkan di KOST_TEMPLATE_DOKUMEN sebagai
+    # kwitansi.html / teguran.html, memakai nama isian yang sama
+    if DOKUMEN_TEMPLATE_DIR:
+        path = os.path.join(DOKUMEN_TEMPLATE_DIR, f'{jenis}.html')
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+    judul, baris = TEMPLATE_TEKS[jenis]
+    isi = '\n'.join(f'<p>{b}</p>' if b else '<br>' for b in baris)
+    return TEMPLATE_HTML.safe_substitute(judul=judul, isi=isi)
+
+
+def siapkan_dokumen(df, tunggakan=None, jenis=None, periode=None, tanggal=None):
+    # Baris kamar -> daftar isian dokumen (dict teks biasa, bisa dikirim ke
+    # proses lain). Penghuni Lunas mendapat kwitansi, Menunggak surat
+    # teguran; jenis membatasi ke salah satunya. tunggakan (Series bulan
+    # tunggakan dari buku pembayaran) mengisi jumlah bulan di surat teguran.
+    from store import format_harga, format_tanggal_series, teks_whatsapp_series
+
+    hari_ini = datetime.date.today()
+    periode = periode or hari_ini.strftime('%Y-%m')
+    tanggal = tanggal or hari_ini.strftime('%d/%m/%Y')
+    terisi = df[(df['Status Kamar'] != 'Kamar Kosong')
+                & df['Status Pembayaran'].isin([j for j, n in JENIS_DOKUMEN.items() if jenis in (None, n)])]
+    tanggal_masuk = format_tanggal_series(terisi['Tanggal Masuk']).tolist()
+    nomor_wa = teks_whatsapp_series(terisi['Nomor WhatsApp']).tolist()
+    bulan = terisi.index.map(tunggakan).tolist() if tunggakan is not None else [None] * len(terisi)
+
+    dokumen = []
+    for no_kamar, nama, wa, masuk, status, harga, b in zip(
+            terisi['No Kamar'].astype(str), terisi['Nama Penghuni'], nomor_wa, tanggal_masuk,
+            terisi['Status Pembayaran'].astype(str), terisi['Harga Kamar'].tolist(), bulan):
+        jenis_dok = JENIS_DOKUMEN[status]
+        b = int(b) if b is not None and b == b and b > 0 else 0
+        dokumen.append({
+            'jenis': jenis_dok,
+            'nomor': f"{'KW' if jenis_dok == 'kwitansi' else 'ST'}/{periode}/{no_kamar}",
+            'nama': nama,
+            'no_kamar': no_kamar,
+            'nomor_whatsapp': wa,
+            'harga': format_harga(harga),
+            'tanggal_masuk': masuk,
+            'periode': periode,
+            'tanggal': tanggal,
+            'bulan': f" selama {b} bulan" if b else "",
+            'total': format_harga(harga * max(b, 1)),
+        })
+    return dokumen
+
+
+def nama_file(isian, format):
+    return f"{isian['jenis']}_{re.sub(r'[^0-9A-Za-z-]', '_', isian['no_kamar'])}.{format}"
+
+
+def _teks_pdf(teks):
+    # Teks untuk operator Tj: huruf Latin-1 (WinAnsi) dan tanda kurung/backslash di-escape
+    teks = teks.encode('latin-1', 'replace').decode('latin-1')
+    return teks.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def render_pdf(judul, baris):
+    # PDF satu halaman A4 berisi teks Helvetica, ditulis langsung tanpa
+    # pustaka tambahan
+    isi = [f"BT /F1 15 Tf 56 780 Td ({_teks_pdf(judul)}) Tj ET", "BT /F1 11 Tf 16 TL 56 740 Td"]
+    isi += [f"({_teks_pdf(b)}) Tj T*" for b in baris]
+    isi.append("ET")
+    stream = '\n'.join(isi).encode('latin-1')
+    objek = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+    ]
+    hasil = bytearray(b"%PDF-1.4\n")
+    posisi = []
+    for i, o in enumerate(objek, 1):
+        posisi.append(len(hasil))
+        hasil += b"%d 0 obj\n%s\nendobj\n" % (i, o)
+    xref = len(hasil)
+    hasil += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objek) + 1)
+    hasil += b"".join(b"%010d 00000 n \n" % p for p in posisi)
+    hasil += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objek) + 1, xref)
+    return bytes(hasil)
+
+
+def render(isian, format, template_html=None):
+    jenis = isian['jenis']
+    if format == 'pdf':
+        judul, baris = TEMPLATE_TEKS[jenis]
+        return render_pdf(judul, [Template(b).safe_substitute(isian) for b in baris])
+    template = Template(template_html[jenis] if template_html else _template_html(jenis))
+    return template.safe_substitute({k: html.escape(str(v)) for k, v in isian.items()}).encode('utf-8')
+
+
+def render_bagian(dokumen, format, template_html):
+    # Dijalankan di proses pekerja: (nama file, isi) satu bagian dokumen
+    return [(nama_file(isian, format), render(isian, format, template_html)) for isian in dokumen]
+
+
+def tulis_bagian(dokumen, folder, format, template_html):
+    # Dijalankan di proses pekerja: render lalu tulis langsung ke folder
+    for nama, isi in render_bagian(dokumen, format, template_html):
+        with open(os.path.join(folder, nama), 'wb') as f:
+            f.write(isi)
+    return len(dokumen)
+
+
+def buat_dokumen_bertahap(dokumen, tujuan, format='html', proses=None, ukuran_bagian=UKURAN_BAGIAN):
+    # Menulis semua dokumen dan menghasilkan (selesai, total) setiap satu
+    # bagian selesai. tujuan berakhiran .zip menjadi satu arsip (ditulis ke
+    # nama sementara dulu, seperti ekspor, dan jauh lebih cepat daripada
+    # ribuan file kecil); selain itu sebuah folder. proses: jumlah proses
+    # pekerja (None dari KOST_DOKUMEN_PROSES atau jumlah CPU, 1 tanpa pool).
+    # Bila generator ditutup sebelum habis (dibatalkan), bagian yang belum
+    # dimulai dibatalkan; arsip tidak dibuat, file di folder yang sudah
+    # ditulis tetap ada.
+    if format not in FORMAT_DOKUMEN:
+        raise ValueError(f"Format dokumen tidak didukung: {format}")
+    template_html = {jenis: _template_html(jenis) for jenis in TEMPLATE_TEKS}
+    bagian = [dokumen[i:i + ukuran_bagian] for i in range(0, len(dokumen), ukuran_bagian)]
+    total, selesai = len(dokumen), 0
+    proses = proses or DOKUMEN_PROSES or os.cpu_count() or 1
+    if not proses > 1 or total < MIN_PARALEL:
+        proses = 1
+
+    arsip = None
+    if tujuan.lower().endswith('.zip'):
+        sementara = tujuan + '.sementara'
+        arsip = zipfile.ZipFile(sementara, 'w', zipfile.ZIP_DEFLATED, compresslevel=1)
+        fungsi, arg = render_bagian, (format, template_html)
+    else:
+        os.makedirs(tujuan, exist_ok=True)
+        fungsi, arg = tulis_bagian, (tujuan, format, template_html)
+
+    pool = None
+    try:
+        if proses == 1:
+            hasil = (fungsi(b, *arg) for b in bagian)
+        else:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=min(proses, len(bagian)))
+            tugas = [pool.submit(fungsi, b, *arg) for b in bagian]
+            hasil = (t.result() for t in concurrent.futures.as_completed(tugas))
+        for h in hasil:
+            if arsip is None:
+                selesai += h
+            else:
+                for nama, isi in h:
+                    arsip.writestr(nama, isi)
+                selesai += len(h)
+            yield selesai, total
+        if arsip is not None:
+            arsip.close()
+            os.replace(sementara, tujuan)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if arsip is not None:
+            arsip.close()
+            if os.path.exists(sementara):
+                os.remove(sementara)
@@ -0,0 +1,160 @@
+import datetime
+import os
+import sqlite3
+
+import pandas as pd
+
+from config import DB_PATH
+from storage import KOLOM
+from store import data_teks, format_tanggal_series, parse_harga, parse_tanggal
+
+UKURAN_CHUNK = 10000
+FORMAT_EKSPOR = ('.xlsx', '.csv', '.parquet')
+
+# Nama penerima ekspor perubahan bawaan; setiap nama punya catatan versi
+# sendiri sehingga beberapa sistem bisa mengambil perubahan masing-masing
+PENERIMA = 'akuntansi'
+
+
+def _potong(df, ukuran_chunk):
+    for awal in range(0, len(df), ukuran_chunk):
+        yield df.iloc[awal:awal + ukuran_chunk], min((awal + ukuran_chunk) / len(df), 1.0)
+
+
+def _teks(df):
+    # Tanggal dd/mm/yyyy seperti data lama, sehingga file bisa diimpor kembali
+    df = df.copy()
+    for kolom in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[kolom]):
+            df[kolom] = format_tanggal_series(df[kolom])
+    return df
+
+
+def _tulis_xlsx(df, path, ukuran_chunk):
+    # Mode write-only openpyxl menulis baris demi baris tanpa membangun
+    # seluruh workbook di memori
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(df.columns))
+    for chunk, progres in _potong(df, ukuran_chunk):
+        chunk = _teks(chunk)
+        for baris in zip(*(chunk[kolom].to_numpy(dtype=object) for kolom in chunk.columns)):
+            ws.append(baris)
+        yield progres
+    wb.save(path)
+
+
+def _tulis_csv(df, path, ukuran_chunk):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if df.empty:
+            df.to_csv(f, index=False)
+        for i, (chunk, progres) in enumerate(_potong(df, ukuran_chunk)):
+            _teks(chunk).to_csv(f, index=False, header=i == 0)
+            yield progres
+
+
+def _tulis_parquet(df, path, ukuran_chunk):
+    # Parquet menyimpan tipe aslinya (tanggal, harga angka)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Ekspor Parquet membutuhkan pyarrow (pip install pyarrow)")
+
+    # Skema dari chunk pertama: kolom object kosong tidak punya tipe
+    schema = pa.Schema.from_pandas(df.iloc[:ukuran_chunk], preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        if df.empty:
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+        for chunk, progres in _potong(df, ukuran_chunk):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield progres
+
+
+def ekspor_bertahap(df, path, ukuran_chunk=UKURAN_CHUNK):
+    # Menulis per chunk dan menghasilkan progres 0..1 setelah setiap chunk.
+    # File ditulis ke nama sementara dulu agar ekspor yang gagal atau
+    # dibatalkan tidak meninggalkan file setengah jadi.
+    ekstensi = os.path.splitext(path)[1].lower()
+    penulis = {'.xlsx': _tulis_xlsx, '.csv': _tulis_csv, '.parquet': _tulis_parquet}.get(ekstensi)
+    if penulis is None:
+        raise ValueError("Format file tidak didukung!")
+    sementara = path + '.sementara'
+    try:
+        yield from penulis(data_teks(df).reset_index(drop=True), sementara, ukuran_chunk)
+        os.replace(sementara, path)
+    finally:
+        if os.path.exists(sementara):
+            os.remove(sementara)
+
+
+def _cek_perubahan(backend):
+    if not hasattr(backend, 'perubahan_sejak'):
+        raise ValueError("Ekspor perubahan hanya didukung untuk penyimpanan SQLite")
+
+
+def ambil_perubahan(backend, sejak):
+    # Baris yang berubah sejak versi `sejak` ditambah kolom 'Dihapus' untuk
+    # kamar yang dihapus; mengembalikan (df, versi terbaru)
+    _cek_perubahan(backend)
+    df, dihapus, terbaru = backend.perubahan_sejak(sejak)
+    df['Tanggal Masuk'] = parse_tanggal(df['Tanggal Masuk'])
+    df['Harga Kamar'] = parse_harga(df['Harga Kamar'])
+    df['Dihapus'] = False
+    if dihapus:
+        hapus = pd.DataFrame({'No Kamar': dihapus, 'Dihapus': True}).reindex(columns=df.columns)
+        hapus['Tanggal Masuk'] = pd.Series(pd.NaT, index=hapus.index, dtype='datetime64[ns]')
+        hapus['Harga Kamar'] = 0
+        hapus[KOLOM[1:]] = hapus[KOLOM[1:]].fillna('')
+        df = pd.concat([df, hapus], ignore_index=True)
+    return df, terbaru
+
+
+# Versi terakhir yang sudah diekspor per penerima, di tabel 'ekspor' pada
+# database yang sama (lihat riwayat_backend)
+class RiwayatEkspor:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ekspor (
+                penerima TEXT PRIMARY KEY,
+                versi INTEGER NOT NULL,
+                waktu TEXT NOT NULL
+            )
+        """)
+        return conn
+
+    def terakhir(self, penerima=PENERIMA):
+        conn = self._connect()
+        try:
+            baris = conn.execute('SELECT versi FROM ekspor WHERE penerima = ?', (penerima,)).fetchone()
+        finally:
+            conn.close()
+        # -1: belum pernah ekspor, baris lama dengan versi 0 ikut terambil
+        return baris[0] if baris else -1
+
+    def catat(self, versi, penerima=PENERIMA):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO ekspor (penerima, versi, waktu) VALUES (?, ?, ?) "
+                    "ON CONFLICT(penerima) DO UPDATE SET versi = excluded.versi, waktu = excluded.waktu",
+                    (penerima, versi, datetime.datetime.now().isoformat(timespec='seconds'))
+                )
+        finally:
+            conn.close()
+
+
+def riwayat_backend(backend):
+    # Catatan ekspor di database yang dibaca backend, agar versi yang dicatat
+    # berasal dari database yang sama dengan nomor versinya
+    _cek_perubahan(backend)
+    return RiwayatEkspor(backend.path)
@@ -0,0 +1,199 @@
+# Indeks filter kamar: bitmap (mask boolean numpy) per nilai untuk Status
+# Kamar, Status Pembayaran, Harga Kamar, Gedung dan Lantai, serta array
+# terurut untuk rentang Tanggal Masuk. Setiap kamar menempati satu slot
+# tetap, jadi upsert/hapus hanya mengubah bit slot itu; filter gabungan
+# menjadi AND antar-bitmap tanpa memindai DataFrame.
+import numpy as np
+import pandas as pd
+
+from catalog import katalog
+
+KOLOM_BITMAP = ['Status Kamar', 'Status Pembayaran', 'Harga Kamar', 'Gedung', 'Lantai']
+
+# Kolom dengan nilai berbeda sebanyak ini atau kurang dibuatkan bitmap untuk
+# semua nilainya saat indeks dibangun; sisanya dibuat saat pertama dipakai
+BATAS_BITMAP_AWAL = 64
+
+# Perubahan lebih dari 1/PECAHAN_URUT_ULANG baris sekaligus mengurutkan ulang
+# array tanggal, bukan menyisipkan satu per satu
+PECAHAN_URUT_ULANG = 16
+
+_NAT = np.iinfo('int64').min
+
+
+class IndeksFilter:
+    def __init__(self):
+        self.bangun(pd.DataFrame(columns=['No Kamar', 'Tanggal Masuk'] + KOLOM_BITMAP[:3]))
+
+    def __len__(self):
+        return len(self._slot)
+
+    def bangun(self, df):
+        # df: data kamar dengan indeks No Kamar
+        self._slot = {}                      # no_kamar -> slot
+        self._kosong = []                    # slot bekas kamar yang dihapus
+        self._kode = np.empty(0, dtype=object)
+        self._hidup = np.zeros(0, dtype=bool)
+        self._tanggal = np.zeros(0, dtype='int64')
+        self._nilai = {kolom: {} for kolom in KOLOM_BITMAP}   # nilai -> kode
+        self._isi = {kolom: np.zeros(0, dtype='int32') for kolom in KOLOM_BITMAP}
+        self._bitmap = {kolom: {} for kolom in KOLOM_BITMAP}  # kode -> mask
+        self._tgl_nilai = np.zeros(0, dtype='int64')
+        self._tgl_slot = np.zeros(0, dtype='int64')
+        self.tambah(df)
+        for kolom in KOLOM_BITMAP:
+            if len(self._nilai[kolom]) <= BATAS_BITMAP_AWAL:
+                for kode in self._nilai[kolom].values():
+                    self._mask(kolom, kode)
+
+    def _perbesar(self, kapasitas):
+        # Kapasitas dilipatgandakan agar penambahan kamar satu per satu tidak
+        # menyalin array setiap kali
+        lama = len(self._hidup)
+        if kapasitas <= lama:
+            return
+        baru = max(kapasitas, lama * 2, 64)
+
+        def perluas(arr, isi):
+            hasil = np.full(baru, isi, dtype=arr.dtype)
+            hasil[:lama] = arr
+            return hasil
+
+        self._kode = perluas(self._kode, None)
+        self._hidup = perluas(self._hidup, False)
+        self._tanggal = perluas(self._tanggal, _NAT)
+        for kolom in KOLOM_BITMAP:
+            self._isi[kolom] = perluas(self._isi[kolom], -1)
+            for kode, mask in self._bitmap[kolom].items():
+                self._bitmap[kolom][kode] = perluas(mask, False)
+
+    def _ambil_slot(self, kamar):
+        slot = np.empty(len(kamar), dtype='int64')
+        berikut = len(self._slot) + len(self._kosong)
+        for i, no_kamar in enumerate(kamar):
+            s = self._slot.get(no_kamar)
+            if s is None:
+                if self._kosong:
+                    s = self._kosong.pop()
+                else:
+                    s = berikut
+                    berikut += 1
+                self._slot[no_kamar] = s
+            slot[i] = s
+        self._perbesar(berikut)
+        return slot
+
+    def _kodekan(self, kolom, nilai):
+        peta = self._nilai[kolom]
+        unik, balik = np.unique(nilai, return_inverse=True)
+        kode = np.array([peta.setdefault(v, len(peta)) for v in unik.tolist()], dtype='int32')
+        return kode[balik]
+
+    def _mask(self, kolom, kode):
+        mask = self._bitmap[kolom].get(kode)
+        if mask is None:
+            mask = self._bitmap[kolom][kode] = self._isi[kolom] == kode
+        return mask
+
+    def _set_bitmap(self, kolom, slot, kode):
+        # Hapus bit nilai lama, lalu nyalakan bit nilai baru; hanya bitmap
+        # yang sudah dibuat yang perlu diubah
+        isi = self._isi[kolom]
+        bitmap = self._bitmap[kolom]
+        lama = isi[slot]
+        for k in np.unique(lama[lama >= 0]).tolist():
+            if k in bitmap:
+                bitmap[k][slot[lama == k]] = False
+        if kode is None:
+            isi[slot] = -1
+            return
+        isi[slot] = kode
+        for k in np.unique(kode).tolist():
+            if k in bitmap:
+                bitmap[k][slot[kode == k]] = True
+
+    def tambah(self, df):
+        # Tambah atau perbarui kamar di df (indeks No Kamar)
+        if not len(df):
+            return
+        kamar = df.index.to_numpy(dtype=object)
+        slot = self._ambil_slot(kamar)
+        self._kode[slot] = kamar
+        self._hidup[slot] = True
+        k = katalog()
+        nilai = {
+            'Status Kamar': df['Status Kamar'].to_numpy(dtype=object).astype(str),
+            'Status Pembayaran': df['Status Pembayaran'].to_numpy(dtype=object).astype(str),
+            'Harga Kamar': df['Harga Kamar'].to_numpy(dtype='int64'),
+            'Gedung': np.array([k.gedung(no) for no in kamar], dtype=str),
+            'Lantai': np.array([str(k.lantai(no)) for no in kamar], dtype=str),
+        }
+        for kolom in KOLOM_BITMAP:
+            self._set_bitmap(kolom, slot, self._kodekan(kolom, nilai[kolom]))
+        tanggal = df['Tanggal Masuk'].to_numpy(dtype='datetime64[ns]').view('int64')
+        self._ubah_tanggal(slot, tanggal)
+
+    def hapus(self, kamar):
+        slot = [self._slot.pop(no_kamar) for no_kamar in kamar if no_kamar in self._slot]
+        if not slot:
+            return
+        slot = np.array(slot, dtype='int64')
+        self._kode[slot] = None
+        self._hidup[slot] = False
+        for kolom in KOLOM_BITMAP:
+            self._set_bitmap(kolom, slot, None)
+        self._ubah_tanggal(slot, np.full(len(slot), _NAT, dtype='int64'))
+        self._kosong.extend(slot.tolist())
+
+    def _ubah_tanggal(self, slot, tanggal):
+        self._tanggal[slot] = tanggal
+        if len(slot) * PECAHAN_URUT_ULANG > len(self._tgl_nilai):
+            ada = np.flatnonzero(self._tanggal != _NAT)
+            urut = np.argsort(self._tanggal[ada], kind='stable')
+            self._tgl_slot = ada[urut]
+            self._tgl_nilai = self._tanggal[self._tgl_slot]
+            return
+        # Sedikit perubahan: keluarkan posisi lama slot itu lalu sisipkan
+        # tanggal barunya dengan searchsorted
+        buang = np.flatnonzero(np.isin(self._tgl_slot, slot))
+        nilai = np.delete(self._tgl_nilai, buang)
+        slot_urut = np.delete(self._tgl_slot, buang)
+        ada = tanggal != _NAT
+        masuk, tanggal = slot[ada], tanggal[ada]
+        posisi = np.searchsorted(nilai, tanggal, side='right')
+        self._tgl_nilai = np.insert(nilai, posisi, tanggal)
+        self._tgl_slot = np.insert(slot_urut, posisi, masuk)
+
+    def _mask_nilai(self, kolom, pilihan):
+        # OR bitmap semua nilai yang dipilih
+        hasil = np.zeros(len(self._hidup), dtype=bool)
+        for nilai in pilihan:
+            kode = self._nilai[kolom].get(nilai)
+            if kode is not None:
+                hasil |= self._mask(kolom, kode)
+        return hasil
+
+    def saring(self, kriteria):
+        # kriteria: {'Status Kamar': [...], 'Status Pembayaran': [...],
+        # 'Gedung': [...], 'Lantai': [...], 'harga_min', 'harga_maks',
+        # 'masuk_sejak', 'masuk_sebelum'}; kunci yang tidak ada atau None
+        # tidak menyaring. Mengembalikan nomor kamar yang cocok.
+        hasil = self._hidup.copy()
+        for kolom in KOLOM_BITMAP[:2] + KOLOM_BITMAP[3:]:
+            pilihan = kriteria.get(kolom)
+            if pilihan is not None:
+                hasil &= self._mask_nilai(kolom, [str(p) for p in pilihan])
+        harga_min, harga_maks = kriteria.get('harga_min'), kriteria.get('harga_maks')
+        if harga_min is not None or harga_maks is not None:
+            harga = [h for h in self._nilai['Harga Kamar']
+                     if (harga_min is None or h >= harga_min) and (harga_maks is None or h <= harga_maks)]
+            hasil &= self._mask_nilai('Harga Kamar', harga)
+        sejak, sebelum = kriteria.get('masuk_sejak'), kriteria.get('masuk_sebelum')
+        if sejak is not None or sebelum is not None:
+            awal = 0 if sejak is None else np.searchsorted(self._tgl_nilai, pd.Timestamp(sejak).value, side='left')
+            akhir = (len(self._tgl_nilai) if sebelum is None
+                     else np.searchsorted(self._tgl_nilai, pd.Timestamp(sebelum).value, side='left'))
+            rentang = np.zeros(len(self._hidup), dtype=bool)
+            rentang[self._tgl_slot[awal:akhir]] = True
+            hasil &= rentang
+        return self._kode[hasil]
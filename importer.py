@@ -0,0 +1,147 @@
+import datetime
+import os
+
+import pandas as pd
+
+from storage import KOLOM
+from store import (
+    STATUS_KAMAR, STATUS_PEMBAYARAN, format_whatsapp_series, hash_baris, parse_harga, parse_tanggal,
+    siapkan_data, urutkan_kamar
+)
+
+UKURAN_CHUNK = 10000
+
+
+class KolomTidakLengkap(ValueError):
+    pass
+
+
+def cek_kolom(kolom):
+    kurang = [k for k in KOLOM if k not in kolom]
+    if kurang:
+        raise KolomTidakLengkap(f"Kolom tidak ditemukan: {', '.join(kurang)}")
+
+
+def _teks(nilai):
+    if nilai is None:
+        return ''
+    if isinstance(nilai, (datetime.datetime, datetime.date)):
+        return nilai.strftime('%d/%m/%Y')
+    if isinstance(nilai, float) and nilai.is_integer():
+        return str(int(nilai))
+    return str(nilai)
+
+
+def _baca_csv(path, ukuran_chunk):
+    ukuran = os.path.getsize(path) or 1
+    with open(path, 'rb') as f:
+        reader = pd.read_csv(f, dtype=str, keep_default_na=False, chunksize=ukuran_chunk)
+        for chunk in reader:
+            yield chunk, min(f.tell() / ukuran, 1.0)
+
+
+def _baca_xlsx(path, ukuran_chunk):
+    # Mode read-only openpyxl membaca baris demi baris tanpa memuat seluruh workbook
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        baris = ws.iter_rows(values_only=True)
+        header = [_teks(h).strip() for h in next(baris, ())]
+        cek_kolom(header)
+        total = (ws.max_row or 0) - 1
+        dibaca = 0
+        isi = []
+        for nilai in baris:
+            if not any(v is not None for v in nilai):
+                continue
+            isi.append([_teks(v) for v in nilai])
+            if len(isi) >= ukuran_chunk:
+                dibaca += len(isi)
+                yield pd.DataFrame(isi, columns=header), (dibaca / total if total > 0 else -1)
+                isi = []
+        if isi:
+            dibaca += len(isi)
+            yield pd.DataFrame(isi, columns=header), (dibaca / total if total > 0 else -1)
+    finally:
+        wb.close()
+
+
+def _baca_xls(path, ukuran_chunk):
+    # Format .xls lama tidak bisa dibaca bertahap, jadi dibaca sekali lalu dipotong
+    df = pd.read_excel(path, dtype=str).fillna('')
+    for awal in range(0, len(df), ukuran_chunk):
+        yield df.iloc[awal:awal + ukuran_chunk], min((awal + ukuran_chunk) / max(len(df), 1), 1.0)
+
+
+def baca_bertahap(path, ukuran_chunk=UKURAN_CHUNK):
+    # Menghasilkan (chunk, progres 0..1 atau -1 bila tidak diketahui)
+    if path.endswith('.csv'):
+        sumber = _baca_csv(path, ukuran_chunk)
+    elif path.endswith('.xlsx'):
+        sumber = _baca_xlsx(path, ukuran_chunk)
+    elif path.endswith('.xls'):
+        sumber = _baca_xls(path, ukuran_chunk)
+    else:
+        raise ValueError("Format file tidak didukung!")
+
+    kolom_dicek = False
+    for chunk, progres in sumber:
+        if not kolom_dicek:
+            cek_kolom(chunk.columns)
+            kolom_dicek = True
+        yield chunk, progres
+
+
+def validasi_chunk(chunk):
+    # Pemeriksaan vektor per chunk; mengembalikan (baris valid, jumlah ditolak)
+    chunk = chunk.reindex(columns=KOLOM).fillna('').astype(str)
+    for kolom in KOLOM:
+        chunk[kolom] = chunk[kolom].str.strip()
+    chunk['No Kamar'] = chunk['No Kamar'].str.upper()
+    chunk['Nomor WhatsApp'] = format_whatsapp_series(chunk['Nomor WhatsApp'])
+    chunk['Harga Kamar'] = parse_harga(chunk['Harga Kamar'])
+    chunk['Tanggal Masuk'] = parse_tanggal(chunk['Tanggal Masuk'])
+
+    valid = (
+        (chunk['No Kamar'] != '')
+        & chunk['Status Kamar'].isin(STATUS_KAMAR)
+        & chunk['Status Pembayaran'].isin(STATUS_PEMBAYARAN)
+    )
+    return chunk[valid], int((~valid).sum())
+
+
+def bandingkan_impor(valid, sidik):
+    # Membandingkan baris valid dari file impor (iterable chunk, dibaca satu
+    # per satu) dengan sidik kamar yang ada (KostStore.sidik()). Setiap chunk
+    # disidik begitu datang dan baris yang sama langsung dibuang, jadi memori
+    # hanya sebesar baris baru/berubah. Mengembalikan (baris baru atau
+    # berubah saja, {'baru': [...], 'berubah': [...], 'sama': [...]} berisi
+    # nomor kamar urut katalog).
+    jenis = {}
+    ditulis = []
+    for chunk in valid:
+        if not len(chunk):
+            continue
+        chunk = siapkan_data(chunk)
+        # Kamar yang muncul lagi di chunk berikutnya memakai baris terakhir
+        # seperti drop_duplicates(keep='last'); baris lamanya dibuang di akhir
+        simpan = []
+        for no_kamar, h_baru in zip(chunk.index.tolist(), hash_baris(chunk).tolist()):
+            h_lama = sidik.get(no_kamar)
+            jenis.pop(no_kamar, None)
+            jenis[no_kamar] = j = 'baru' if h_lama is None else 'sama' if h_lama == h_baru else 'berubah'
+            simpan.append(j != 'sama')
+        if any(simpan):
+            ditulis.append(chunk[simpan])
+
+    beda = {'baru': [], 'berubah': [], 'sama': []}
+    for no_kamar, j in jenis.items():
+        beda[j].append(no_kamar)
+    for j, kamar in beda.items():
+        beda[j] = urutkan_kamar(pd.DataFrame({'No Kamar': kamar}))['No Kamar'].tolist()
+    if not ditulis:
+        return siapkan_data(pd.DataFrame(columns=KOLOM)), beda
+    masuk = siapkan_data(pd.concat(ditulis))
+    return masuk[[jenis[k] != 'sama' for k in masuk.index.tolist()]], beda
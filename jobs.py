@@ -0,0 +1,157 @@
+import threading
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class Dibatalkan(Exception):
+    pass
+
+
+class SinyalPekerjaan(QObject):
+    progres = pyqtSignal(int, str)
+    bagian = pyqtSignal(object)
+    selesai = pyqtSignal(object)
+    gagal = pyqtSignal(str)
+    dibatalkan = pyqtSignal()
+
+
+# Konteks yang diterima fungsi pekerjaan untuk melapor progres dan
+# memeriksa apakah pekerjaan diminta berhenti
+class KonteksPekerjaan:
+    def __init__(self, sinyal):
+        self._sinyal = sinyal
+        self._batal = threading.Event()
+
+    def progres(self, persen, pesan=''):
+        self._sinyal.progres.emit(int(persen), pesan)
+
+    def kirim(self, hasil_sebagian):
+        # Kirim hasil sebagian (misalnya satu chunk import) ke thread GUI
+        self._sinyal.bagian.emit(hasil_sebagian)
+
+    def batal(self):
+        self._batal.set()
+
+    def dibatalkan(self):
+        return self._batal.is_set()
+
+    def cek_batal(self):
+        if self._batal.is_set():
+            raise Dibatalkan()
+
+
+class Pekerjaan(QRunnable):
+    def __init__(self, nama, fungsi):
+        super().__init__()
+        self.nama = nama
+        self.fungsi = fungsi
+        self.sinyal = SinyalPekerjaan()
+        self.konteks = KonteksPekerjaan(self.sinyal)
+        # Diset begitu fungsi selesai di thread pekerja, sebelum callback-nya
+        # dijalankan di thread GUI
+        self.beres = threading.Event()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            self._jalankan()
+        finally:
+            self.beres.set()
+
+    def _jalankan(self):
+        try:
+            hasil = self.fungsi(self.konteks)
+        except Dibatalkan:
+            self.sinyal.dibatalkan.emit()
+            return
+        except Exception as e:
+            traceback.print_exc()
+            self.sinyal.gagal.emit(str(e))
+            return
+        # Pekerjaan yang tidak memeriksa pembatalan (misalnya penyimpanan)
+        # selalu dianggap selesai, karena hasilnya sudah terjadi
+        self.sinyal.selesai.emit(hasil)
+
+
+# Menjalankan fungsi I/O di QThreadPool. Hasil, progres dan error dikirim
+# kembali ke thread GUI lewat sinyal. Pekerjaan dengan kunci yang sama
+# digabung: selama satu masih berjalan, permintaan berikutnya hanya
+# disimpan yang terbaru dan dijalankan setelah yang lama selesai.
+class PengelolaPekerjaan(QObject):
+    progres = pyqtSignal(str, int, str)
+    aktif_berubah = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self._berjalan = {}
+        self._antrean = {}
+
+    def sibuk(self):
+        return bool(self._berjalan)
+
+    def berjalan(self, nama):
+        return any(p.nama == nama for p in self._berjalan.values())
+
+    def jalankan(self, nama, fungsi, selesai=None, gagal=None, dibatalkan=None, bagian=None):
+        # fungsi(konteks) dijalankan di thread pekerja; callback di thread GUI
+        pekerjaan = Pekerjaan(nama, fungsi)
+        pekerjaan.sinyal.progres.connect(lambda persen, pesan: self.progres.emit(nama, persen, pesan))
+        if bagian:
+            pekerjaan.sinyal.bagian.connect(bagian)
+        pekerjaan.sinyal.selesai.connect(lambda hasil: self._akhiri(pekerjaan, selesai, hasil))
+        pekerjaan.sinyal.gagal.connect(lambda pesan: self._akhiri(pekerjaan, gagal, pesan))
+        pekerjaan.sinyal.dibatalkan.connect(lambda: self._akhiri(pekerjaan, dibatalkan))
+
+        kosong = not self._berjalan
+        self._berjalan[id(pekerjaan)] = pekerjaan
+        if kosong:
+            self.aktif_berubah.emit(True)
+        self.pool.start(pekerjaan)
+        return pekerjaan
+
+    def jalankan_gabung(self, kunci, siapkan, selesai=None, gagal=None):
+        # siapkan() dipanggil di thread GUI tepat sebelum pekerjaan dimulai
+        # dan mengembalikan fungsi pekerja (atau None jika tidak ada yang
+        # perlu dikerjakan), jadi yang ditulis selalu keadaan terbaru
+        if self.berjalan(kunci):
+            self._antrean[kunci] = (siapkan, selesai, gagal)
+            return
+        fungsi = siapkan()
+        if fungsi is None:
+            if selesai:
+                selesai(None)
+            return
+
+        def lanjut(callback):
+            def jalan(*args):
+                # Mulai permintaan yang tertunda dulu, karena callback bisa
+                # menampilkan dialog yang menahan event loop
+                berikut = self._antrean.pop(kunci, None)
+                if berikut:
+                    self.jalankan_gabung(kunci, *berikut)
+                if callback:
+                    callback(*args)
+            return jalan
+
+        self.jalankan(kunci, fungsi, lanjut(selesai), lanjut(gagal), lanjut(None))
+
+    def _akhiri(self, pekerjaan, callback, *args):
+        self._berjalan.pop(id(pekerjaan), None)
+        if not self._berjalan:
+            self.aktif_berubah.emit(False)
+        if callback:
+            callback(*args)
+
+    def batal_semua(self):
+        for pekerjaan in self._berjalan.values():
+            pekerjaan.konteks.batal()
+        self._antrean.clear()
+
+    def tunggu_thread(self, nama):
+        # Tunggu fungsi pekerjaan `nama` yang sedang berjalan selesai di
+        # thread pekerja, tanpa memproses event (callback-nya tidak dijalankan)
+        for pekerjaan in list(self._berjalan.values()):
+            if pekerjaan.nama == nama:
+                pekerjaan.beres.wait()
@@ -0,0 +1,116 @@
+import datetime
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from config import LEDGER_PATH
+from store import parse_harga, parse_tanggal
+
+KOLOM_LEDGER = ['No Kamar', 'Nama Penghuni', 'Periode', 'Jumlah', 'Tanggal Bayar']
+
+
+def periode_sekarang():
+    return datetime.date.today().strftime('%Y-%m')
+
+
+def indeks_bulan(periode):
+    # 'YYYY-MM' -> tahun * 12 + bulan, agar selisih bulan cukup dikurangkan
+    tanggal = pd.to_datetime(periode, format='%Y-%m', errors='coerce')
+    return tanggal.dt.year * 12 + tanggal.dt.month
+
+
+# Buku pembayaran bulanan: satu baris per kamar per periode (penghuni,
+# jumlah, tanggal bayar) di tabel SQLite 'pembayaran'; mencatat periode yang
+# sama lagi menimpa catatan sebelumnya
+class BukuPembayaran:
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pembayaran (
+                id INTEGER PRIMARY KEY,
+                no_kamar TEXT NOT NULL,
+                nama_penghuni TEXT NOT NULL,
+                periode TEXT NOT NULL,
+                jumlah INTEGER NOT NULL,
+                tanggal_bayar TEXT NOT NULL
+            )
+        """)
+        ada = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_pembayaran_periode'").fetchone()
+        if not ada:
+            # Database lama bisa berisi periode ganda: simpan yang terakhir
+            # dicatat, lalu pasang indeks unik penggantinya
+            with conn:
+                conn.execute('DELETE FROM pembayaran WHERE id NOT IN '
+                             '(SELECT MAX(id) FROM pembayaran GROUP BY no_kamar, periode)')
+                conn.execute('DROP INDEX IF EXISTS idx_pembayaran_kamar')
+                conn.execute('CREATE UNIQUE INDEX idx_pembayaran_periode ON pembayaran (no_kamar, periode)')
+        return conn
+
+    def load(self):
+        conn = self._connect()
+        try:
+            df = pd.read_sql_query(
+                'SELECT no_kamar, nama_penghuni, periode, jumlah, tanggal_bayar FROM pembayaran', conn)
+        finally:
+            conn.close()
+        df.columns = KOLOM_LEDGER
+        return df
+
+    def catat(self, no_kamar, nama, periode, jumlah, tanggal_bayar=None):
+        tanggal_bayar = tanggal_bayar or datetime.date.today().isoformat()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT INTO pembayaran (no_kamar, nama_penghuni, periode, jumlah, tanggal_bayar) '
+                    'VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT(no_kamar, periode) DO UPDATE SET nama_penghuni = excluded.nama_penghuni, '
+                    'jumlah = excluded.jumlah, tanggal_bayar = excluded.tanggal_bayar',
+                    (no_kamar, nama, periode, int(jumlah), tanggal_bayar)
+                )
+        finally:
+            conn.close()
+        return {'No Kamar': no_kamar, 'Nama Penghuni': nama, 'Periode': periode,
+                'Jumlah': int(jumlah), 'Tanggal Bayar': tanggal_bayar}
+
+
+def hitung_tunggakan(kamar, pembayaran, sampai=None):
+    # Menghitung bulan tunggakan dan sisa tagihan semua penghuni sekaligus.
+    # Tagihan berjalan dari bulan Tanggal Masuk sampai bulan `sampai`
+    # (termasuk); setiap periode yang sudah dibayar penghuni yang sama
+    # mengurangi tunggakan. Kamar yang penghuninya belum punya catatan
+    # pembayaran sama sekali bernilai NaN, sehingga tampilan bisa kembali
+    # memakai status tertulis.
+    sampai = indeks_bulan(pd.Series([sampai or periode_sekarang()])).iloc[0]
+
+    terisi = kamar[kamar['Status Kamar'] != 'Kamar Kosong']
+    hasil = pd.DataFrame(index=terisi.index)
+    hasil['Nama'] = terisi['Nama Penghuni'].astype(str).str.strip().str.upper()
+    masuk = parse_tanggal(terisi['Tanggal Masuk'])
+    hasil['Mulai'] = masuk.dt.year * 12 + masuk.dt.month
+    hasil['Ditagih'] = (sampai - hasil['Mulai'] + 1).clip(lower=0)
+    hasil['Harga'] = parse_harga(terisi['Harga Kamar'])
+
+    bayar = pembayaran.assign(
+        Nama=pembayaran['Nama Penghuni'].astype(str).str.strip().str.upper(),
+        Bulan=indeks_bulan(pembayaran['Periode']),
+    )
+    penghuni = hasil[['Nama', 'Mulai']].rename_axis('No Kamar').reset_index()
+    bayar = bayar[['No Kamar', 'Nama', 'Bulan']].merge(penghuni, on=['No Kamar', 'Nama'], how='inner')
+    ada_catatan = bayar.groupby('No Kamar').size()
+    lunas = bayar[(bayar['Bulan'] >= bayar['Mulai']) & (bayar['Bulan'] <= sampai)]
+    dibayar = lunas.groupby('No Kamar').size()
+
+    bulan = (hasil['Ditagih'] - dibayar.reindex(hasil.index).fillna(0)).clip(lower=0)
+    bulan = bulan.where(hasil.index.isin(ada_catatan.index) & hasil['Mulai'].notna(), np.nan)
+    return pd.DataFrame({
+        'Bulan Tunggakan': bulan,
+        'Sisa Tagihan': bulan * hasil['Harga'],
+    }, index=hasil.index)
@@ -0,0 +1,223 @@
+import collections
+import contextlib
+import cProfile
+import datetime
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
+import numpy as np
+
+from config import PROFIL, PROFIL_DIR
+
+# Fase yang dicatat per aksi. 'dialog' adalah waktu menunggu pengguna di
+# dialog modal dan tidak dihitung sebagai latensi aksi.
+FASE = ('read', 'transform', 'write', 'render')
+BATAS_EMBER_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_KOSONG = contextlib.nullcontext()
+
+
+class Aksi:
+    def __init__(self, nama):
+        self.nama = nama
+        self.mulai = time.perf_counter()
+        self.fase = collections.defaultdict(float)  # detik per fase
+        self.berlanjut = False
+        self.latensi = None  # ms, diisi saat aksi selesai
+
+    def teks(self):
+        rincian = ', '.join(f"{nama} {self.fase[nama] * 1000:.1f}" for nama in FASE if nama in self.fase)
+        return f"{self.nama}: {self.latensi:.1f} ms" + (f" ({rincian})" if rincian else "")
+
+
+# Pencatat latensi aksi pengguna. Saat tidak aktif semua pemanggilan
+# mengembalikan context manager kosong sehingga biayanya bisa diabaikan.
+#
+# Aksi yang melanjutkan kerja di thread latar (import, export) memanggil
+# lanjutkan() lalu teruskan(aksi) di callback selesai; fase dari thread latar
+# dicatat dengan fase(nama, aksi).
+class Pengukur:
+    def __init__(self, aktif=False, folder=PROFIL_DIR, jendela=1000):
+        self.aktif = aktif
+        self.folder = folder
+        self.pendengar = []
+        self._lokal = threading.local()
+        self._kunci = threading.Lock()
+        self._riwayat = collections.defaultdict(lambda: collections.deque(maxlen=jendela))
+        self._trace = collections.deque(maxlen=200000)
+        self._nol = time.perf_counter()
+        self._profil = None
+
+    def _tumpukan(self):
+        tumpukan = getattr(self._lokal, 'aksi', None)
+        if tumpukan is None:
+            tumpukan = self._lokal.aksi = []
+        return tumpukan
+
+    def sekarang(self):
+        if not self.aktif:
+            return None
+        tumpukan = self._tumpukan()
+        return tumpukan[-1] if tumpukan else None
+
+    @contextlib.contextmanager
+    def _jalankan(self, aksi):
+        aksi.berlanjut = False
+        tumpukan = self._tumpukan()
+        tumpukan.append(aksi)
+        try:
+            yield aksi
+        finally:
+            tumpukan.pop()
+            if not aksi.berlanjut:
+                self._selesai(aksi)
+
+    def aksi(self, nama):
+        return self._jalankan(Aksi(nama)) if self.aktif else _KOSONG
+
+    def lanjutkan(self):
+        # Aksi saat ini belum selesai ketika fungsi GUI-nya kembali
+        aksi = self.sekarang()
+        if aksi is not None:
+            aksi.berlanjut = True
+        return aksi
+
+    def teruskan(self, aksi):
+        return self._jalankan(aksi) if aksi is not None else _KOSONG
+
+    @contextlib.contextmanager
+    def _ukur_fase(self, nama, aksi):
+        mulai = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._catat_fase(aksi, nama, mulai, time.perf_counter())
+
+    def fase(self, nama, aksi=None):
+        aksi = aksi or self.sekarang()
+        return self._ukur_fase(nama, aksi) if aksi is not None else _KOSONG
+
+    def iterasi(self, nama, iterable, aksi=None):
+        # Catat waktu setiap next() sebagai fase, mis. membaca chunk file
+        aksi = aksi or self.sekarang()
+        if aksi is None:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            with self._ukur_fase(nama, aksi):
+                item = next(iterator, _KOSONG)
+            if item is _KOSONG:
+                return
+            yield item
+
+    def _event(self, nama, kategori, mulai, selesai, args=None):
+        event = {
+            'name': nama, 'cat': kategori, 'ph': 'X', 'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'ts': (mulai - self._nol) * 1e6, 'dur': (selesai - mulai) * 1e6,
+        }
+        if args:
+            event['args'] = args
+        return event
+
+    def _catat_fase(self, aksi, nama, mulai, selesai):
+        with self._kunci:
+            aksi.fase[nama] += selesai - mulai
+            if nama != 'dialog':
+                self._riwayat[f"{aksi.nama}.{nama}"].append((selesai - mulai) * 1000)
+            self._trace.append(self._event(f"{aksi.nama}.{nama}", 'fase', mulai, selesai))
+
+    def _selesai(self, aksi):
+        selesai = time.perf_counter()
+        with self._kunci:
+            aksi.latensi = (selesai - aksi.mulai - aksi.fase.get('dialog', 0.0)) * 1000
+            self._riwayat[aksi.nama].append(aksi.latensi)
+            self._trace.append(self._event(aksi.nama, 'aksi', aksi.mulai, selesai, {
+                'latensi_ms': aksi.latensi,
+                **{f"{nama}_ms": detik * 1000 for nama, detik in aksi.fase.items()},
+            }))
+        for pendengar in self.pendengar:
+            pendengar(aksi)
+
+    def ringkasan(self):
+        # Histogram bergulir (jendela N aksi terakhir) per aksi dan per fase
+        with self._kunci:
+            riwayat = {kunci: np.array(nilai) for kunci, nilai in self._riwayat.items() if nilai}
+        ember = np.array((0,) + BATAS_EMBER_MS + (np.inf,))
+        hasil = {}
+        for kunci, nilai in sorted(riwayat.items()):
+            p50, p90, p99 = np.percentile(nilai, [50, 90, 99])
+            hitungan, _ = np.histogram(nilai, ember)
+            hasil[kunci] = {
+                'n': int(len(nilai)), 'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99,
+                'maks_ms': float(nilai.max()),
+                'histogram': {f"<{batas}ms" if batas != np.inf else f">={BATAS_EMBER_MS[-1]}ms": int(n)
+                              for batas, n in zip(ember[1:], hitungan)},
+            }
+        return hasil
+
+    def _path(self, awalan, ekstensi):
+        os.makedirs(self.folder, exist_ok=True)
+        waktu = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        return os.path.join(self.folder, f"{awalan}-{waktu}.{ekstensi}")
+
+    def simpan(self):
+        # Trace bisa dibuka di chrome://tracing atau ui.perfetto.dev
+        with self._kunci:
+            events = list(self._trace)
+        path_trace = self._path('trace', 'json')
+        with open(path_trace, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        path_ringkasan = self._path('histogram', 'json')
+        with open(path_ringkasan, 'w') as f:
+            json.dump(self.ringkasan(), f, indent=2)
+        return path_trace, path_ringkasan
+
+    def profil_aktif(self):
+        return self._profil is not None
+
+    def mulai_profil(self):
+        # cProfile hanya mengukur thread yang memanggilnya (thread GUI)
+        if self._profil is None:
+            self._profil = cProfile.Profile()
+            self._profil.enable()
+
+    def hentikan_profil(self):
+        if self._profil is None:
+            return None
+        profil, self._profil = self._profil, None
+        profil.disable()
+        path = self._path('cprofile', 'prof')
+        profil.dump_stats(path)
+        teks = io.StringIO()
+        pstats.Stats(profil, stream=teks).sort_stats('cumulative').print_stats(30)
+        with open(path[:-len('prof')] + 'txt', 'w') as f:
+            f.write(teks.getvalue())
+        return path
+
+
+pengukur = Pengukur(aktif=bool(PROFIL))
+
+
+def diukur(nama=None):
+    # Dekorator untuk metode aksi. Tanpa KOST_PROFIL metode dikembalikan apa
+    # adanya, jadi tidak ada biaya tambahan sama sekali.
+    def dekorator(fungsi):
+        if not pengukur.aktif:
+            return fungsi
+        jumlah_arg = fungsi.__code__.co_argcount - 1
+
+        @functools.wraps(fungsi)
+        def pembungkus(self, *args, **kwargs):
+            # Qt mengirim argumen sinyal (mis. checked) sebanyak yang diterima
+            # slot; argumen berlebih dibuang seperti pada metode aslinya
+            with pengukur.aksi(nama or fungsi.__name__):
+                return fungsi(self, *args[:jumlah_arg], **kwargs)
+        return pembungkus
+    return dekorator
@@ -0,0 +1,449 @@
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import sqlite3
+import ssl
+import sys
+import time
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from config import (
+    OUTBOX_PATH, REMINDER_CONCURRENCY, REMINDER_GATEWAY, REMINDER_RATE, REMINDER_RETRY,
+    REMINDER_TOKEN
+)
+
+TEMPLATE_PESAN = (
+    "Halo {nama}, kami mengingatkan bahwa pembayaran sewa kamar {no_kamar} "
+    "sebesar {harga} belum kami terima{bulan}. Mohon segera melakukan pembayaran. "
+    "Terima kasih."
+)
+
+
+def pilih_penunggak(df, tunggakan=None):
+    # Baris berstatus Menunggak yang punya nomor WhatsApp. Bila hasil buku
+    # pembayaran diberikan, penghuni yang masih punya tunggakan ikut dipilih.
+    # Nomor dikembalikan dalam bentuk teks untuk pesan dan outbox.
+    from store import teks_whatsapp_series
+
+    menunggak = df['Status Pembayaran'] == 'Menunggak'
+    if tunggakan is not None:
+        lewat = tunggakan.index[tunggakan['Bulan Tunggakan'].fillna(0) > 0]
+        menunggak |= df.index.isin(lewat)
+    nomor = teks_whatsapp_series(df['Nomor WhatsApp'])
+    terpilih = menunggak & (nomor != '')
+    return df[terpilih].assign(**{'Nomor WhatsApp': nomor[terpilih]})
+
+
+def buat_pesan(baris, bulan=None):
+    from store import format_harga
+
+    return TEMPLATE_PESAN.format(
+        nama=baris['Nama Penghuni'],
+        no_kamar=baris['No Kamar'],
+        harga=format_harga(baris['Harga Kamar']),
+        bulan=f" ({int(bulan)} bulan)" if bulan else "",
+    )
+
+
+# Outbox di SQLite. Setiap pengingat punya kunci periode:kamar:nomor, jadi
+# memasukkan pengingat yang sama dua kali (misalnya setelah restart) tidak
+# membuat pesan ganda, dan yang sudah terkirim tidak dikirim lagi.
+class Outbox:
+    def __init__(self, path=OUTBOX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                kunci TEXT PRIMARY KEY,
+                no_kamar TEXT NOT NULL,
+                nomor TEXT NOT NULL,
+                pesan TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'menunggu',
+                percobaan INTEGER NOT NULL DEFAULT 0,
+                galat TEXT NOT NULL DEFAULT '',
+                dibuat TEXT NOT NULL,
+                terkirim TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status)')
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def masukkan(self, df, tunggakan=None, periode=None):
+        periode = periode or datetime.date.today().strftime('%Y-%m')
+        sekarang = datetime.datetime.now().isoformat(timespec='seconds')
+        baris = []
+        for no_kamar, data in df.iterrows():
+            bulan = None
+            if tunggakan is not None and no_kamar in tunggakan.index:
+                bulan = tunggakan.at[no_kamar, 'Bulan Tunggakan']
+                bulan = None if bulan != bulan else bulan  # NaN
+            baris.append((f"{periode}:{data['No Kamar']}:{data['Nomor WhatsApp']}",
+                          data['No Kamar'], data['Nomor WhatsApp'], buat_pesan(data, bulan), sekarang))
+        with self.conn:
+            sebelum = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO outbox (kunci, no_kamar, nomor, pesan, dibuat) VALUES (?, ?, ?, ?, ?)',
+                baris
+            )
+            return self.conn.total_changes - sebelum
+
+    def menunggu(self):
+        return self.conn.execute(
+            "SELECT kunci, nomor, pesan FROM outbox WHERE status = 'menunggu' ORDER BY dibuat, kunci"
+        ).fetchall()
+
+    def tandai(self, kunci, status, galat='', percobaan=1):
+        # percobaan: jumlah permintaan HTTP pengiriman ini, termasuk ulangan
+        terkirim = datetime.datetime.now().isoformat(timespec='seconds') if status == 'terkirim' else ''
+        with self.conn:
+            self.conn.execute(
+                'UPDATE outbox SET status = ?, percobaan = percobaan + ?, galat = ?, terkirim = ? WHERE kunci = ?',
+                (status, percobaan, galat, terkirim, kunci)
+            )
+
+    def ulangi_gagal(self):
+        with self.conn:
+            return self.conn.execute(
+                "UPDATE outbox SET status = 'menunggu' WHERE status = 'gagal'").rowcount
+
+
+class GagalKirim(Exception):
+    def __init__(self, pesan, bisa_diulang=True):
+        super().__init__(pesan)
+        self.bisa_diulang = bisa_diulang
+        self.percobaan = 1
+
+
+async def http_post_json(url, data, token='', timeout=10):
+    # Klien HTTP/1.1 minimal di atas asyncio stream agar ribuan permintaan
+    # bisa berjalan bersamaan tanpa thread
+    bagian = urlsplit(url)
+    https = bagian.scheme == 'https'
+    port = bagian.port or (443 if https else 80)
+    path = (bagian.path or '/') + (f'?{bagian.query}' if bagian.query else '')
+    isi = json.dumps(data).encode('utf-8')
+    header = [
+        f'POST {path} HTTP/1.1',
+        f'Host: {bagian.hostname}',
+        'Content-Type: application/json',
+        f'Content-Length: {len(isi)}',
+        'Connection: close',
+    ]
+    if token:
+        header.append(f'Authorization: Bearer {token}')
+
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(bagian.hostname, port, ssl=ssl.create_default_context() if https else None),
+        timeout
+    )
+    try:
+        writer.write(('\r\n'.join(header) + '\r\n\r\n').encode('latin-1') + isi)
+        await writer.drain()
+        baris_status = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    try:
+        return int(baris_status.split()[1])
+    except (IndexError, ValueError):
+        raise GagalKirim(f"Respons gateway tidak valid: {baris_status!r}")
+
+
+class PembatasLaju:
+    # Token bucket: paling banyak `laju` permintaan per detik
+    def __init__(self, laju):
+        self.jeda = 1.0 / laju if laju > 0 else 0
+        self._berikut = 0.0
+        self._kunci = asyncio.Lock()
+
+    async def tunggu(self):
+        if not self.jeda:
+            return
+        async with self._kunci:
+            sekarang = time.monotonic()
+            giliran = max(self._berikut, sekarang)
+            self._berikut = giliran + self.jeda
+        if giliran > sekarang:
+            await asyncio.sleep(giliran - sekarang)
+
+
+async def _kirim_satu(url, token, nomor, pesan, laju, percobaan_maks, jeda_awal):
+    # Mengembalikan jumlah permintaan sampai terkirim; bila gagal, jumlahnya
+    # ada di GagalKirim.percobaan
+    for percobaan in range(percobaan_maks + 1):
+        await laju.tunggu()
+        try:
+            status = await http_post_json(url, {'phone': nomor, 'message': pesan}, token)
+            if 200 <= status < 300:
+                return percobaan + 1
+            if status != 429 and 400 <= status < 500:
+                raise GagalKirim(f"HTTP {status}", bisa_diulang=False)
+            galat = GagalKirim(f"HTTP {status}")
+        except GagalKirim as e:
+            if not e.bisa_diulang:
+                e.percobaan = percobaan + 1
+                raise
+            galat = e
+        except (OSError, asyncio.TimeoutError) as e:
+            galat = GagalKirim(f"{type(e).__name__}: {e}")
+        if percobaan < percobaan_maks:
+            # Backoff eksponensial dengan jitter
+            await asyncio.sleep(jeda_awal * (2 ** percobaan) * (0.5 + random.random()))
+    galat.percobaan = percobaan_maks + 1
+    raise galat
+
+
+async def kirim_outbox(outbox, url=REMINDER_GATEWAY, token=REMINDER_TOKEN, laju=REMINDER_RATE,
+                       paralel=REMINDER_CONCURRENCY, percobaan_maks=REMINDER_RETRY,
+                       jeda_awal=0.5, progres=None, batal=None):
+    # Mengirim semua pengingat berstatus 'menunggu' secara bersamaan.
+    # progres(selesai, total) dan batal() opsional, dipanggil dari loop asyncio.
+    if not url:
+        raise ValueError("Gateway WhatsApp belum diatur (KOST_WA_GATEWAY)")
+
+    antrean = outbox.menunggu()
+    hasil = {'terkirim': 0, 'gagal': 0, 'total': len(antrean)}
+    pembatas = PembatasLaju(laju)
+    semafor = asyncio.Semaphore(max(1, paralel))
+    mulai = time.perf_counter()
+
+    async def proses(kunci, nomor, pesan):
+        async with semafor:
+            if batal and batal():
+                return
+            try:
+                percobaan = await _kirim_satu(url, token, nomor, pesan, pembatas, percobaan_maks, jeda_awal)
+            except GagalKirim as e:
+                outbox.tandai(kunci, 'gagal', str(e), e.percobaan)
+                hasil['gagal'] += 1
+            else:
+                outbox.tandai(kunci, 'terkirim', percobaan=percobaan)
+                hasil['terkirim'] += 1
+            if progres:
+                progres(hasil['terkirim'] + hasil['gagal'], hasil['total'])
+
+    await asyncio.gather(*(proses(*baris) for baris in antrean))
+    hasil['detik'] = time.perf_counter() - mulai
+    hasil['per_detik'] = (hasil['terkirim'] + hasil['gagal']) / hasil['detik'] if hasil['detik'] else 0.0
+    return hasil
+
+
+async def jalankan_stub_gateway(host='127.0.0.1', port=0, gagal_setiap=0, respons=None, catatan=None):
+    # Gateway tiruan untuk pengujian lokal. Menerima POST, menyimpan pesan
+    # yang masuk, dan (opsional) membalas 503 setiap `gagal_setiap` permintaan.
+    # respons(data) mengembalikan kode HTTP sendiri untuk setiap permintaan;
+    # catatan (list) diisi (waktu monotonic, kode, data) semua permintaan.
+    diterima = []
+    hitungan = [0]
+
+    async def layani(reader, writer):
+        try:
+            panjang = 0
+            baris = await reader.readline()
+            while True:
+                h = await reader.readline()
+                if h in (b'\r\n', b'\n', b''):
+                    break
+                nama, _, nilai = h.decode('latin-1').partition(':')
+                if nama.strip().lower() == 'content-length':
+                    panjang = int(nilai.strip())
+            isi = await reader.readexactly(panjang) if panjang else b''
+            data = json.loads(isi or b'{}')
+            hitungan[0] += 1
+            if respons is not None:
+                kode = respons(data)
+            elif gagal_setiap and hitungan[0] % gagal_setiap == 0:
+                kode = 503
+            else:
+                kode = 200
+            if catatan is not None:
+                catatan.append((time.monotonic(), kode, data))
+            if 200 <= kode < 300:
+                diterima.append(data)
+            writer.write(f'HTTP/1.1 {kode} {HTTPStatus(kode).phrase}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n'.encode())
+            await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(layani, host, port)
+    alamat = server.sockets[0].getsockname()
+    return server, f'http://{alamat[0]}:{alamat[1]}/kirim', diterima
+
+
+async def _uji_throughput(jumlah, laju, paralel):
+    import tempfile
+
+    server, url, diterima = await jalankan_stub_gateway(gagal_setiap=50)
+    with tempfile.TemporaryDirectory() as folder:
+        outbox = Outbox(os.path.join(folder, 'outbox.db'))
+        df = _data_uji(jumlah)
+        outbox.masukkan(df)
+        hasil = await kirim_outbox(outbox, url, laju=laju, paralel=paralel, jeda_awal=0.01)
+        ulang = outbox.masukkan(df)
+        outbox.close()
+    server.close()
+    await server.wait_closed()
+    print(f"Pengingat            : {hasil['total']:,}")
+    print(f"Terkirim / gagal     : {hasil['terkirim']:,} / {hasil['gagal']:,}")
+    print(f"Diterima stub        : {len(diterima):,}")
+    print(f"Waktu                : {hasil['detik']:.2f} s ({hasil['per_detik']:.0f} pesan/detik)")
+    print(f"Dimasukkan ulang     : {ulang} (harus 0)")
+
+
+def _data_uji(jumlah, awalan='K'):
+    import pandas as pd
+
+    df = pd.DataFrame({
+        'No Kamar': [f'{awalan}{i}' for i in range(jumlah)],
+        'Nama Penghuni': [f'Penghuni {i}' for i in range(jumlah)],
+        'Nomor WhatsApp': [f'6281{i:08d}' for i in range(jumlah)],
+        'Harga Kamar': 500000,
+        'Status Pembayaran': 'Menunggak',
+    })
+    df.index = df['No Kamar']
+    return df
+
+
+async def _periksa():
+    # Pemeriksaan otomatis pengirim terhadap gateway tiruan: ulangan dan
+    # jumlah percobaan, kegagalan permanen, batas laju dan idempotensi
+    # outbox. Mengembalikan daftar (nama, lulus, keterangan).
+    import tempfile
+
+    hasil = []
+
+    def periksa(nama, lulus, keterangan=''):
+        hasil.append((nama, bool(lulus), keterangan))
+
+    def percobaan(outbox):
+        return dict(outbox.conn.execute('SELECT no_kamar, percobaan FROM outbox'))
+
+    def status(outbox):
+        return dict(outbox.conn.execute('SELECT no_kamar, status FROM outbox'))
+
+    with tempfile.TemporaryDirectory() as folder:
+        # Ulangan: setiap nomor ditolak dulu (503 atau 429), lalu diterima
+        dilihat = {}
+
+        def tolak_sekali(data):
+            dilihat[data['phone']] = dilihat.get(data['phone'], 0) + 1
+            if dilihat[data['phone']] > 1:
+                return 200
+            return 503 if int(data['phone'][-1]) % 2 else 429
+
+        catatan = []
+        server, url, diterima = await jalankan_stub_gateway(respons=tolak_sekali, catatan=catatan)
+        outbox = Outbox(os.path.join(folder, 'ulang.db'))
+        df = _data_uji(20)
+        outbox.masukkan(df)
+        r = await kirim_outbox(outbox, url, laju=0, paralel=10, jeda_awal=0.001)
+        periksa("ulangan 503/429 akhirnya terkirim", r['terkirim'] == 20 and len(diterima) == 20,
+                f"{r['terkirim']} terkirim, {len(diterima)} diterima")
+        periksa("percobaan tercatat per pengiriman", set(percobaan(outbox).values()) == {2},
+                f"percobaan {sorted(set(percobaan(outbox).values()))}, {len(catatan)} permintaan")
+
+        # Idempotensi: masukkan ulang dan kirim ulang tidak mengirim apa pun
+        ulang = outbox.masukkan(df)
+        sebelum = len(catatan)
+        r = await kirim_outbox(outbox, url, laju=0, paralel=10, jeda_awal=0.001)
+        periksa("idempoten: pengingat sama tidak dimasukkan/dikirim lagi",
+                ulang == 0 and r['total'] == 0 and len(catatan) == sebelum,
+                f"dimasukkan {ulang}, dikirim {r['total']}, permintaan baru {len(catatan) - sebelum}")
+        outbox.close()
+        server.close()
+        await server.wait_closed()
+
+        # Gagal permanen (400) tidak diulang; 503 terus-menerus berhenti
+        # setelah percobaan_maks ulangan
+        def gagal(data):
+            return 400 if data['phone'].endswith('0') else 503
+
+        catatan = []
+        server, url, diterima = await jalankan_stub_gateway(respons=gagal, catatan=catatan)
+        outbox = Outbox(os.path.join(folder, 'gagal.db'))
+        outbox.masukkan(_data_uji(2))
+        r = await kirim_outbox(outbox, url, laju=0, paralel=2, percobaan_maks=2, jeda_awal=0.001)
+        p = percobaan(outbox)
+        periksa("HTTP 400 tidak diulang, 503 diulang sampai batas",
+                r['gagal'] == 2 and p == {'K0': 1, 'K1': 3} and len(catatan) == 4,
+                f"percobaan {p}, {len(catatan)} permintaan")
+        # Ulangi yang gagal: percobaan bertambah, bukan dimulai dari nol
+        outbox.ulangi_gagal()
+        await kirim_outbox(outbox, url, laju=0, paralel=2, percobaan_maks=0, jeda_awal=0.001)
+        p = percobaan(outbox)
+        periksa("kirim ulang yang gagal menambah percobaan", p == {'K0': 2, 'K1': 4} and
+                set(status(outbox).values()) == {'gagal'}, f"percobaan {p}")
+        outbox.close()
+        server.close()
+        await server.wait_closed()
+
+        # Batas laju: 30 pesan pada 60 pesan/detik makan waktu >= 29/60 detik
+        catatan = []
+        server, url, diterima = await jalankan_stub_gateway(catatan=catatan)
+        outbox = Outbox(os.path.join(folder, 'laju.db'))
+        outbox.masukkan(_data_uji(30))
+        laju = 60
+        await kirim_outbox(outbox, url, laju=laju, paralel=30)
+        waktu = sorted(w for w, _, _ in catatan)
+        rentang = waktu[-1] - waktu[0]
+        periksa("batas laju dipatuhi", len(waktu) == 30 and rentang >= 0.9 * 29 / laju,
+                f"30 permintaan dalam {rentang:.2f} s (minimal {29 / laju:.2f} s)")
+        outbox.close()
+        server.close()
+        await server.wait_closed()
+    return hasil
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kirim pengingat WhatsApp ke penghuni yang menunggak")
+    parser.add_argument('--uji', type=int, metavar='N',
+                        help="ukur throughput dengan N pengingat ke gateway tiruan lokal")
+    parser.add_argument('--periksa', action='store_true',
+                        help="periksa ulangan, batas laju dan idempotensi terhadap gateway tiruan lokal")
+    parser.add_argument('--laju', type=float, default=REMINDER_RATE, help="pesan per detik (0 = tanpa batas)")
+    parser.add_argument('--paralel', type=int, default=REMINDER_CONCURRENCY)
+    parser.add_argument('--ulangi-gagal', action='store_true', help="kirim ulang pengingat yang gagal")
+    args = parser.parse_args(argv)
+
+    if args.uji:
+        asyncio.run(_uji_throughput(args.uji, args.laju, args.paralel))
+        return 0
+    if args.periksa:
+        hasil = asyncio.run(_periksa())
+        for nama, lulus, keterangan in hasil:
+            print(f"{'OK   ' if lulus else 'GAGAL'} {nama}" + (f" ({keterangan})" if keterangan else ""))
+        return 0 if all(lulus for _, lulus, _ in hasil) else 1
+
+    from ledger import BukuPembayaran, hitung_tunggakan
+    from store import load_data
+
+    outbox = Outbox()
+    try:
+        if args.ulangi_gagal:
+            outbox.ulangi_gagal()
+        df = load_data()
+        df.index = df['No Kamar']
+        # Tunggakan dari buku pembayaran seperti tombol Kirim Pengingat di
+        # aplikasi, agar keduanya memilih penghuni yang sama
+        tunggakan = hitung_tunggakan(df, BukuPembayaran().load())
+        baru = outbox.masukkan(pilih_penunggak(df, tunggakan))
+        hasil = asyncio.run(kirim_outbox(outbox, laju=args.laju, paralel=args.paralel))
+    finally:
+        outbox.close()
+    print(f"{baru} pengingat baru, {hasil['terkirim']} terkirim, {hasil['gagal']} gagal "
+          f"({hasil['per_detik']:.0f} pesan/detik)")
+    return 0 if not hasil['gagal'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import http.client
+import json
+import threading
+import time
+import uuid
+from urllib.parse import quote, urlsplit
+
+import pandas as pd
+
+from config import SERVER_URL
+from storage import KOLOM
+
+
+class KonflikVersi(Exception):
+    pass
+
+
+# Backend yang membaca dan menulis data kamar lewat server.py. Setiap kamar
+# dikirim bersama versi (ETag) terakhir yang diketahui klien; kamar yang
+# sudah diubah komputer lain ditolak server dan dicatat sebagai konflik.
+class ServerBackend:
+    per_baris = True
+
+    def __init__(self, url=SERVER_URL, timeout=10):
+        bagian = urlsplit(url)
+        self.url = url
+        self.host = bagian.hostname
+        self.port = bagian.port or 80
+        self.timeout = timeout
+        self.id_klien = uuid.uuid4().hex[:8]
+        self.id_server = None
+        self.nomor = -1  # versi server terakhir yang sudah diterima klien
+        self._versi = {}
+        self._konflik = {}
+        self._kunci = threading.Lock()
+        self._lokal = threading.local()
+        self._mendengar = None
+
+    def _koneksi(self):
+        # Satu koneksi keep-alive per thread
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is None:
+            conn = self._lokal.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def _minta(self, metode, path, data=None, header=None):
+        isi = json.dumps(data, ensure_ascii=False).encode('utf-8') if data is not None else None
+        header = dict(header or {}, **{'X-Klien': self.id_klien})
+        if isi is not None:
+            header['Content-Type'] = 'application/json'
+        for percobaan in range(2):
+            conn = self._koneksi()
+            try:
+                conn.request(metode, path, isi, header)
+                balasan = conn.getresponse()
+                mentah = balasan.read()
+                break
+            except (ConnectionError, http.client.HTTPException, OSError):
+                # Koneksi keep-alive yang sudah ditutup server: coba sekali lagi
+                conn.close()
+                self._lokal.conn = None
+                if percobaan:
+                    raise
+        return balasan.status, (json.loads(mentah) if mentah else None)
+
+    def ada(self):
+        return True
+
+    def load(self):
+        status, data = self._minta('GET', '/kamar')
+        if status != 200:
+            raise RuntimeError(f"Server menolak permintaan ({status}): {data}")
+        with self._kunci:
+            self.id_server = data['server']
+            self.nomor = data['versi']
+            self._versi = {baris['No Kamar']: baris.pop('_versi') for baris in data['kamar']}
+        return pd.DataFrame(data['kamar'], columns=KOLOM)
+
+    def _kirim(self, upsert, dihapus):
+        with self._kunci:
+            versi = dict(self._versi)
+        permintaan = {
+            'upsert': [{'baris': baris, 'versi': versi.get(baris['No Kamar'])} for baris in upsert],
+            'hapus': [{'no_kamar': k, 'versi': versi.get(k, '*')} for k in dihapus],
+        }
+        status, data = self._minta('POST', '/kamar/_batch', permintaan)
+        if status != 200:
+            raise RuntimeError(f"Server menolak permintaan ({status}): {data}")
+        konflik = {}
+        ditolak = []
+        with self._kunci:
+            for hasil in data['hasil']:
+                no_kamar = hasil['no_kamar']
+                if hasil['status'] in (200, 201):
+                    if hasil.get('versi'):
+                        self._versi[no_kamar] = hasil['versi']
+                    else:
+                        self._versi.pop(no_kamar, None)
+                elif hasil['status'] == 404:
+                    # Kamar yang mau dihapus memang sudah tidak ada
+                    self._versi.pop(no_kamar, None)
+                elif hasil['status'] == 412:
+                    konflik[no_kamar] = {'baris': hasil.get('baris'), 'versi': hasil.get('versi')}
+                else:
+                    ditolak.append(f"{no_kamar}: {hasil.get('galat', hasil['status'])}")
+            self._konflik.update(konflik)
+        if konflik:
+            raise KonflikVersi(f"{len(konflik)} kamar sudah diubah di komputer lain: {', '.join(sorted(konflik))}")
+        if ditolak:
+            raise RuntimeError("Server menolak: " + '; '.join(ditolak))
+
+    def save_all(self, df):
+        from store import baris_json
+        with self._kunci:
+            dihapus = set(self._versi) - set(df['No Kamar'])
+        self._kirim(baris_json(df), dihapus)
+
+    def simpan_perubahan(self, df_upsert, dihapus):
+        from store import baris_json
+        self._kirim(baris_json(df_upsert), dihapus)
+
+    def ambil_konflik(self):
+        # Konflik dari penyimpanan terakhir: {no_kamar: {'baris', 'versi'}},
+        # baris None berarti kamar sudah dihapus di server
+        with self._kunci:
+            konflik, self._konflik = self._konflik, {}
+        return konflik
+
+    def catat_versi(self, versi):
+        # Dipanggil setelah perubahan dari server diterapkan ke store
+        with self._kunci:
+            for no_kamar, etag in versi.items():
+                if etag:
+                    self._versi[no_kamar] = etag
+                else:
+                    self._versi.pop(no_kamar, None)
+
+    # --- notifikasi perubahan ---
+
+    def dengarkan(self, callback):
+        # callback(peristiwa) dipanggil dari thread latar untuk setiap
+        # perubahan dari komputer lain, atau {'jenis': 'muat_ulang'} bila
+        # klien tertinggal terlalu jauh dan harus memuat ulang semua data
+        if self._mendengar is None:
+            self._mendengar = threading.Thread(target=self._dengarkan, args=(callback,), daemon=True)
+            self._mendengar.start()
+
+    def mendengarkan(self):
+        return self._mendengar is not None
+
+    def _dengarkan(self, callback):
+        jeda = 1
+        while True:
+            try:
+                self._baca_peristiwa(callback)
+                jeda = 1
+            except Exception as e:
+                print(f"Koneksi notifikasi server terputus: {e}")
+            time.sleep(jeda)
+            jeda = min(jeda * 2, 30)
+
+    def _baca_peristiwa(self, callback):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            with self._kunci:
+                path = f'/peristiwa?sejak={self.nomor}&server={quote(self.id_server or "")}'
+            conn.request('GET', path, headers={'Accept': 'text/event-stream', 'X-Klien': self.id_klien})
+            balasan = conn.getresponse()
+            if balasan.status != 200:
+                raise RuntimeError(f"status {balasan.status}")
+            data = []
+            for baris in balasan:
+                baris = baris.decode('utf-8').rstrip('\r\n')
+                if baris.startswith('data:'):
+                    data.append(baris[5:].strip())
+                elif not baris and data:
+                    self._terima(json.loads('\n'.join(data)), callback)
+                    data = []
+        finally:
+            conn.close()
+
+    def _terima(self, peristiwa, callback):
+        # 'halo' hanya pembuka; server yang dijalankan ulang mengirim
+        # 'muat_ulang' karena id servernya berbeda
+        if peristiwa['jenis'] == 'halo':
+            return
+        if peristiwa['jenis'] == 'muat_ulang':
+            callback(peristiwa)
+            return
+        with self._kunci:
+            self.nomor = max(self.nomor, peristiwa['versi'])
+        if peristiwa.get('klien') == self.id_klien:
+            return
+        callback(peristiwa)
@@ -0,0 +1,151 @@
+# Riwayat operasi untuk undo/redo dan jejak audit. Setiap operasi hanya
+# menyimpan baris kamar yang disentuh, sebelum dan sesudah operasi (dalam
+# skema store), bukan salinan seluruh data, sehingga memori sebanding dengan
+# jumlah baris yang berubah. Operasi tertua dibuang bila batas baris atau
+# batas jumlah operasi terlampaui.
+import datetime
+
+import pandas as pd
+
+from config import RIWAYAT_MAKS_BARIS, RIWAYAT_MAKS_OPERASI
+from storage import KOLOM
+
+KOLOM_AUDIT = ['Waktu', 'Operasi', 'No Kamar', 'Perubahan']
+
+
+# Satu operasi: kamar yang berubah, barisnya sebelum dan sesudah (kamar yang
+# belum ada/sudah dihapus tidak punya baris), serta sidik per kamar untuk
+# memastikan kamar itu belum diubah lagi sebelum undo/redo
+class Operasi:
+    __slots__ = ('waktu', 'jenis', 'kamar', 'sebelum', 'sesudah', 'hash_sebelum', 'hash_sesudah')
+
+    def __init__(self, jenis, kamar, sebelum, sesudah, hash_sebelum, hash_sesudah):
+        self.waktu = datetime.datetime.now().isoformat(timespec='seconds')
+        self.jenis = jenis
+        self.kamar = kamar
+        self.sebelum = sebelum
+        self.sesudah = sesudah
+        self.hash_sebelum = hash_sebelum
+        self.hash_sesudah = hash_sesudah
+
+    def __repr__(self):
+        return f"Operasi({self.jenis!r}, {len(self.kamar)} kamar)"
+
+    @property
+    def label(self):
+        kamar = self.kamar[0] if len(self.kamar) == 1 else f"{len(self.kamar)} kamar"
+        return f"{self.jenis} ({kamar})"
+
+    def kebalikan(self, jenis):
+        # Catatan audit untuk undo: baris yang sama dengan arah terbalik
+        return Operasi(jenis, self.kamar, self.sesudah, self.sebelum, self.hash_sesudah, self.hash_sebelum)
+
+    def ulang(self, jenis):
+        return Operasi(jenis, self.kamar, self.sebelum, self.sesudah, self.hash_sebelum, self.hash_sesudah)
+
+
+class RiwayatOperasi:
+    def __init__(self, maks_baris=RIWAYAT_MAKS_BARIS, maks_operasi=RIWAYAT_MAKS_OPERASI):
+        self.maks_baris = maks_baris
+        self.maks_operasi = maks_operasi
+        self.reset()
+
+    def reset(self):
+        self._log = []      # semua operasi urut waktu, juga undo/redo (audit)
+        self._undo = []     # operasi yang bisa dibatalkan, terbaru di akhir
+        self._redo = []     # operasi yang sudah dibatalkan, terbaru di akhir
+        # Catatan undo/redo memakai DataFrame yang sama dengan operasi
+        # aslinya, jadi baris dihitung per DataFrame: id -> [pemakai, baris]
+        self._frame = {}
+        self._baris = 0
+
+    def __len__(self):
+        return len(self._log)
+
+    @property
+    def baris(self):
+        return self._baris
+
+    @property
+    def bisa_undo(self):
+        return bool(self._undo)
+
+    @property
+    def bisa_redo(self):
+        return bool(self._redo)
+
+    @property
+    def label_undo(self):
+        return self._undo[-1].label if self._undo else ''
+
+    @property
+    def label_redo(self):
+        return self._redo[-1].label if self._redo else ''
+
+    def catat(self, operasi, undo=True):
+        # undo=False hanya mencatat untuk audit, misalnya perubahan dari server
+        self._tambah_log(operasi)
+        if undo:
+            self._undo.append(operasi)
+            self._redo.clear()
+
+    def ambil_undo(self):
+        return self._undo.pop() if self._undo else None
+
+    def ambil_redo(self):
+        return self._redo.pop() if self._redo else None
+
+    def selesai_undo(self, operasi):
+        self._redo.append(operasi)
+        self._tambah_log(operasi.kebalikan(f"Undo {operasi.jenis}"))
+
+    def selesai_redo(self, operasi):
+        self._undo.append(operasi)
+        self._tambah_log(operasi.ulang(f"Redo {operasi.jenis}"))
+
+    def _tambah_log(self, operasi):
+        self._log.append(operasi)
+        for frame in (operasi.sebelum, operasi.sesudah):
+            rujukan = self._frame.setdefault(id(frame), [0, len(frame)])
+            if not rujukan[0]:
+                self._baris += rujukan[1]
+            rujukan[0] += 1
+        # Operasi terbaru selalu disimpan walaupun sendirian melebihi batas
+        while len(self._log) > 1 and (self._baris > self.maks_baris or len(self._log) > self.maks_operasi):
+            self._buang(self._log.pop(0))
+
+    def _buang(self, operasi):
+        for frame in (operasi.sebelum, operasi.sesudah):
+            rujukan = self._frame[id(frame)]
+            rujukan[0] -= 1
+            if not rujukan[0]:
+                del self._frame[id(frame)]
+                self._baris -= rujukan[1]
+        # Operasi yang lebih lama dari yang dibuang tidak bisa lagi di-undo
+        # (atau di-redo) berurutan, jadi ikut dilepas dari tumpukannya
+        for tumpukan in (self._undo, self._redo):
+            for i, o in enumerate(tumpukan):
+                if o is operasi:
+                    del tumpukan[:i + 1]
+                    break
+
+    def audit(self):
+        # Jejak audit: satu baris per kamar per operasi, dengan kolom yang
+        # berubah (nilai lama -> nilai baru), terbaru di akhir
+        from store import baris_json
+
+        hasil = []
+        for operasi in self._log:
+            lama = {b['No Kamar']: b for b in baris_json(operasi.sebelum)}
+            baru = {b['No Kamar']: b for b in baris_json(operasi.sesudah)}
+            for no_kamar in operasi.kamar:
+                a, b = lama.get(no_kamar), baru.get(no_kamar)
+                if a is None:
+                    perubahan = 'ditambahkan'
+                elif b is None:
+                    perubahan = 'dihapus'
+                else:
+                    perubahan = '; '.join(f"{kolom}: {a[kolom]!r} -> {b[kolom]!r}"
+                                          for kolom in KOLOM[1:] if a[kolom] != b[kolom])
+                hasil.append((operasi.waktu, operasi.jenis, no_kamar, perubahan))
+        return pd.DataFrame(hasil, columns=KOLOM_AUDIT)
@@ -0,0 +1,164 @@
+# Indeks pencarian nama penghuni. Setiap kamar menempati satu slot tetap
+# (seperti IndeksFilter); kata kunci 3 huruf atau lebih dicari lewat
+# trigram, yang lebih pendek lewat bitmap (mask boolean numpy per slot) per
+# huruf/pasangan huruf yang dibuat saat pertama dipakai. Indeks diperbarui
+# per kamar setiap kali ada upsert/hapus, jadi pencarian tidak perlu
+# memindai seluruh tabel atau membaca ulang file.
+import numpy as np
+
+# Bitmap kata kunci pendek yang disimpan; yang paling lama dibuat dibuang
+BATAS_BITMAP = 64
+
+# Perubahan lebih dari 1/PECAHAN_BANGUN_ULANG slot sekaligus membuang bitmap
+# (dibuat ulang saat dipakai), bukan memperbaruinya satu per satu
+PECAHAN_BANGUN_ULANG = 16
+
+
+def trigram(teks):
+    return {teks[i:i + 3] for i in range(len(teks) - 2)}
+
+
+class IndeksNama:
+    def __init__(self):
+        self.bangun([])
+
+    def __len__(self):
+        return len(self._slot)
+
+    def bangun(self, pasangan):
+        # pasangan: iterable (no_kamar, nama)
+        self._slot = {}                           # no_kamar -> slot
+        self._kosong = []                         # slot bekas kamar yang dihapus
+        self._nama = np.empty(0, dtype=object)    # slot -> nama (huruf besar)
+        self._hidup = np.zeros(0, dtype=bool)
+        self._trigram = {}                        # trigram -> set(slot)
+        self._bitmap = {}                         # kata kunci pendek -> mask
+        # Naik setiap kali ada kamar mendapat atau melepas slot, agar pemakai
+        # tahu pemetaan kamar -> slot yang disimpannya sudah usang
+        self.versi = 0
+        self.tambah_banyak(pasangan)
+
+    def _perbesar(self, kapasitas):
+        lama = len(self._hidup)
+        if kapasitas <= lama:
+            return
+        baru = max(kapasitas, lama * 2, 64)
+
+        def perluas(arr, isi):
+            hasil = np.full(baru, isi, dtype=arr.dtype)
+            hasil[:lama] = arr
+            return hasil
+
+        self._nama = perluas(self._nama, None)
+        self._hidup = perluas(self._hidup, False)
+        for kunci, mask in self._bitmap.items():
+            self._bitmap[kunci] = perluas(mask, False)
+
+    def _ambil_slot(self, no_kamar):
+        s = self._slot.get(no_kamar)
+        if s is None:
+            s = self._kosong.pop() if self._kosong else len(self._slot)
+            self._slot[no_kamar] = s
+            self._perbesar(s + 1)
+            self.versi += 1
+        return s
+
+    def _lepas_trigram(self, s):
+        for tg in trigram(self._nama[s]):
+            slot = self._trigram.get(tg)
+            if slot is not None:
+                slot.discard(s)
+                if not slot:
+                    del self._trigram[tg]
+
+    def tambah(self, no_kamar, nama):
+        self.tambah_banyak([(no_kamar, nama)])
+
+    def tambah_banyak(self, pasangan):
+        diubah = []
+        for no_kamar, nama in pasangan:
+            s = self._ambil_slot(no_kamar)
+            if self._hidup[s]:
+                self._lepas_trigram(s)
+            nama = str(nama).strip().upper()
+            self._nama[s] = nama
+            self._hidup[s] = True
+            for tg in trigram(nama):
+                self._trigram.setdefault(tg, set()).add(s)
+            diubah.append(s)
+        self._perbarui_bitmap(diubah)
+
+    def hapus(self, no_kamar):
+        self.hapus_banyak([no_kamar])
+
+    def hapus_banyak(self, kamar):
+        diubah = []
+        for no_kamar in kamar:
+            s = self._slot.pop(no_kamar, None)
+            if s is None:
+                continue
+            self._lepas_trigram(s)
+            self._nama[s] = None
+            self._hidup[s] = False
+            self._kosong.append(s)
+            diubah.append(s)
+        if diubah:
+            self.versi += 1
+            self._perbarui_bitmap(diubah)
+
+    def _perbarui_bitmap(self, slot):
+        if not slot or not self._bitmap:
+            return
+        if len(slot) * PECAHAN_BANGUN_ULANG > len(self._slot):
+            self._bitmap.clear()
+            return
+        nama = self._nama[slot]
+        for kunci, mask in self._bitmap.items():
+            mask[slot] = [n is not None and kunci in n for n in nama]
+
+    def _mask(self, kunci):
+        mask = self._bitmap.get(kunci)
+        if mask is None:
+            if len(self._bitmap) >= BATAS_BITMAP:
+                del self._bitmap[next(iter(self._bitmap))]
+            hidup = np.flatnonzero(self._hidup)
+            mask = np.zeros(len(self._hidup), dtype=bool)
+            mask[hidup] = [kunci in n for n in self._nama[hidup]]
+            self._bitmap[kunci] = mask
+        return mask
+
+    def slot(self, kamar):
+        # Slot setiap kamar (urut seperti masukan), -1 bila tidak terindeks
+        return np.fromiter((self._slot.get(k, -1) for k in kamar), dtype='int64', count=len(kamar))
+
+    def bitmap(self, keyword):
+        # Mask boolean per slot untuk kata kunci 1-2 huruf (jangan diubah
+        # pemakai); None untuk kata kunci lain, yang dicari lewat cari()
+        keyword = keyword.strip().upper()
+        if not 0 < len(keyword) < 3:
+            return None
+        return self._mask(keyword)
+
+    def cari(self, keyword):
+        # Slot kamar yang namanya memuat keyword (tidak berurutan)
+        keyword = keyword.strip().upper()
+        if not keyword:
+            return np.zeros(0, dtype='int64')
+        if len(keyword) < 3:
+            return np.flatnonzero(self._mask(keyword))
+
+        # Kandidat dari trigram yang paling jarang saja; irisan set besar
+        # lebih mahal daripada memeriksa substring kandidatnya langsung
+        kandidat = None
+        for tg in trigram(keyword):
+            slot = self._trigram.get(tg)
+            if not slot:
+                return np.zeros(0, dtype='int64')
+            if kandidat is None or len(slot) < len(kandidat):
+                kandidat = slot
+        slot = np.fromiter(kandidat, dtype='int64', count=len(kandidat))
+        if len(keyword) == 3:
+            return slot
+        # Trigram yang cocok belum tentu berurutan, jadi cek ulang substringnya
+        cocok = np.fromiter((keyword in n for n in self._nama[slot]), dtype=bool, count=len(slot))
+        return slot[cocok]
@@ -0,0 +1,376 @@
+# Server lokal agar beberapa komputer meja depan memakai satu data kamar.
+#
+#   python server.py --port 8765
+#   KOST_STORAGE=server KOST_SERVER=http://192.168.1.10:8765 python app.py
+#
+# Server memegang KostStore dan menyimpannya ke backend lokal (sqlite/excel).
+# Setiap kamar punya versi (ETag); perubahan hanya diterima bila klien
+# mengirim versi yang sama dengan versi di server (If-Match), sehingga
+# perubahan dari komputer lain tidak tertimpa diam-diam.
+#
+#   GET    /kamar[?cari=..&jenis=kamar|nama]   daftar atau pencarian
+#   GET    /kamar/<no>                         satu kamar
+#   PUT    /kamar/<no>                         tambah (If-None-Match: *) atau ubah (If-Match)
+#   DELETE /kamar/<no>                         hapus (If-Match)
+#   POST   /kamar/_batch                       banyak upsert/hapus sekaligus
+#   GET    /perubahan?sejak=<n>                peristiwa sejak versi n
+#   GET    /peristiwa?sejak=<n>&server=<id>    notifikasi perubahan (text/event-stream)
+import argparse
+import asyncio
+import collections
+import json
+import sys
+import uuid
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+
+from billing import JadwalPenagihan
+from config import CEK_JATUH_TEMPO_MENIT, STORAGE_BACKEND
+from importer import validasi_chunk
+from ledger import BukuPembayaran
+from snapshot import buat_snapshot
+from storage import buat_backend
+from store import KostStore, baris_json
+
+STATUS_HTTP = {
+    200: 'OK', 201: 'Created', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 410: 'Gone', 412: 'Precondition Failed',
+    428: 'Precondition Required', 500: 'Internal Server Error',
+}
+
+
+class KostServer:
+    def __init__(self, store, jeda_simpan=0.2, riwayat=10000):
+        self.store = store
+        self.id = uuid.uuid4().hex[:8]
+        self.versi = 0
+        self.versi_kamar = {no_kamar: 0 for no_kamar in store.data.index}
+        self.jeda_simpan = jeda_simpan
+        self.log = collections.deque(maxlen=riwayat)
+        self.pelanggan = set()
+        self._tugas_simpan = None
+        self._tugas_jatuh_tempo = None
+
+    def etag(self, versi):
+        # Id server ikut di ETag agar versi dari server sebelum restart ditolak
+        return f'"{self.id}-{versi}"'
+
+    def etag_kamar(self, no_kamar):
+        return self.etag(self.versi_kamar.get(no_kamar, 0))
+
+    def _baris(self, no_kamar):
+        return {'baris': baris_json(self.store.data.loc[[no_kamar]])[0], 'versi': self.etag_kamar(no_kamar)}
+
+    def _konflik(self, no_kamar, versi):
+        # versi None: kamar harus belum ada; '*': tanpa pemeriksaan
+        if versi == '*':
+            return None
+        ada = no_kamar in self.store.data.index
+        if versi is None:
+            return (412, {'galat': "Kamar sudah ada", **self._baris(no_kamar)}) if ada else None
+        if not ada:
+            return 412, {'galat': "Kamar sudah dihapus", 'baris': None, 'versi': None}
+        if versi != self.etag_kamar(no_kamar):
+            return 412, {'galat': "Kamar sudah diubah", **self._baris(no_kamar)}
+        return None
+
+    def _catat(self, jenis, no_kamar, klien):
+        self.versi += 1
+        if jenis == 'hapus':
+            self.versi_kamar.pop(no_kamar, None)
+            peristiwa = {'baris': None, 'etag': None}
+        else:
+            self.versi_kamar[no_kamar] = self.versi
+            isi = self._baris(no_kamar)
+            peristiwa = {'baris': isi['baris'], 'etag': isi['versi']}
+        peristiwa.update(versi=self.versi, jenis=jenis, no_kamar=no_kamar, klien=klien)
+        self.log.append(peristiwa)
+        for antrean in self.pelanggan:
+            antrean.put_nowait(peristiwa)
+        self._jadwalkan_simpan()
+
+    def upsert(self, baris, versi, klien=''):
+        valid, ditolak = validasi_chunk(pd.DataFrame([baris]))
+        if ditolak:
+            return 400, {'galat': "Data kamar tidak valid"}
+        no_kamar = valid['No Kamar'].iloc[0]
+        konflik = self._konflik(no_kamar, versi)
+        if konflik:
+            return konflik
+        aksi = self.store.upsert(valid.iloc[0].to_dict())
+        if aksi != "tidak berubah":
+            # Isi yang sama tidak menaikkan versi dan tidak dikirim ke klien lain
+            self._catat('upsert', no_kamar, klien)
+        return (201 if aksi == "ditambahkan" else 200), self._baris(no_kamar)
+
+    def hapus(self, no_kamar, versi, klien=''):
+        no_kamar = no_kamar.strip().upper()
+        if no_kamar not in self.store.data.index:
+            return 404, {'galat': "Kamar tidak ditemukan"}
+        konflik = self._konflik(no_kamar, versi)
+        if konflik:
+            return konflik
+        self.store.delete(no_kamar)
+        self._catat('hapus', no_kamar, klien)
+        return 200, {'versi': None}
+
+    def batch(self, data, klien=''):
+        hasil = []
+        for op in data.get('upsert', []):
+            baris = op.get('baris') or {}
+            status, isi = self.upsert(baris, op.get('versi'), klien)
+            hasil.append({'no_kamar': str(baris.get('No Kamar', '')).strip().upper(), 'status': status, **isi})
+        for op in data.get('hapus', []):
+            status, isi = self.hapus(op['no_kamar'], op.get('versi'), klien)
+            hasil.append({'no_kamar': op['no_kamar'].strip().upper(), 'status': status, **isi})
+        return 200, {'versi': self.versi, 'hasil': hasil}
+
+    def daftar(self, query):
+        df = self.store.data
+        if 'cari' in query:
+            jenis = "Nomor Kamar" if query.get('jenis', ['nama'])[0] == 'kamar' else "Nama Penghuni"
+            df = self.store.cari(jenis, query['cari'][0])
+        for param, kolom in (('status_pembayaran', 'Status Pembayaran'), ('status_kamar', 'Status Kamar')):
+            if param in query:
+                df = df[df[kolom] == query[param][0]]
+        kamar = baris_json(df)
+        for baris in kamar:
+            baris['_versi'] = self.etag_kamar(baris['No Kamar'])
+        return {'server': self.id, 'versi': self.versi, 'kamar': kamar}
+
+    def perubahan(self, sejak):
+        # None bila riwayat tidak lagi mencakup versi `sejak`
+        if sejak >= self.versi:
+            return []
+        if not self.log or self.log[0]['versi'] > sejak + 1:
+            return None
+        return [p for p in self.log if p['versi'] > sejak]
+
+    # --- penyimpanan ---
+
+    def _jadwalkan_simpan(self):
+        # Perubahan yang datang berdekatan ditulis sekaligus
+        if self._tugas_simpan is None or self._tugas_simpan.done():
+            self._tugas_simpan = asyncio.get_running_loop().create_task(self._simpan())
+
+    async def _simpan(self):
+        await asyncio.sleep(self.jeda_simpan)
+        while True:
+            perubahan = self.store.ambil_perubahan()
+            if perubahan is None:
+                return
+            if not await asyncio.to_thread(self.store.tulis_perubahan, perubahan):
+                self.store.kembalikan_perubahan(perubahan)
+                await asyncio.sleep(1)
+
+    async def tutup(self):
+        if self._tugas_jatuh_tempo is not None:
+            self._tugas_jatuh_tempo.cancel()
+        if self._tugas_simpan is not None:
+            await self._tugas_simpan
+        self.store.flush()
+
+    # --- jatuh tempo ---
+
+    def mulai_cek_jatuh_tempo(self, menit=CEK_JATUH_TEMPO_MENIT):
+        # Jatuh tempo diperiksa di server saja, dengan satu waktu pemeriksaan
+        # terakhir, agar komputer klien yang lama tidak menyala tidak
+        # memeriksa dari waktu lamanya sendiri dan menimpa status terbaru
+        if menit > 0 and self._tugas_jatuh_tempo is None:
+            self._tugas_jatuh_tempo = asyncio.get_running_loop().create_task(self._ulangi_cek_jatuh_tempo(menit))
+
+    async def _ulangi_cek_jatuh_tempo(self, menit):
+        while True:
+            try:
+                await self.cek_jatuh_tempo()
+            except Exception as e:
+                print(f"Error memeriksa jatuh tempo: {e}")
+            await asyncio.sleep(menit * 60)
+
+    async def cek_jatuh_tempo(self, sekarang=None):
+        # Penghuni Lunas yang jatuh temponya baru lewat menjadi Menunggak dan
+        # dikirim ke klien seperti perubahan lain
+        kamar = self.store.data[['Nama Penghuni', 'Tanggal Masuk', 'Status Kamar', 'Status Pembayaran']].copy()
+
+        def periksa():
+            return JadwalPenagihan().periksa(kamar, sekarang, BukuPembayaran().load())
+
+        kamar_baru = await asyncio.to_thread(periksa)
+        # Lewati kamar yang sudah diubah klien selama pemeriksaan berjalan
+        data = self.store.data
+        kamar_baru = [k for k in kamar_baru if k in data.index and data.at[k, 'Status Pembayaran'] == 'Lunas']
+        if kamar_baru:
+            self.store.perbarui(kamar_baru, {'Status Pembayaran': 'Menunggak'}, "Jatuh tempo")
+            for no_kamar in kamar_baru:
+                self._catat('upsert', no_kamar, 'jatuh-tempo')
+        return kamar_baru
+
+    # --- HTTP ---
+
+    async def _baca(self, reader):
+        baris = await reader.readline()
+        if not baris:
+            return None
+        metode, path, _ = baris.decode('latin-1').split(' ', 2)
+        header = {}
+        while True:
+            h = await reader.readline()
+            if h in (b'\r\n', b'\n', b''):
+                break
+            nama, _, nilai = h.decode('latin-1').partition(':')
+            header[nama.strip().lower()] = nilai.strip()
+        panjang = int(header.get('content-length', 0))
+        isi = await reader.readexactly(panjang) if panjang else b''
+        return metode, path, header, isi
+
+    def _tulis(self, writer, status, data=None, header=None):
+        isi = json.dumps(data, ensure_ascii=False).encode('utf-8') if data is not None else b''
+        baris = [f'HTTP/1.1 {status} {STATUS_HTTP.get(status, "")}',
+                 'Content-Type: application/json; charset=utf-8',
+                 f'Content-Length: {len(isi)}']
+        baris += [f'{nama}: {nilai}' for nama, nilai in (header or {}).items()]
+        writer.write(('\r\n'.join(baris) + '\r\n\r\n').encode('latin-1') + isi)
+
+    def _rute(self, metode, path, query, header, isi):
+        klien = header.get('x-klien', '')
+        data = json.loads(isi) if isi else {}
+
+        if path == '/kamar':
+            if metode != 'GET':
+                return 405, {'galat': "Metode tidak didukung"}, None
+            etag = self.etag(self.versi)
+            if header.get('if-none-match') == etag:
+                return 304, None, {'ETag': etag}
+            return 200, self.daftar(query), {'ETag': etag}
+
+        if path == '/kamar/_batch' and metode == 'POST':
+            return (*self.batch(data, klien), None)
+
+        if path.startswith('/kamar/'):
+            no_kamar = unquote(path[len('/kamar/'):]).strip().upper()
+            if metode == 'GET':
+                if no_kamar not in self.store.data.index:
+                    return 404, {'galat': "Kamar tidak ditemukan"}, None
+                isi = self._baris(no_kamar)
+                return 200, isi, {'ETag': isi['versi']}
+            if 'if-match' in header:
+                versi = header['if-match']
+            elif header.get('if-none-match') == '*' and metode == 'PUT':
+                versi = None
+            else:
+                return 428, {'galat': "Sertakan If-Match (atau If-None-Match: * untuk kamar baru)"}, None
+            if metode == 'PUT':
+                status, isi = self.upsert(dict(data, **{'No Kamar': no_kamar}), versi, klien)
+            elif metode == 'DELETE':
+                status, isi = self.hapus(no_kamar, versi, klien)
+            else:
+                return 405, {'galat': "Metode tidak didukung"}, None
+            return status, isi, {'ETag': isi['versi']} if isi.get('versi') else None
+
+        if path == '/perubahan' and metode == 'GET':
+            peristiwa = self.perubahan(int(query.get('sejak', ['0'])[0]))
+            if peristiwa is None:
+                return 410, {'galat': "Riwayat tidak lengkap, muat ulang daftar kamar"}, None
+            return 200, {'server': self.id, 'versi': self.versi, 'peristiwa': peristiwa}, None
+
+        return 404, {'galat': "Alamat tidak dikenal"}, None
+
+    def _kirim_peristiwa(self, writer, peristiwa):
+        writer.write(b'data: ' + json.dumps(peristiwa, ensure_ascii=False).encode('utf-8') + b'\n\n')
+
+    async def _alirkan(self, writer, query):
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n'
+                     b'Cache-Control: no-cache\r\nConnection: close\r\n\r\n')
+        self._kirim_peristiwa(writer, {'jenis': 'halo', 'server': self.id, 'versi': self.versi})
+        # Klien yang tersambung ulang menerima peristiwa yang terlewat, atau
+        # diminta memuat ulang bila riwayatnya sudah tidak ada
+        sejak = int(query.get('sejak', ['-1'])[0])
+        if sejak >= 0:
+            terlewat = self.perubahan(sejak) if query.get('server', [''])[0] == self.id else None
+            if terlewat is None:
+                self._kirim_peristiwa(writer, {'jenis': 'muat_ulang', 'versi': self.versi})
+            else:
+                for peristiwa in terlewat:
+                    self._kirim_peristiwa(writer, peristiwa)
+        antrean = asyncio.Queue()
+        self.pelanggan.add(antrean)
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    peristiwa = await asyncio.wait_for(antrean.get(), 15)
+                except asyncio.TimeoutError:
+                    writer.write(b': ping\n\n')
+                else:
+                    self._kirim_peristiwa(writer, peristiwa)
+                await writer.drain()
+        finally:
+            self.pelanggan.discard(antrean)
+
+    async def layani(self, reader, writer):
+        try:
+            while True:
+                permintaan = await self._baca(reader)
+                if permintaan is None:
+                    break
+                metode, path, header, isi = permintaan
+                url = urlsplit(path)
+                query = parse_qs(url.query)
+                if metode == 'GET' and url.path == '/peristiwa':
+                    await self._alirkan(writer, query)
+                    break
+                try:
+                    status, data, header_balasan = self._rute(metode, url.path, query, header, isi)
+                except (ValueError, KeyError) as e:
+                    status, data, header_balasan = 400, {'galat': str(e)}, None
+                except Exception as e:
+                    print(f"Error melayani {metode} {path}: {e}")
+                    status, data, header_balasan = 500, {'galat': str(e)}, None
+                self._tulis(writer, status, data, header_balasan)
+                await writer.drain()
+                if header.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def jalankan_server(store, host='127.0.0.1', port=8765, cek_jatuh_tempo=CEK_JATUH_TEMPO_MENIT):
+    kost = KostServer(store)
+    kost.mulai_cek_jatuh_tempo(cek_jatuh_tempo)
+    server = await asyncio.start_server(kost.layani, host, port)
+    alamat = server.sockets[0].getsockname()
+    return server, kost, f'http://{alamat[0]}:{alamat[1]}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server data kost bersama")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="alamat yang didengarkan (0.0.0.0 agar bisa diakses komputer lain)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--backend', choices=['sqlite', 'excel'],
+                        default=STORAGE_BACKEND if STORAGE_BACKEND != 'server' else 'sqlite')
+    args = parser.parse_args(argv)
+
+    store = KostStore(buat_backend(args.backend), snapshot=buat_snapshot(args.backend))
+
+    async def jalan():
+        server, kost, url = await jalankan_server(store, args.host, args.port)
+        print(f"Server kost berjalan di {url} ({len(store)} kamar)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await kost.tutup()
+
+    try:
+        asyncio.run(jalan())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
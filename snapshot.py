@@ -0,0 +1,355 @@
+# Snapshot historis tabel kamar untuk pertanyaan "siapa di kamar 2C bulan
+# Juni lalu" dan grafik hunian/pendapatan dari waktu ke waktu. Setiap
+# snapshot hanya menyimpan kamar yang isinya berubah (dibandingkan dengan
+# sidik baris, lihat hash_baris): setiap versi baris punya waktu mulai dan
+# selesai berlaku, jadi baris yang sama di banyak snapshot disimpan sekali.
+# Nomor kamar dan status disimpan sebagai kode kamus (dictionary encoding),
+# tanggal dan waktu sebagai angka.
+#
+# Baris versi tidak dikompresi lagi: satu baris hanya sekitar 70 byte
+# sehingga zlib per baris hampir tidak menghemat apa pun, dan kolom mulai,
+# selesai, status dan harga harus tetap berupa angka biasa agar pada() dan
+# deret() bisa disaring dan dijumlahkan langsung oleh SQLite. Penghematan
+# terbesar sudah datang dari dedup versi di atas.
+import datetime
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from config import SNAPSHOT, SNAPSHOT_PATH, STORAGE_BACKEND
+from storage import KOLOM
+from store import KOLOM_KATEGORI, hash_baris, parse_whatsapp, teks_whatsapp_series, urutkan_kamar
+
+_HARI = 86400
+# Waktu selesai versi yang masih berlaku (tepat sebagai float maupun int64)
+_SELAMANYA = 2**62
+
+# Kolom tabel versi_kamar selain waktu berlaku dan sidik, urut seperti KOLOM
+KOLOM_VERSI = ['kamar', 'nama', 'whatsapp', 'tanggal_masuk', 'status_kamar', 'status_pembayaran', 'harga']
+
+
+def buat_snapshot(backend=STORAGE_BACKEND):
+    # Snapshot dicatat di komputer yang menyimpan data; klien server tidak
+    # mencatat sendiri
+    if not SNAPSHOT or backend == 'server':
+        return None
+    return SnapshotKamar()
+
+
+def detik(waktu):
+    # datetime/teks/Timestamp -> detik sejak epoch (waktu lokal apa adanya)
+    return int(pd.Timestamp(waktu).value // 10**9)
+
+
+def _sidik_int64(sidik):
+    # Sidik uint64 (hash_baris) disimpan SQLite sebagai INTEGER bertanda
+    return sidik - (1 << 64) if sidik >= 1 << 63 else sidik
+
+
+def waktu_dari_detik(nilai):
+    return pd.to_datetime(nilai, unit='s')
+
+
+class SnapshotKamar:
+    def __init__(self, path=SNAPSHOT_PATH, mode=None):
+        # mode 'simpan': snapshot setiap kali data disimpan; 'harian': paling
+        # banyak satu snapshot per hari (penyimpanan pertama hari itu)
+        self.path = path
+        self.mode = mode or SNAPSHOT or 'simpan'
+        self._dimuat = False
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS snapshot (
+                waktu INTEGER PRIMARY KEY,
+                kamar INTEGER NOT NULL,
+                berubah INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS kamus (
+                kolom TEXT NOT NULL,
+                kode INTEGER NOT NULL,
+                nilai TEXT NOT NULL,
+                PRIMARY KEY (kolom, kode)
+            );
+            CREATE TABLE IF NOT EXISTS versi_kamar (
+                kamar INTEGER NOT NULL,
+                mulai INTEGER NOT NULL,
+                selesai INTEGER,
+                sidik INTEGER NOT NULL,
+                nama TEXT NOT NULL,
+                whatsapp INTEGER NOT NULL,
+                tanggal_masuk INTEGER,
+                status_kamar INTEGER NOT NULL,
+                status_pembayaran INTEGER NOT NULL,
+                harga INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_versi_kamar ON versi_kamar (kamar, mulai);
+            CREATE INDEX IF NOT EXISTS idx_versi_terbuka ON versi_kamar (kamar) WHERE selesai IS NULL;
+        """)
+        return conn
+
+    def _muat(self, conn):
+        # Kamus dan sidik versi yang masih berlaku dibaca sekali, lalu
+        # diperbarui di memori setiap catat()
+        if self._dimuat:
+            return
+        self._kode = {kolom: {} for kolom in KOLOM_KATEGORI}
+        self._nilai = {kolom: {} for kolom in KOLOM_KATEGORI}
+        for kolom, kode, nilai in conn.execute('SELECT kolom, kode, nilai FROM kamus'):
+            self._kode[kolom][nilai] = kode
+            self._nilai[kolom][kode] = nilai
+        self._terbuka = dict(conn.execute('SELECT kamar, sidik FROM versi_kamar WHERE selesai IS NULL'))
+        terakhir = conn.execute('SELECT waktu, digest FROM snapshot ORDER BY waktu DESC LIMIT 1').fetchone()
+        self._terakhir, self._digest = terakhir if terakhir else (None, None)
+        self._dimuat = True
+
+    def _kodekan(self, conn, kolom, nilai):
+        # Nilai -> kode kamus; nilai baru ditambahkan ke kamus
+        kode = self._kode[kolom]
+        baru = [v for v in dict.fromkeys(nilai) if v not in kode]
+        if baru:
+            awal = len(kode)
+            conn.executemany('INSERT INTO kamus (kolom, kode, nilai) VALUES (?, ?, ?)',
+                             [(kolom, awal + i, v) for i, v in enumerate(baru)])
+            for i, v in enumerate(baru):
+                kode[v] = awal + i
+                self._nilai[kolom][awal + i] = v
+        return [kode[v] for v in nilai]
+
+    def _pastikan_dimuat(self):
+        if not self._dimuat:
+            conn = self._connect()
+            try:
+                self._muat(conn)
+            finally:
+                conn.close()
+
+    def perlu(self, digest=None):
+        # Dipanggil di thread GUI sebelum data disalin untuk snapshot.
+        # Dilewati bila isi data sama dengan snapshot terakhir, atau pada
+        # mode harian bila hari ini sudah ada snapshot.
+        self._pastikan_dimuat()
+        if self._terakhir is None:
+            return True
+        if digest is not None and digest == self._digest:
+            return False
+        if self.mode == 'harian':
+            return waktu_dari_detik(self._terakhir).date() < datetime.date.today()
+        return True
+
+    def berbeda(self, sidik):
+        # sidik: {no_kamar: sidik} seluruh data (sidik dari hash_baris, lihat
+        # KostStore.sidik()). Mengembalikan nomor kamar yang isinya berbeda
+        # dari versi yang masih berlaku, ditambah kamar yang tidak ada lagi
+        # di data. Hanya sidik yang dibandingkan, data tidak disalin.
+        self._pastikan_dimuat()
+        kode = self._kode['No Kamar']
+        terbuka = self._terbuka
+        berubah = [k for k, s in sidik.items() if terbuka.get(kode.get(k)) != _sidik_int64(s)]
+        ada = {kode[k] for k in sidik if k in kode}
+        hilang = [self._nilai['No Kamar'][k] for k in terbuka if k not in ada]
+        return berubah + hilang
+
+    def catat(self, df, digest='', waktu=None):
+        # df: seluruh data kamar dalam skema store. Semua baris disidik lalu
+        # dicatat lewat catat_perubahan(); kamar yang tidak ada di df
+        # dianggap dihapus. Mengembalikan jumlah kamar yang berubah.
+        self._pastikan_dimuat()
+        kode = self._kode['No Kamar']
+        ada = {kode[k] for k in df['No Kamar'].astype(str).tolist() if k in kode}
+        dihapus = [self._nilai['No Kamar'][k] for k in self._terbuka if k not in ada]
+        return self.catat_perubahan(df, hash_baris(df).tolist(), dihapus, len(df), digest, waktu)
+
+    def catat_perubahan(self, df, sidik, dihapus, jumlah, digest='', waktu=None):
+        # df: hanya kamar yang (mungkin) berubah sejak snapshot terakhir,
+        # dengan sidik per barisnya; dihapus: nomor kamar yang sudah tidak
+        # ada; jumlah: banyak kamar di seluruh data. Menutup versi kamar yang
+        # berubah atau dihapus, menambah versi baru untuk kamar yang berubah
+        # atau baru (baris yang sidiknya sama dengan versi berlaku
+        # dilewati), dan mencatat satu baris snapshot. Mengembalikan jumlah
+        # kamar yang berubah.
+        conn = self._connect()
+        try:
+            self._muat(conn)
+            waktu = detik(waktu or datetime.datetime.now())
+            if self._terakhir is not None and waktu <= self._terakhir:
+                waktu = self._terakhir + 1  # waktu snapshot selalu naik
+            with conn:
+                kamar = self._kodekan(conn, 'No Kamar', df['No Kamar'].astype(str).tolist())
+                sidik = np.array(sidik, dtype='uint64').view('int64').tolist()
+                berubah = np.array([self._terbuka.get(k) != s for k, s in zip(kamar, sidik)], dtype=bool)
+                kode = self._kode['No Kamar']
+                hilang = {kode[k] for k in dihapus if kode.get(k) in self._terbuka}.difference(kamar)
+                tutup = [k for k, b in zip(kamar, berubah) if b and k in self._terbuka] + list(hilang)
+                conn.executemany('UPDATE versi_kamar SET selesai = ? WHERE kamar = ? AND selesai IS NULL',
+                                 [(waktu, k) for k in tutup])
+                baru = df[berubah]
+                if len(baru):
+                    tanggal = baru['Tanggal Masuk'].to_numpy(dtype='datetime64[D]').astype('int64')
+                    ada = ~np.isnat(baru['Tanggal Masuk'].to_numpy(dtype='datetime64[D]'))
+                    kolom = [
+                        np.array(kamar)[berubah].tolist(),
+                        [waktu] * len(baru),
+                        np.array(sidik, dtype='int64')[berubah].tolist(),
+                        baru['Nama Penghuni'].astype(str).tolist(),
+                        parse_whatsapp(baru['Nomor WhatsApp']).tolist(),
+                        [int(t) if a else None for t, a in zip(tanggal, ada)],
+                        self._kodekan(conn, 'Status Kamar', baru['Status Kamar'].astype(str).tolist()),
+                        self._kodekan(conn, 'Status Pembayaran', baru['Status Pembayaran'].astype(str).tolist()),
+                        baru['Harga Kamar'].astype('int64').tolist(),
+                    ]
+                    conn.executemany(
+                        'INSERT INTO versi_kamar (kamar, mulai, sidik, nama, whatsapp, tanggal_masuk, '
+                        'status_kamar, status_pembayaran, harga) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        list(zip(*kolom)))
+                conn.execute('INSERT INTO snapshot (waktu, kamar, berubah, digest) VALUES (?, ?, ?, ?)',
+                             (waktu, jumlah, int(berubah.sum()) + len(hilang), digest))
+        finally:
+            conn.close()
+        for k in hilang:
+            del self._terbuka[k]
+        self._terbuka.update((k, s) for k, s, b in zip(kamar, sidik, berubah) if b)
+        self._terakhir, self._digest = waktu, digest
+        return int(berubah.sum()) + len(hilang)
+
+    def _baca_versi(self, sql, param=()):
+        conn = self._connect()
+        try:
+            self._muat(conn)
+            df = pd.read_sql_query(sql, conn, params=param)
+        finally:
+            conn.close()
+        return df
+
+    def _urai(self, df):
+        # Kolom versi_kamar -> kolom data kamar seperti load_data()
+        hasil = pd.DataFrame({
+            'No Kamar': df['kamar'].map(self._nilai['No Kamar']),
+            'Nama Penghuni': df['nama'],
+            'Nomor WhatsApp': teks_whatsapp_series(df['whatsapp'].astype('int64')),
+            'Tanggal Masuk': pd.to_datetime(df['tanggal_masuk'], unit='D'),
+            'Status Kamar': df['status_kamar'].map(self._nilai['Status Kamar']),
+            'Status Pembayaran': df['status_pembayaran'].map(self._nilai['Status Pembayaran']),
+            'Harga Kamar': df['harga'].astype('int64'),
+        }, columns=KOLOM)
+        return hasil
+
+    def pada(self, waktu):
+        # Isi tabel kamar seperti pada saat `waktu`
+        t = detik(waktu)
+        df = self._baca_versi(
+            f"SELECT {', '.join(KOLOM_VERSI)} FROM versi_kamar "
+            "WHERE mulai <= ? AND (selesai IS NULL OR selesai > ?)", (t, t))
+        return urutkan_kamar(self._urai(df)).reset_index(drop=True)
+
+    def kamar(self, no_kamar):
+        # Semua versi satu kamar: kolom Mulai/Selesai (NaT: masih berlaku)
+        # ditambah kolom data kamar
+        kode = self._kode_kamar(no_kamar)
+        if kode is None:
+            return pd.DataFrame(columns=['Mulai', 'Selesai'] + KOLOM)
+        df = self._baca_versi(
+            f"SELECT mulai, selesai, {', '.join(KOLOM_VERSI)} FROM versi_kamar WHERE kamar = ? ORDER BY mulai",
+            (kode,))
+        hasil = self._urai(df)
+        hasil.insert(0, 'Selesai', waktu_dari_detik(df['selesai']))
+        hasil.insert(0, 'Mulai', waktu_dari_detik(df['mulai']))
+        return hasil
+
+    def _kode_kamar(self, no_kamar):
+        if not self._dimuat:
+            self.perlu()
+        return self._kode['No Kamar'].get(no_kamar.strip().upper())
+
+    def deret(self, mulai=None, sampai=None, frekuensi='D'):
+        # Deret waktu hunian dan pendapatan pada akhir setiap periode
+        # (frekuensi pandas: 'D' harian, 'W' mingguan, 'ME' bulanan) dari
+        # seluruh versi sekaligus: setiap versi menambah nilainya pada waktu
+        # mulai dan mengurangkannya pada waktu selesai, jadi nilai pada
+        # waktu t adalah jumlah kumulatif kejadian sampai t.
+        conn = self._connect()
+        try:
+            self._muat(conn)
+            if mulai is None:
+                pertama = conn.execute('SELECT MIN(waktu) FROM snapshot').fetchone()[0]
+                mulai = waktu_dari_detik(pertama).normalize() if pertama is not None else pd.Timestamp.today()
+            mulai = pd.Timestamp(mulai)
+            sampai = pd.Timestamp(sampai) if sampai is not None else pd.Timestamp.today().normalize()
+            tanggal = pd.date_range(mulai, sampai, freq=frekuensi)
+            # Periode terakhir yang belum berakhir dihitung sampai `sampai`
+            if not len(tanggal) or tanggal[-1] < sampai:
+                tanggal = tanggal.append(pd.DatetimeIndex([sampai]))
+            # Nilai pada akhir hari setiap tanggal
+            titik = tanggal.values.astype('datetime64[s]').astype('int64') + _HARI - 1
+            # Hanya versi yang berlaku di dalam rentang; versi yang sudah
+            # selesai sebelum titik pertama menambah dan mengurangi nol.
+            # Dibaca sebagai tuple angka langsung ke numpy, tanpa DataFrame.
+            versi = np.array(conn.execute(
+                'SELECT mulai, COALESCE(selesai, ?), status_kamar, status_pembayaran, harga FROM versi_kamar '
+                'WHERE mulai <= ? AND (selesai IS NULL OR selesai > ?)',
+                (_SELAMANYA, int(titik[-1]), int(titik[0]))).fetchall(), dtype='int64').reshape(-1, 5)
+        finally:
+            conn.close()
+        awal, akhir, status_kamar, status_pembayaran, harga = versi.T
+        kosong = self._kode['Status Kamar'].get('Kamar Kosong', -1)
+        nunggak = self._kode['Status Pembayaran'].get('Menunggak', -1)
+        terisi = status_kamar != kosong
+        menunggak = terisi & (status_pembayaran == nunggak)
+
+        waktu = np.concatenate([awal, akhir])
+        urut = np.argsort(waktu, kind='stable')
+        posisi = np.searchsorted(waktu[urut], titik, side='right')
+
+        def nilai(bobot):
+            kumulatif = np.concatenate([[0], np.cumsum(np.concatenate([bobot, -bobot])[urut])])
+            return kumulatif[posisi]
+
+        satu = np.ones(len(versi), dtype='int64')
+        hasil = pd.DataFrame({
+            'Kamar': nilai(satu),
+            'Terisi': nilai(terisi.astype('int64')),
+            'Pendapatan': nilai(harga * terisi),
+            'Menunggak': nilai(menunggak.astype('int64')),
+            'Tunggakan': nilai(harga * menunggak),
+        }, index=pd.Index(tanggal, name='Tanggal'))
+        hasil.insert(2, 'Hunian (%)', (100 * hasil['Terisi'] / hasil['Kamar'].where(hasil['Kamar'] > 0)).round(1))
+        return hasil
+
+    def ukuran(self):
+        # Pertumbuhan penyimpanan per tahun riwayat: jumlah snapshot, versi
+        # baris baru, perkiraan byte di database (ukuran halaman tabel dan
+        # indeks snapshot dibagi menurut jumlah versi) dan ukuran bila setiap
+        # snapshot menyimpan seluruh tabel
+        conn = self._connect()
+        try:
+            nama = ('snapshot', 'kamus', 'versi_kamar', 'idx_versi_kamar', 'idx_versi_terbuka')
+            try:
+                total = conn.execute(
+                    f"SELECT SUM(pgsize) FROM dbstat WHERE name IN ({', '.join('?' * len(nama))})",
+                    nama).fetchone()[0] or 0
+            except sqlite3.OperationalError:
+                # SQLite tanpa dbstat: ukuran seluruh file database
+                total = conn.execute('PRAGMA page_count').fetchone()[0] * conn.execute('PRAGMA page_size').fetchone()[0]
+            versi = pd.read_sql_query(
+                "SELECT strftime('%Y', mulai, 'unixepoch') AS tahun, COUNT(*) AS versi FROM versi_kamar GROUP BY tahun",
+                conn)
+            snapshot = pd.read_sql_query(
+                "SELECT strftime('%Y', waktu, 'unixepoch') AS tahun, COUNT(*) AS snapshot, "
+                "SUM(kamar) AS baris_penuh FROM snapshot GROUP BY tahun", conn)
+        finally:
+            conn.close()
+        hasil = snapshot.merge(versi, on='tahun', how='outer').fillna(0).set_index('tahun').rename_axis('Tahun')
+        hasil = hasil.astype('int64')
+        per_versi = total / max(int(hasil['versi'].sum()), 1)
+        return pd.DataFrame({
+            'Snapshot': hasil['snapshot'],
+            'Versi Baru': hasil['versi'],
+            'Byte': (hasil['versi'] * per_versi).round().astype('int64'),
+            'Byte Tanpa Dedup': (hasil['baris_penuh'] * per_versi).round().astype('int64'),
+        })
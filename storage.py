@@ -0,0 +1,235 @@
+import os
+import sqlite3
+import pandas as pd
+
+from config import DATA_PATH, DB_PATH, STORAGE_BACKEND
+
+KOLOM = [
+    'No Kamar', 'Nama Penghuni', 'Nomor WhatsApp', 'Tanggal Masuk',
+    'Status Kamar', 'Status Pembayaran', 'Harga Kamar'
+]
+
+# Nama kolom di tabel SQLite untuk setiap kolom DataFrame
+KOLOM_SQL = {
+    'No Kamar': 'no_kamar',
+    'Nama Penghuni': 'nama_penghuni',
+    'Nomor WhatsApp': 'nomor_whatsapp',
+    'Tanggal Masuk': 'tanggal_masuk',
+    'Status Kamar': 'status_kamar',
+    'Status Pembayaran': 'status_pembayaran',
+    'Harga Kamar': 'harga_kamar',
+}
+
+
+def _baris(df):
+    df = df.reindex(columns=KOLOM)
+    if pd.api.types.is_datetime64_any_dtype(df['Tanggal Masuk']):
+        # Tanggal ditulis dengan format yang sama seperti data lama
+        df['Tanggal Masuk'] = df['Tanggal Masuk'].dt.strftime('%d/%m/%Y')
+    df = df.fillna('').astype(str)
+    # 'No Kamar' adalah kunci, jadi selalu disimpan dalam bentuk baku
+    df['No Kamar'] = df['No Kamar'].str.strip().str.upper()
+    # zip atas array object jauh lebih cepat daripada itertuples pada kolom string arrow
+    return list(zip(*(df[kolom].to_numpy(dtype=object) for kolom in KOLOM)))
+
+
+class ExcelBackend:
+    # xlsx tidak bisa ditulis per baris, jadi setiap perubahan menulis ulang file
+    per_baris = False
+
+    def __init__(self, path=DATA_PATH):
+        self.path = path
+        # Salinan biner di samping file xlsx, berlaku selama mtime dan
+        # ukuran xlsx tidak berubah, agar start berikutnya tidak perlu read_excel
+        self.path_cache = path + '.cache.pkl'
+
+    def ada(self):
+        return os.path.exists(self.path)
+
+    def _kunci_cache(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def _baca_cache(self, kunci):
+        if not os.path.exists(self.path_cache):
+            return None
+        try:
+            cache = pd.read_pickle(self.path_cache)
+            if cache['kunci'] == kunci:
+                return cache['df']
+        except Exception as e:
+            print(f"Cache tidak bisa dibaca, membaca ulang xlsx: {e}")
+        return None
+
+    def _tulis_cache(self, df, kunci):
+        try:
+            sementara = self.path_cache + '.tmp'
+            pd.to_pickle({'kunci': kunci, 'df': df}, sementara)
+            os.replace(sementara, self.path_cache)
+        except Exception as e:
+            print(f"Gagal menulis cache: {e}")
+
+    def load(self):
+        if not self.ada():
+            return pd.DataFrame(columns=KOLOM)
+        kunci = self._kunci_cache()
+        df = self._baca_cache(kunci)
+        if df is None:
+            df = pd.read_excel(self.path, dtype={'No Kamar': str, 'Nomor WhatsApp': str})
+            self._tulis_cache(df, kunci)
+        return df
+
+    def save_all(self, df):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        df.to_excel(self.path, index=False)
+        self._tulis_cache(df, self._kunci_cache())
+
+
+class SqliteBackend:
+    per_baris = True
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+
+    def ada(self):
+        return os.path.exists(self.path)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        # Harga dalam rupiah bulat. Database lama dengan kolom TEXT berisi
+        # "Rp. 450.000" tetap terbaca karena harga diurai ulang saat load
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS kamar (
+                no_kamar TEXT PRIMARY KEY,
+                {', '.join(f"{KOLOM_SQL[k]} TEXT NOT NULL DEFAULT ''" for k in KOLOM[1:-1])},
+                harga_kamar INTEGER NOT NULL DEFAULT 0,
+                versi INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # Setiap baris yang isinya berubah mendapat nomor versi baru, dan
+        # kamar yang dihapus dicatat di kamar_dihapus, agar ekspor bisa
+        # mengambil perubahan sejak ekspor terakhir saja
+        if 'versi' not in {baris[1] for baris in conn.execute('PRAGMA table_info(kamar)')}:
+            conn.execute('ALTER TABLE kamar ADD COLUMN versi INTEGER NOT NULL DEFAULT 0')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS kamar_dihapus (
+                no_kamar TEXT PRIMARY KEY,
+                versi INTEGER NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_kamar_nama ON kamar (nama_penghuni)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_kamar_versi ON kamar (versi)')
+        return conn
+
+    def load(self):
+        conn = self._connect()
+        try:
+            kolom = ', '.join(KOLOM_SQL[k] for k in KOLOM)
+            df = pd.read_sql_query(f'SELECT {kolom} FROM kamar', conn)
+        finally:
+            conn.close()
+        return df.rename(columns={v: k for k, v in KOLOM_SQL.items()})
+
+    def save_all(self, df):
+        conn = self._connect()
+        try:
+            with conn:
+                # Baris yang isinya sama tidak ditulis ulang, jadi versinya
+                # tetap dan tidak ikut ekspor perubahan
+                ada = {baris[0] for baris in conn.execute('SELECT no_kamar FROM kamar')}
+                versi = self._versi_baru(conn)
+                self._hapus(conn, ada - set(df['No Kamar'].str.strip().str.upper()), versi)
+                self._upsert(conn, df, versi)
+        finally:
+            conn.close()
+
+    def simpan_perubahan(self, df_upsert, dihapus):
+        conn = self._connect()
+        try:
+            with conn:
+                versi = self._versi_baru(conn)
+                if len(df_upsert):
+                    self._upsert(conn, df_upsert, versi)
+                if dihapus:
+                    self._hapus(conn, dihapus, versi)
+        finally:
+            conn.close()
+
+    def _versi_baru(self, conn):
+        # Satu nomor versi untuk semua baris dalam satu transaksi
+        return conn.execute(
+            'SELECT MAX(COALESCE((SELECT MAX(versi) FROM kamar), 0), '
+            'COALESCE((SELECT MAX(versi) FROM kamar_dihapus), 0)) + 1'
+        ).fetchone()[0]
+
+    def _upsert(self, conn, df, versi):
+        kolom = [KOLOM_SQL[k] for k in KOLOM]
+        isi = kolom[1:]
+        conn.executemany(
+            f"INSERT INTO kamar ({', '.join(kolom)}, versi) VALUES ({', '.join('?' * len(kolom))}, {versi}) "
+            f"ON CONFLICT(no_kamar) DO UPDATE SET "
+            f"{', '.join(f'{k} = excluded.{k}' for k in isi)}, versi = excluded.versi "
+            f"WHERE ({', '.join(f'kamar.{k}' for k in isi)}) IS NOT ({', '.join(f'excluded.{k}' for k in isi)})",
+            _baris(df)
+        )
+        conn.executemany('DELETE FROM kamar_dihapus WHERE no_kamar = ?',
+                         [(k,) for k in df['No Kamar'].str.strip().str.upper()])
+
+    def _hapus(self, conn, dihapus, versi):
+        kamar = [(k,) for k in dihapus]
+        conn.executemany(
+            f'INSERT OR REPLACE INTO kamar_dihapus (no_kamar, versi) '
+            f'SELECT no_kamar, {versi} FROM kamar WHERE no_kamar = ?', kamar)
+        conn.executemany('DELETE FROM kamar WHERE no_kamar = ?', kamar)
+
+    def perubahan_sejak(self, versi):
+        # Baris yang berubah dan kamar yang dihapus setelah versi `versi`;
+        # mengembalikan (df berubah, daftar kamar dihapus, versi terbaru)
+        conn = self._connect()
+        try:
+            # Dibaca dalam satu transaksi agar versi terbaru cocok dengan
+            # baris yang terbaca walaupun ada penyimpanan bersamaan
+            conn.execute('BEGIN')
+            kolom = ', '.join(KOLOM_SQL[k] for k in KOLOM)
+            df = pd.read_sql_query(f'SELECT {kolom} FROM kamar WHERE versi > ?', conn, params=(versi,))
+            dihapus = [baris[0] for baris in conn.execute(
+                'SELECT no_kamar FROM kamar_dihapus WHERE versi > ?', (versi,))]
+            terbaru = self._versi_baru(conn) - 1
+        finally:
+            conn.close()
+        return df.rename(columns={v: k for k, v in KOLOM_SQL.items()}), dihapus, terbaru
+
+
+def migrasi_dari_excel(sqlite_backend, excel_backend):
+    # Tulis ke file sementara dulu agar migrasi yang gagal tidak meninggalkan
+    # database setengah jadi yang dianggap sudah dimigrasi
+    df = excel_backend.load()
+    sementara = SqliteBackend(sqlite_backend.path + '.migrasi')
+    if sementara.ada():
+        os.remove(sementara.path)
+    sementara.save_all(df)
+    os.replace(sementara.path, sqlite_backend.path)
+    print(f"Migrasi {len(df)} baris dari {excel_backend.path} ke {sqlite_backend.path}")
+
+
+def buat_backend(jenis=STORAGE_BACKEND):
+    if jenis == 'excel':
+        return ExcelBackend()
+    if jenis == 'server':
+        from remote import ServerBackend
+        return ServerBackend()
+    if jenis != 'sqlite':
+        raise ValueError(f"Backend penyimpanan tidak dikenal: {jenis}")
+
+    backend = SqliteBackend()
+    # Migrasi sekali jalan: hanya jika database belum ada tapi file xlsx lama ada
+    excel = ExcelBackend()
+    if not backend.ada() and excel.ada():
+        try:
+            migrasi_dari_excel(backend, excel)
+        except Exception as e:
+            print(f"Error migrasi data: {e}")
+    return backend
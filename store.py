@@ -0,0 +1,791 @@
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from catalog import katalog
+from filter_index import IndeksFilter
+from riwayat import Operasi, RiwayatOperasi
+from search_index import IndeksNama
+from storage import KOLOM, buat_backend
+
+# Harga disimpan sebagai rupiah bulat; teks "Rp. 450.000" hanya dibuat
+# saat ditampilkan
+HARGA_KAMAR = [
+    450000, 500000, 550000, 600000,
+    650000, 700000, 750000, 800000,
+    850000, 900000, 950000, 1000000
+]
+
+def format_harga(nilai):
+    # 450000 -> "Rp. 450.000"; 0 berarti kamar tanpa harga (kosong)
+    nilai = int(nilai) if pd.notna(nilai) and nilai != '' else 0
+    return f"Rp. {nilai:,}".replace(',', '.') if nilai else ''
+
+harga_kamar = [format_harga(harga) for harga in HARGA_KAMAR]
+
+def parse_harga(harga):
+    # Versi vektor untuk satu kolom: "Rp. 450.000", "450000", 450000 atau
+    # 450000.0 (angka dari Excel) -> int64; kosong menjadi 0
+    if pd.api.types.is_numeric_dtype(harga):
+        return harga.fillna(0).astype('int64')
+    teks = harga.astype(str).str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+    angka = teks.str.replace(r'\D', '', regex=True)
+    return pd.to_numeric(angka, errors='coerce').fillna(0).astype('int64')
+
+def parse_harga_satu(nilai):
+    return int(parse_harga(pd.Series([nilai], dtype=object)).iloc[0])
+
+def _urai_tanggal(teks, format):
+    # Tanggal masuk hanya punya beberapa ribu nilai berbeda, jadi setiap nilai
+    # unik cukup diurai sekali lalu disebar kembali
+    kode, unik = pd.factorize(teks)
+    return pd.to_datetime(unik, format=format, errors='coerce').to_numpy()[kode]
+
+def parse_tanggal(tanggal):
+    # Versi vektor untuk satu kolom: "dd/mm/yyyy", "yyyy-mm-dd" (juga
+    # tanggal-waktu dari Excel) atau datetime -> datetime64[ns]; kosong NaT
+    if pd.api.types.is_datetime64_any_dtype(tanggal):
+        return tanggal.astype('datetime64[ns]')
+    teks = tanggal.astype(str).str.strip()
+    hasil = pd.Series(pd.NaT, index=tanggal.index, dtype='datetime64[ns]')
+    # Sel kosong dilewati agar to_datetime tetap di jalur cepat
+    isi = teks.str.match(r'^\d{1,2}/\d{1,2}/\d{4}$')
+    hasil[isi] = _urai_tanggal(teks[isi], '%d/%m/%Y')
+    iso = ~isi & teks.str.match(r'^\d{4}-\d{2}-\d{2}')
+    if iso.any():
+        hasil[iso] = _urai_tanggal(teks[iso].str[:10], '%Y-%m-%d')
+    return hasil
+
+def parse_tanggal_satu(nilai):
+    # np.datetime64 (bukan pd.NaT) agar baris baru tidak mengubah tipe kolom
+    return parse_tanggal(pd.Series([nilai], dtype=object)).to_numpy()[0]
+
+def format_tanggal(nilai):
+    return nilai.strftime('%d/%m/%Y') if pd.notna(nilai) and nilai != '' else ''
+
+def format_tanggal_series(tanggal):
+    return parse_tanggal(tanggal).dt.strftime('%d/%m/%Y').fillna('')
+
+def baris_json(df):
+    # Baris siap JSON untuk server/klien: tanggal dd/mm/yyyy, harga angka
+    df = df.reindex(columns=KOLOM)
+    df['Tanggal Masuk'] = format_tanggal_series(df['Tanggal Masuk'])
+    df['Harga Kamar'] = parse_harga(df['Harga Kamar'])
+    df['Nomor WhatsApp'] = teks_whatsapp_series(df['Nomor WhatsApp'])
+    df[KOLOM_TEKS] = df[KOLOM_TEKS].astype(object).fillna('').astype(str)
+    return df.to_dict('records')
+
+def ringkasan_baris(df):
+    # Sumbangan sekumpulan baris ke ringkasan hunian dan pendapatan. Store
+    # menjumlahkan/mengurangkan nilai ini setiap upsert, hapus dan merge.
+    peringkat = katalog().peringkat
+    terisi = df['Status Kamar'] != 'Kamar Kosong'
+    menunggak = terisi & (df['Status Pembayaran'] == 'Menunggak')
+    harga = df['Harga Kamar']
+    return {
+        'kamar': len(df),
+        'terisi': int(terisi.sum()),
+        'di_katalog': sum(no_kamar in peringkat for no_kamar in df['No Kamar']),
+        'pendapatan': int(harga[terisi].sum()),
+        'menunggak': int(menunggak.sum()),
+        'tunggakan': int(harga[menunggak].sum()),
+    }
+
+# Isi kolom untuk kamar yang dikosongkan, sama seperti form dengan status
+# "Kamar Kosong"
+NILAI_KAMAR_KOSONG = {
+    'Nama Penghuni': '', 'Nomor WhatsApp': '', 'Tanggal Masuk': '',
+    'Status Kamar': 'Kamar Kosong', 'Status Pembayaran': '', 'Harga Kamar': 0,
+}
+
+# Kolom selain tanggal dan harga berisi teks saat dimuat atau diimpor
+KOLOM_TEKS = [kolom for kolom in KOLOM if kolom not in ('Tanggal Masuk', 'Harga Kamar')]
+
+# Skema di memori (KostStore): kolom dengan sedikit nilai berbeda disimpan
+# sebagai categorical (kode 1-4 byte per baris), No Kamar sebagai categorical
+# atas katalog, dan nomor WhatsApp sebagai angka int64. Teks baru dibuat di
+# tepi: tabel, form, file dan JSON.
+STATUS_KAMAR = ["Sendiri", "Berdua", "Kamar Kosong"]
+STATUS_PEMBAYARAN = ["Lunas", "Menunggak", ""]
+KOLOM_KATEGORI = ['No Kamar', 'Status Kamar', 'Status Pembayaran']
+
+# Satu CategoricalDtype per kolom dipakai bersama semua DataFrame, agar
+# daftar kategori (untuk No Kamar: seluruh katalog) dan tabel hash-nya
+# hanya ada sekali di memori
+_dtype_dasar = {}
+
+def dtype_dasar(kolom):
+    if kolom == 'No Kamar':
+        sumber = katalog()
+        dasar = sumber.kode
+    else:
+        sumber = dasar = STATUS_KAMAR if kolom == 'Status Kamar' else STATUS_PEMBAYARAN
+    simpan = _dtype_dasar.get(kolom)
+    if simpan is None or simpan[0] is not sumber:
+        simpan = _dtype_dasar[kolom] = (sumber, pd.CategoricalDtype(pd.Index(dasar, dtype='str')))
+    return simpan[1]
+
+def kategori(nilai, dtype):
+    # Categorical dengan kategori dtype; nilai lain (mis. data lama atau
+    # kamar di luar katalog) ditambahkan di belakang
+    unik = pd.unique(nilai)
+    lain = [v for v, i in zip(unik, dtype.categories.get_indexer(unik)) if i < 0]
+    if lain:
+        dtype = pd.CategoricalDtype(dtype.categories.append(pd.Index(lain, dtype='str')))
+    return nilai.astype(dtype)
+
+def parse_whatsapp(nomor):
+    # Nomor dibakukan ke 62... lalu disimpan sebagai angka; kosong menjadi 0.
+    # int64 memuat 18 digit, jauh di atas 15 digit nomor telepon terpanjang.
+    if pd.api.types.is_integer_dtype(nomor):
+        return nomor.astype('int64')
+    angka = format_whatsapp_series(nomor.fillna('').astype(str)).str[:18]
+    return pd.to_numeric(angka.where(angka != '', '0'), errors='coerce').fillna(0).astype('int64')
+
+def parse_whatsapp_satu(nilai):
+    if isinstance(nilai, (int, np.integer)):
+        return int(nilai)
+    angka = format_whatsapp_number(nilai)[:18]
+    return int(angka) if angka else 0
+
+def teks_whatsapp(nilai):
+    if isinstance(nilai, str):
+        return nilai
+    return str(int(nilai)) if pd.notna(nilai) and nilai else ''
+
+def teks_whatsapp_series(nomor):
+    if not pd.api.types.is_integer_dtype(nomor):
+        return nomor.fillna('').astype(str)
+    return nomor.astype(str).where(nomor != 0, '')
+
+def terapkan_skema(df):
+    for kolom in KOLOM_KATEGORI:
+        df[kolom] = kategori(df[kolom].astype(str), dtype_dasar(kolom))
+    df['Nomor WhatsApp'] = parse_whatsapp(df['Nomor WhatsApp'])
+    return df
+
+def siapkan_data(df):
+    # Data dari backend, file impor atau server ke bentuk store: kolom
+    # lengkap, No Kamar baku dan unik, urut katalog, lalu skema di atas
+    df = df.reindex(columns=KOLOM)
+    df['Tanggal Masuk'] = parse_tanggal(df['Tanggal Masuk'])
+    df['Harga Kamar'] = parse_harga(df['Harga Kamar'])
+    # Masukan bisa sudah dalam skema (categorical, nomor WhatsApp angka)
+    df['Nomor WhatsApp'] = teks_whatsapp_series(df['Nomor WhatsApp'])
+    df[KOLOM_TEKS] = df[KOLOM_TEKS].astype(object).fillna('').astype(str)
+    df['No Kamar'] = df['No Kamar'].astype(str).str.strip().str.upper()
+    df = df.drop_duplicates('No Kamar', keep='last')
+    df = urutkan_kamar(df)
+    # Indeks tetap teks biasa untuk pencarian; kolomnya categorical
+    df = df.set_index('No Kamar', drop=False).rename_axis(None)
+    return terapkan_skema(df)
+
+def hash_baris(df):
+    # Sidik isi setiap baris (uint64). Dihitung dari nilai, jadi kolom
+    # categorical dan teks biasa dengan isi sama menghasilkan sidik yang sama.
+    # Categorical disidik lewat semua kategorinya, jadi untuk sebagian kecil
+    # baris (mis. satu chunk impor) No Kamar disidik langsung dari nilainya.
+    df = df[KOLOM]
+    besar = [kolom for kolom in KOLOM_KATEGORI
+             if isinstance(df[kolom].dtype, pd.CategoricalDtype) and len(df[kolom].cat.categories) > len(df)]
+    if besar:
+        df = df.astype({kolom: 'str' for kolom in besar})
+    return pd.util.hash_pandas_object(df, index=False)
+
+_MASK64 = (1 << 64) - 1
+
+def nilai_kolom(kolom, nilai):
+    # Ubah satu nilai masukan (teks dari form/CLI) ke tipe kolomnya
+    if kolom == 'Harga Kamar':
+        return parse_harga_satu(nilai)
+    if kolom == 'Tanggal Masuk':
+        return parse_tanggal_satu(nilai)
+    if kolom == 'Nomor WhatsApp':
+        return parse_whatsapp_satu(nilai)
+    return '' if nilai is None else str(nilai)
+
+def data_kosong():
+    df = pd.DataFrame(columns=KOLOM)
+    df['Tanggal Masuk'] = df['Tanggal Masuk'].astype('datetime64[ns]')
+    df['Harga Kamar'] = df['Harga Kamar'].astype('int64')
+    return df
+
+def urutkan_kamar(df):
+    # Urutan mengikuti katalog kamar, diurutkan sekali secara vektor
+    return df.sort_values('No Kamar', key=katalog().urutan, kind='stable')
+
+def load_data(backend=None):
+    try:
+        backend = backend or buat_backend()
+        df = backend.load()
+        if df.empty:
+            return data_kosong()
+        df = df.fillna('')
+        df['No Kamar'] = df['No Kamar'].astype(str).str.strip().str.upper()
+        df['Nama Penghuni'] = df['Nama Penghuni'].astype(str).str.strip()
+        df['Nomor WhatsApp'] = format_whatsapp_series(df['Nomor WhatsApp'])
+        df['Tanggal Masuk'] = parse_tanggal(df['Tanggal Masuk'])
+        df['Harga Kamar'] = parse_harga(df['Harga Kamar'])
+        return urutkan_kamar(df)
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        return data_kosong()
+
+def data_teks(df):
+    # Kebalikan skema untuk backend: nomor WhatsApp kembali menjadi teks
+    return df.assign(**{'Nomor WhatsApp': teks_whatsapp_series(df['Nomor WhatsApp'])})
+
+def save_data(df, backend=None):
+    try:
+        backend = backend or buat_backend()
+        df = data_teks(df)
+        df['No Kamar'] = df['No Kamar'].astype(str).str.strip().str.upper()
+        df = urutkan_kamar(df)
+        backend.save_all(df)
+        return True
+    except Exception as e:
+        print(f"Error saving data: {e}")
+        return False
+
+def format_whatsapp_number(nomor):
+    if pd.isna(nomor) or nomor == '':
+        return ''
+    nomor = ''.join(filter(str.isdigit, str(nomor)))
+    if nomor.startswith('0'):
+        nomor = '62' + nomor[1:]
+    elif not nomor.startswith('62'):
+        nomor = '62' + nomor
+    return nomor
+
+def format_whatsapp_series(nomor):
+    # Versi vektor dari format_whatsapp_number untuk satu kolom penuh
+    kosong = nomor.isna() | (nomor.astype(str) == '')
+    angka = nomor.astype(str).str.replace(r'\D', '', regex=True)
+    angka = angka.where(angka.str.startswith('62'), '62' + angka.str.replace(r'^0', '', regex=True))
+    return angka.where(~kosong, '')
+
+def cek_whatsapp(nomor):
+    # Menandai nomor dengan panjang tidak wajar dan nomor yang dipakai lebih
+    # dari satu kamar; mengembalikan (mask tidak valid, mask duplikat)
+    nomor = teks_whatsapp_series(nomor)
+    terisi = nomor != ''
+    panjang = nomor.str.len()
+    tidak_valid = terisi & ((panjang < 10) | (panjang > 15))
+    duplikat = terisi & nomor.duplicated(keep=False)
+    return tidak_valid, duplikat
+
+
+# Satu baris kamar untuk form dan dialog, tanpa membuat pd.Series.
+# Nilainya sudah dalam bentuk tampilan kecuali tanggal (Timestamp/NaT) dan
+# harga (int).
+class Kamar:
+    __slots__ = ('no_kamar', 'nama_penghuni', 'nomor_whatsapp', 'tanggal_masuk',
+                 'status_kamar', 'status_pembayaran', 'harga_kamar')
+
+    def __init__(self, no_kamar, nama_penghuni, nomor_whatsapp, tanggal_masuk,
+                 status_kamar, status_pembayaran, harga_kamar):
+        self.no_kamar = no_kamar
+        self.nama_penghuni = nama_penghuni
+        self.nomor_whatsapp = nomor_whatsapp
+        self.tanggal_masuk = tanggal_masuk
+        self.status_kamar = status_kamar
+        self.status_pembayaran = status_pembayaran
+        self.harga_kamar = harga_kamar
+
+    def __repr__(self):
+        return f"Kamar({self.no_kamar!r}, {self.nama_penghuni!r})"
+
+    @property
+    def terisi(self):
+        return self.status_kamar != "Kamar Kosong"
+
+
+# Penyimpanan data kamar di memori, diindeks dengan 'No Kamar'.
+# Data dibaca sekali saat dibuat, semua pembacaan/upsert/hapus dilayani
+# dari memori, dan backend baru ditulis saat flush() dipanggil. Backend
+# yang mendukung penulisan per baris hanya menerima kamar yang berubah.
+class KostStore:
+    def __init__(self, backend=None, muat=True, snapshot=None):
+        # muat=False membuat store kosong yang diisi belakangan lewat isi(),
+        # misalnya setelah data dibaca di thread latar. snapshot
+        # (SnapshotKamar) mencatat riwayat data setiap kali disimpan.
+        self.backend = backend
+        self.snapshot = snapshot
+        self.indeks_nama = IndeksNama()
+        self.indeks_filter = IndeksFilter()
+        self.riwayat = RiwayatOperasi()
+        self._merekam = True
+        if muat:
+            self.backend = self.backend or buat_backend()
+            self.isi(load_data(self.backend))
+        else:
+            self.isi(data_kosong())
+
+    def isi(self, df, backend=None):
+        if backend is not None:
+            self.backend = backend
+        self._df = siapkan_data(df)
+        self._berubah = set()
+        self._dihapus = set()
+        # Sidik per kamar dan digest seluruh data (jumlah sidik mod 2^64,
+        # tidak bergantung urutan sehingga bisa diperbarui per baris).
+        # Digest tersimpan adalah digest saat data terakhir dimuat/disimpan.
+        self._hash = dict(zip(self._df.index, hash_baris(self._df).tolist()))
+        self._digest = sum(self._hash.values()) & _MASK64
+        self._digest_tersimpan = self._digest
+        self.indeks_nama.bangun(zip(self._df.index, self._df['Nama Penghuni']))
+        self._slot_nama = None
+        self.indeks_filter.bangun(self._df)
+        self._ringkasan = ringkasan_baris(self._df)
+        # Kamar yang berubah sejak snapshot terakhir. None: data baru dimuat,
+        # snapshot berikutnya membandingkan semua sidik dengan versi yang
+        # berlaku di snapshot (lihat _ambil_snapshot)
+        self._belum_snapshot = None
+        # Riwayat undo merujuk data sebelumnya, jadi dimulai dari awal
+        self.riwayat.reset()
+
+    def _satukan_kategori(self, df):
+        # Tambahkan kategori yang belum ada (kamar baru di luar katalog, status
+        # data lama) sebelum nilai ditulis ke kolom categorical, lalu samakan
+        # tipe df dengan tipe store agar concat tetap categorical
+        for kolom in KOLOM_KATEGORI:
+            if kolom not in df:
+                continue
+            lama = self._df[kolom].cat.categories
+            baru = pd.Index(pd.unique(df[kolom].astype(str))).difference(lama)
+            if len(baru):
+                self._df[kolom] = self._df[kolom].cat.add_categories(baru)
+            df[kolom] = df[kolom].astype(str).astype(self._df[kolom].dtype)
+        return df
+
+    @property
+    def data(self):
+        return self._df
+
+    @property
+    def ringkasan(self):
+        # Kamar katalog yang belum punya baris dihitung sebagai kosong
+        r = dict(self._ringkasan)
+        r['kosong'] = r['kamar'] - r['terisi'] + max(len(katalog().kode) - r['di_katalog'], 0)
+        return r
+
+    def _ubah_ringkasan(self, df, tanda):
+        for kunci, nilai in ringkasan_baris(df).items():
+            self._ringkasan[kunci] += tanda * nilai
+
+    def _beda_hash(self, df):
+        # Sidik kamar di df (dalam skema store) tanpa mengubah apa pun;
+        # mengembalikan mask baris yang isinya berbeda dari sebelumnya atau
+        # kamar baru, beserta sidik barunya
+        baru = hash_baris(df).tolist()
+        berubah = np.array([self._hash.get(no_kamar) != h for no_kamar, h in zip(df.index, baru)], dtype=bool)
+        return berubah, baru
+
+    def _simpan_hash(self, kamar, sidik):
+        # Baru dipanggil setelah _df ditulis, supaya sidik dan digest tidak
+        # mendahului isi frame kalau penulisan gagal
+        for no_kamar, h in zip(kamar, sidik):
+            lama = self._hash.get(no_kamar)
+            self._hash[no_kamar] = h
+            self._digest = (self._digest + h - (lama or 0)) & _MASK64
+
+    def _catat_hash(self, df):
+        # Perbarui sidik kamar di df yang sudah tertulis di _df; mengembalikan
+        # mask baris yang isinya berubah
+        berubah, baru = self._beda_hash(df)
+        self._simpan_hash(df.index[berubah], np.asarray(baru, dtype=object)[berubah])
+        return berubah
+
+    def _hapus_hash(self, kamar):
+        for no_kamar in kamar:
+            lama = self._hash.pop(no_kamar, None)
+            if lama is not None:
+                self._digest = (self._digest - lama) & _MASK64
+
+    def _potret(self, kamar):
+        # Baris dan sidik kamar sebelum diubah, untuk riwayat; None bila
+        # operasi ini tidak dicatat (undo/redo, atau bagian dari terapkan)
+        if not self._merekam:
+            return None
+        kamar = pd.Index(kamar)
+        posisi = self._df.index.get_indexer(kamar)
+        sebelum = self._df.iloc[np.sort(posisi[posisi >= 0])].copy()
+        return sebelum, {no_kamar: self._hash.get(no_kamar) for no_kamar in kamar}
+
+    def _rekam(self, jenis, potret, undo=True):
+        # Catat kamar yang sidiknya berubah sejak _potret(); kamar yang
+        # isinya tetap tidak disimpan
+        if potret is None:
+            return
+        sebelum, hash_sebelum = potret
+        hash_sesudah = {no_kamar: self._hash.get(no_kamar) for no_kamar in hash_sebelum}
+        kamar = [no_kamar for no_kamar, h in hash_sebelum.items() if h != hash_sesudah[no_kamar]]
+        if not kamar:
+            return
+        if len(kamar) < len(hash_sebelum):
+            sebelum = sebelum[pd.Index(kamar).get_indexer(sebelum.index) >= 0]
+        ada = [no_kamar for no_kamar in kamar if hash_sesudah[no_kamar] is not None]
+        sesudah = self._df.iloc[np.sort(self._df.index.get_indexer(ada))].copy()
+        self.riwayat.catat(Operasi(jenis, kamar, sebelum, sesudah,
+                                   {k: hash_sebelum[k] for k in kamar},
+                                   {k: hash_sesudah[k] for k in kamar}), undo=undo)
+
+    @contextmanager
+    def _tanpa_riwayat(self):
+        merekam, self._merekam = self._merekam, False
+        try:
+            yield
+        finally:
+            self._merekam = merekam
+
+    def _pulihkan(self, operasi, sasaran, hash_sekarang, hash_sasaran):
+        # Kembalikan kamar operasi ke baris `sasaran`; ditolak bila ada kamar
+        # yang sudah berubah lagi (mis. dari komputer lain) sejak operasi itu
+        beda = [no_kamar for no_kamar in operasi.kamar if self._hash.get(no_kamar) != hash_sekarang[no_kamar]]
+        if beda:
+            lebih = f" dan {len(beda) - 5} lainnya" if len(beda) > 5 else ""
+            raise ValueError(f"Kamar {', '.join(beda[:5])}{lebih} sudah berubah sejak operasi "
+                             f"'{operasi.jenis}', riwayatnya tidak bisa dipakai lagi")
+        with self._tanpa_riwayat():
+            hapus = [no_kamar for no_kamar in operasi.kamar if hash_sasaran[no_kamar] is None]
+            if hapus:
+                self.hapus_banyak(hapus)
+            if len(sasaran):
+                self.merge(sasaran)
+
+    def undo(self):
+        # Membatalkan operasi terakhir; mengembalikan Operasi itu, atau None
+        # bila tidak ada yang bisa dibatalkan. Kamar yang dipulihkan ditandai
+        # untuk disimpan seperti perubahan biasa.
+        operasi = self.riwayat.ambil_undo()
+        if operasi is None:
+            return None
+        self._pulihkan(operasi, operasi.sebelum, operasi.hash_sesudah, operasi.hash_sebelum)
+        self.riwayat.selesai_undo(operasi)
+        return operasi
+
+    def redo(self):
+        operasi = self.riwayat.ambil_redo()
+        if operasi is None:
+            return None
+        self._pulihkan(operasi, operasi.sesudah, operasi.hash_sebelum, operasi.hash_sesudah)
+        self.riwayat.selesai_redo(operasi)
+        return operasi
+
+    @property
+    def digest(self):
+        return f'{self._digest:016x}'
+
+    def sidik(self):
+        # Salinan sidik per kamar, misalnya untuk membandingkan file impor
+        # di thread latar
+        return dict(self._hash)
+
+    @property
+    def dirty(self):
+        return bool(self._berubah or self._dihapus)
+
+    def __len__(self):
+        return len(self._df)
+
+    def __contains__(self, no_kamar):
+        return no_kamar.strip().upper() in self._df.index
+
+    def get(self, no_kamar):
+        no_kamar = no_kamar.strip().upper()
+        if no_kamar not in self._df.index:
+            return None
+        return self._df.loc[no_kamar]
+
+    def rekaman(self, no_kamar):
+        # Satu kamar sebagai Kamar untuk form dan dialog, dengan nomor
+        # WhatsApp sudah berupa teks
+        try:
+            posisi = self._df.index.get_loc(no_kamar.strip().upper())
+        except KeyError:
+            return None
+        no, nama, wa, tanggal, status_kamar, status_pembayaran, harga = self._df.iloc[posisi]
+        return Kamar(no, nama, teks_whatsapp(wa), tanggal, status_kamar, status_pembayaran, int(harga))
+
+    def upsert(self, record, operasi=None):
+        no_kamar = str(record['No Kamar']).strip().upper()
+        baru = no_kamar not in self._df.index
+        potret = self._potret([no_kamar])
+        nilai = dict(record, **{'No Kamar': no_kamar})
+        baris = pd.DataFrame({kolom: [nilai_kolom(kolom, nilai.get(kolom, ''))] for kolom in KOLOM}, index=[no_kamar])
+        baris = self._satukan_kategori(baris).astype(self._df.dtypes)
+        berubah, sidik = self._beda_hash(baris)
+        if not berubah[0]:
+            # Isi sama persis: tidak ada yang perlu ditulis
+            return "tidak berubah"
+        if baru:
+            # Baris baru lewat concat: menambah baris dengan .loc membuang
+            # tipe categorical
+            self._df = pd.concat([self._df, baris])
+            self._df.sort_index(key=katalog().urutan, kind='stable', inplace=True)
+        else:
+            self._ubah_ringkasan(self._df.loc[[no_kamar]], -1)
+            self._df.loc[no_kamar] = baris.iloc[0]
+        self._simpan_hash([no_kamar], sidik)
+        self._ubah_ringkasan(baris, 1)
+        self.indeks_filter.tambah(baris)
+        self._berubah.add(no_kamar)
+        self._dihapus.discard(no_kamar)
+        self.indeks_nama.tambah(no_kamar, self._df.at[no_kamar, 'Nama Penghuni'])
+        self._rekam(operasi or ("Tambah kamar" if baru else "Ubah kamar"), potret)
+        return "ditambahkan" if baru else "diupdate"
+
+    def perbarui(self, no_kamar, nilai, operasi=None):
+        # Isi kolom yang sama untuk banyak kamar sekaligus, misalnya status
+        # pembayaran. Kamar yang tidak ada dilewati; mengembalikan jumlah
+        # kamar yang diubah.
+        kamar = pd.Index([k.strip().upper() for k in no_kamar]).unique()
+        kamar = kamar[self._df.index.get_indexer(kamar) >= 0]
+        if not len(kamar):
+            return 0
+        potret = self._potret(kamar)
+        self._ubah_ringkasan(self._df.loc[kamar], -1)
+        nilai = {kolom: nilai_kolom(kolom, isi) for kolom, isi in nilai.items()}
+        self._satukan_kategori(pd.DataFrame({k: [v] for k, v in nilai.items()}))
+        for kolom, isi in nilai.items():
+            self._df.loc[kamar, kolom] = isi
+        self._ubah_ringkasan(self._df.loc[kamar], 1)
+        self.indeks_filter.tambah(self._df.loc[kamar])
+        kamar = kamar[self._catat_hash(self._df.loc[kamar])]
+        self._berubah.update(kamar)
+        self._dihapus.difference_update(kamar)
+        if 'Nama Penghuni' in nilai:
+            self.indeks_nama.tambah_banyak(zip(kamar, self._df.loc[kamar, 'Nama Penghuni']))
+        self._rekam(operasi or "Ubah kamar", potret)
+        return len(kamar)
+
+    def terapkan(self, df, dihapus=(), paksa=False):
+        # Perubahan dari luar (mis. komputer lain lewat server) diterapkan
+        # tanpa ditandai untuk disimpan. Kamar yang masih punya perubahan
+        # lokal belum tersimpan dilewati, kecuali paksa=True (perubahan lokal
+        # dibuang). Mengembalikan kamar yang diterapkan.
+        # Dicatat di riwayat hanya untuk audit: perubahan dari luar tidak
+        # di-undo dari komputer ini
+        lokal = set() if paksa else self._berubah | self._dihapus
+        berubah, dihapus_lokal = set(self._berubah), set(self._dihapus)
+        digest = self._digest
+        diterapkan = set()
+        kamar = df['No Kamar'].astype(str).str.strip().str.upper() if len(df) else pd.Series(dtype=str)
+        potret = self._potret(pd.Index(kamar).union(pd.Index(list(dihapus), dtype=str)).difference(list(lokal)))
+        with self._tanpa_riwayat():
+            if len(df):
+                df = df[~kamar.isin(lokal)]
+                if len(df):
+                    self.merge(df)
+                    diterapkan.update(kamar[~kamar.isin(lokal)])
+            for no_kamar in dihapus:
+                if no_kamar not in lokal and (self.delete(no_kamar) or paksa):
+                    diterapkan.add(no_kamar)
+        self._rekam("Perubahan dari server", potret, undo=False)
+        self._berubah, self._dihapus = berubah - diterapkan, dihapus_lokal - diterapkan
+        # Perubahan ini sudah tersimpan di sumbernya
+        self._digest_tersimpan = (self._digest_tersimpan + self._digest - digest) & _MASK64
+        return diterapkan
+
+    def delete(self, no_kamar, operasi=None):
+        no_kamar = no_kamar.strip().upper()
+        if no_kamar not in self._df.index:
+            return False
+        potret = self._potret([no_kamar])
+        self._ubah_ringkasan(self._df.loc[[no_kamar]], -1)
+        self._df.drop(no_kamar, inplace=True)
+        self._hapus_hash([no_kamar])
+        self._berubah.discard(no_kamar)
+        self._dihapus.add(no_kamar)
+        self.indeks_nama.hapus(no_kamar)
+        self.indeks_filter.hapus([no_kamar])
+        self._rekam(operasi or "Hapus kamar", potret)
+        return True
+
+    def hapus_banyak(self, no_kamar, operasi=None):
+        # Hapus banyak kamar dengan satu kali drop; mengembalikan jumlah
+        # kamar yang dihapus
+        kamar = pd.Index([k.strip().upper() for k in no_kamar]).unique()
+        kamar = kamar[self._df.index.get_indexer(kamar) >= 0]
+        if not len(kamar):
+            return 0
+        potret = self._potret(kamar)
+        self._ubah_ringkasan(self._df.loc[kamar], -1)
+        self._df.drop(kamar, inplace=True)
+        self._hapus_hash(kamar)
+        self._berubah.difference_update(kamar)
+        self._dihapus.update(kamar)
+        self.indeks_nama.hapus_banyak(kamar)
+        self.indeks_filter.hapus(kamar)
+        self._rekam(operasi or "Hapus kamar", potret)
+        return len(kamar)
+
+    def merge(self, df, operasi=None):
+        # Upsert banyak baris sekaligus berdasarkan 'No Kamar'. Baris yang
+        # masuk belakangan menang, sama seperti drop_duplicates(keep='last').
+        # Baris yang isinya sama dengan data sekarang dilewati dan tidak
+        # ditandai untuk disimpan. Mengembalikan (jumlah ditambahkan, jumlah
+        # diupdate).
+        masuk = self._satukan_kategori(siapkan_data(df))
+        berubah, sidik = self._beda_hash(masuk)
+        masuk = masuk[berubah]
+        if not len(masuk):
+            return 0, 0
+        sidik = np.asarray(sidik, dtype=object)[berubah]
+        potret = self._potret(masuk.index)
+        ada = self._df.index.get_indexer(masuk.index) >= 0
+        if ada.any():
+            self._ubah_ringkasan(self._df.loc[masuk.index[ada]], -1)
+            for kolom in KOLOM:
+                self._df.loc[masuk.index[ada], kolom] = masuk.loc[ada, kolom].to_numpy()
+        self._ubah_ringkasan(masuk, 1)
+        baru = masuk[~ada]
+        if len(baru):
+            self._df = urutkan_kamar(pd.concat([self._df, baru]))
+        self._simpan_hash(masuk.index, sidik)
+        self._berubah.update(masuk.index)
+        self._dihapus.difference_update(masuk.index)
+        self.indeks_nama.tambah_banyak(zip(masuk.index, masuk['Nama Penghuni']))
+        self.indeks_filter.tambah(masuk)
+        self._rekam(operasi or "Gabung data", potret)
+        return len(baru), int(ada.sum())
+
+    def cari(self, jenis, keyword):
+        # Semua pencarian dilayani dari indeks di memori, tanpa I/O disk
+        if jenis == "Nomor Kamar":
+            no_kamar = keyword.strip().upper()
+            kamar = [no_kamar] if no_kamar in self._df.index else []
+            return self._df.loc[kamar]
+        return self._df.iloc[self.posisi_cari(keyword)]
+
+    def posisi_cari(self, keyword):
+        # Posisi baris (urut tabel, jadi urut katalog) yang nama penghuninya
+        # memuat keyword. Kata kunci pendek: mask per slot dibawa ke urutan
+        # baris; lainnya: slot hasil trigram dipetakan ke posisinya.
+        slot_baris, posisi_slot = self._peta_slot()
+        mask = self.indeks_nama.bitmap(keyword)
+        if mask is not None:
+            return np.flatnonzero(mask[slot_baris])
+        posisi = posisi_slot[self.indeks_nama.cari(keyword)]
+        posisi.sort()
+        return posisi
+
+    def _peta_slot(self):
+        # Slot indeks nama setiap baris tabel dan kebalikannya (posisi baris
+        # setiap slot). Dihitung ulang hanya bila baris kamar bertambah/
+        # berkurang (indeks DataFrame baru) atau ada kamar yang mendapat/
+        # melepas slot.
+        indeks, versi = self._df.index, self.indeks_nama.versi
+        if self._slot_nama is None or self._slot_nama[0] is not indeks or self._slot_nama[1] != versi:
+            slot_baris = self.indeks_nama.slot(indeks)
+            posisi_slot = np.full(max(slot_baris.max(initial=-1) + 1, 1), -1, dtype='int64')
+            posisi_slot[slot_baris] = np.arange(len(slot_baris))
+            self._slot_nama = (indeks, versi, slot_baris, posisi_slot)
+        return self._slot_nama[2], self._slot_nama[3]
+
+    def saring(self, kriteria):
+        # Filter gabungan dari panel filter lewat indeks bitmap; hasilnya
+        # dalam urutan tabel
+        kamar = self.indeks_filter.saring(kriteria)
+        return self._df.iloc[np.sort(self._df.index.get_indexer(kamar))]
+
+    def ambil_perubahan(self, force=False):
+        # Dipanggil di thread GUI: salin perubahan yang belum tersimpan lalu
+        # kosongkan penandanya. Hasilnya ditulis dengan tulis_perubahan(),
+        # yang aman dijalankan di thread lain.
+        # force (Simpan Data) menulis ulang semua baris, tetapi tetap
+        # dilewati bila digest sama dengan saat terakhir dimuat/disimpan
+        if not self.dirty and (not force or self._digest == self._digest_tersimpan):
+            return None
+        if force or not self.backend.per_baris:
+            perubahan = {'semua': self._df.reset_index(drop=True).copy()}
+        else:
+            perubahan = {'semua': None, 'upsert': self._df.loc[sorted(self._berubah)].copy()}
+        perubahan['berubah'] = self._berubah
+        perubahan['dihapus'] = self._dihapus
+        perubahan['digest'] = self._digest
+        # Snapshot hanya menerima kamar yang berubah sejak snapshot terakhir,
+        # disalin selagi masih di thread GUI
+        perubahan['snapshot'] = None
+        if self.snapshot is not None:
+            if self._belum_snapshot is not None:
+                self._belum_snapshot |= self._berubah | self._dihapus
+            if self.snapshot.perlu(self.digest):
+                perubahan['snapshot'] = self._ambil_snapshot()
+        self._berubah = set()
+        self._dihapus = set()
+        return perubahan
+
+    def _ambil_snapshot(self):
+        # Setelah data dimuat, kamar yang berbeda dicari sekali dari sidik
+        # (tanpa menyalin atau menyidik ulang data); sesudahnya cukup kamar
+        # yang ditandai berubah oleh penyimpanan sejak snapshot terakhir
+        if self._belum_snapshot is None:
+            kamar = self.snapshot.berbeda(self._hash)
+        else:
+            kamar = sorted(self._belum_snapshot)
+        self._belum_snapshot = set()
+        ada = [k for k in kamar if k in self._hash]
+        return {
+            'kamar': kamar,
+            'data': self._df.loc[ada].copy(),
+            'sidik': [self._hash[k] for k in ada],
+            'dihapus': [k for k in kamar if k not in self._hash],
+            'jumlah': len(self._df),
+        }
+
+    def _tunda_snapshot(self, perubahan):
+        # Snapshot tidak tercatat: kamarnya diikutkan lagi ke snapshot
+        # berikutnya
+        snapshot = perubahan.get('snapshot')
+        if snapshot is not None and self._belum_snapshot is not None:
+            self._belum_snapshot.update(snapshot['kamar'])
+
+    def tulis_perubahan(self, perubahan):
+        if perubahan['semua'] is not None:
+            berhasil = save_data(perubahan['semua'], self.backend)
+        else:
+            try:
+                self.backend.simpan_perubahan(data_teks(perubahan['upsert']), perubahan['dihapus'])
+                berhasil = True
+            except Exception as e:
+                print(f"Error saving data: {e}")
+                berhasil = False
+        if berhasil and perubahan.get('snapshot') is not None:
+            # Gagal mencatat snapshot tidak menggagalkan penyimpanan data
+            snapshot = perubahan['snapshot']
+            try:
+                self.snapshot.catat_perubahan(snapshot['data'], snapshot['sidik'], snapshot['dihapus'],
+                                              snapshot['jumlah'], f"{perubahan['digest']:016x}")
+            except Exception as e:
+                print(f"Error menyimpan snapshot: {e}")
+                perubahan['snapshot_gagal'] = True
+        return berhasil
+
+    def tandai_tersimpan(self, perubahan):
+        # Dipanggil di thread GUI setelah tulis_perubahan() berhasil
+        self._digest_tersimpan = perubahan['digest']
+        if perubahan.get('snapshot_gagal'):
+            self._tunda_snapshot(perubahan)
+
+    def kembalikan_perubahan(self, perubahan):
+        # Penulisan gagal: tandai lagi kamar yang belum tersimpan, kecuali
+        # yang sudah berubah lagi sejak itu
+        for no_kamar in perubahan['berubah']:
+            if no_kamar in self._df.index and no_kamar not in self._dihapus:
+                self._berubah.add(no_kamar)
+        for no_kamar in perubahan['dihapus']:
+            if no_kamar not in self._df.index:
+                self._dihapus.add(no_kamar)
+        self._tunda_snapshot(perubahan)
+
+    def flush(self, force=False):
+        perubahan = self.ambil_perubahan(force)
+        if perubahan is None:
+            return True
+        if self.tulis_perubahan(perubahan):
+            self.tandai_tersimpan(perubahan)
+            return True
+        self.kembalikan_perubahan(perubahan)
+        return False
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QBrush, QColor
+
+from storage import KOLOM
+from store import format_harga, format_tanggal, teks_whatsapp
+
+KOLOM_STATUS_PEMBAYARAN = KOLOM.index('Status Pembayaran')
+KOLOM_HARGA = KOLOM.index('Harga Kamar')
+KOLOM_TANGGAL = KOLOM.index('Tanggal Masuk')
+KOLOM_WA = KOLOM.index('Nomor WhatsApp')
+
+# Brush dibuat sekali dan dipakai bersama oleh semua sel
+_brush_status = {}
+
+def brush_status(status):
+    if not _brush_status:
+        _brush_status['Menunggak'] = (QBrush(QColor(254, 226, 226)), QBrush(QColor(220, 38, 38)))  # Merah
+        _brush_status['Lunas'] = (QBrush(QColor(220, 252, 231)), QBrush(QColor(22, 163, 74)))      # Hijau
+    if "Menunggak" in status:
+        return _brush_status['Menunggak']
+    if "Lunas" in status:
+        return _brush_status['Lunas']
+    return None
+
+
+# Model tabel yang membaca langsung dari kolom DataFrame. QTableView hanya
+# meminta sel yang terlihat, jadi tidak ada objek per sel yang dibuat.
+class KostTableModel(QAbstractTableModel):
+    def __init__(self, df=None, parent=None):
+        super().__init__(parent)
+        self._kolom = [[] for _ in KOLOM]
+        self._tunggakan = np.empty(0)
+        self._jumlah = 0
+        if df is not None:
+            self._isi(df)
+
+    def _isi(self, df, tunggakan=None):
+        df = df.reindex(columns=KOLOM)
+        self._kolom = [df[kolom].to_numpy(dtype=object) for kolom in KOLOM]
+        self._jumlah = len(df)
+        # Bulan tunggakan per baris dari buku pembayaran; NaN berarti belum
+        # ada catatan pembayaran sehingga status tertulis yang dipakai
+        if tunggakan is None:
+            self._tunggakan = np.full(self._jumlah, np.nan)
+        else:
+            self._tunggakan = tunggakan.reindex(df.index).to_numpy(dtype=float)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._jumlah
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(KOLOM)
+
+    def nilai(self, row, column):
+        if column == KOLOM_STATUS_PEMBAYARAN and not np.isnan(self._tunggakan[row]):
+            bulan = int(self._tunggakan[row])
+            return f"Menunggak ({bulan} bulan)" if bulan else "Lunas"
+        value = self._kolom[column][row]
+        if column == KOLOM_HARGA:
+            # Harga disimpan sebagai angka, diformat hanya untuk sel yang tampil
+            return format_harga(value)
+        if column == KOLOM_TANGGAL:
+            return format_tanggal(value)
+        if column == KOLOM_WA:
+            # Nomor disimpan sebagai angka, 0 berarti kosong
+            return teks_whatsapp(value)
+        return str(value) if pd.notna(value) else ""
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.nilai(index.row(), index.column())
+        if role in (Qt.BackgroundRole, Qt.ForegroundRole) and index.column() == KOLOM_STATUS_PEMBAYARAN:
+            brush = brush_status(self.nilai(index.row(), index.column()))
+            if brush is not None:
+                return brush[0] if role == Qt.BackgroundRole else brush[1]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return KOLOM[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def no_kamar(self, row):
+        return self.nilai(row, 0)
+
+    def set_data(self, df, tunggakan=None):
+        # Perbarui isi tanpa reset model: sisipkan/hapus baris di ekor lalu
+        # kirim dataChanged untuk rentang baris yang sama
+        lama = self._jumlah
+        baru = len(df)
+        if baru > lama:
+            self.beginInsertRows(QModelIndex(), lama, baru - 1)
+            self._isi(df, tunggakan)
+            self.endInsertRows()
+        elif baru < lama:
+            self.beginRemoveRows(QModelIndex(), baru, lama - 1)
+            self._isi(df, tunggakan)
+            self.endRemoveRows()
+        else:
+            self._isi(df, tunggakan)
+        if min(lama, baru) > 0:
+            self.dataChanged.emit(self.index(0, 0), self.index(min(lama, baru) - 1, len(KOLOM) - 1))